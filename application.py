@@ -5,11 +5,121 @@ import sys
 import platform
 import os
 from lxml import etree
-from library.book_management import BookManager
-from library.game_management import GameManager
-from library.music_management import MusicManager
-from library.video_management import VideoManager
 from library.support.utility import Utility
+from library.support.collation import Collator
+# Library manager classes by library type, as (module, class) names. A manager
+# module is imported on first use, so that a command loads only its own.
+MANAGERS = {
+    "book": ("library.book_management", "BookManager"),
+    "game": ("library.game_management", "GameManager"),
+    "music": ("library.music_management", "MusicManager"),
+    "video": ("library.video_management", "VideoManager")
+}
+
+"""
+Class: Configuration
+
+The application configuration, config.xml validated by config.xsd. The files
+are validated and parsed once, and again only after either of them has been
+written, so that commands and menus do not pay for it on every library access.
+"""
+class Configuration:
+    """
+    Initializer
+
+    :param str confxml: The configuration file path.
+    :param str confxsd: The configuration schema file path.
+    """
+    def __init__(self, confxml, confxsd):
+        super().__init__()
+        self.__confxml = confxml
+        self.__confxsd = confxsd
+        # Stamp of the configuration files loaded, None if not loaded.
+        self.stamp = None
+        self.valid = False
+        # Configured values, set if valid.
+        self.libfile = None
+        self.schemafile = None
+        self.types = []
+        self.collator = None
+        self.columnar = False
+        self.journal = False
+    # End of initializer.
+
+    """
+    Method: load
+
+    Validates and parses the configuration files, unless they are unchanged
+    since they were last loaded.
+
+    :return bool: True if the configuration is valid.
+    """
+    def load(self):
+        stamp = self.__stamp()
+        if stamp is not None and stamp == self.stamp:
+            return self.valid
+        self.stamp = stamp
+        self.valid = Utility.validate(self.__confxsd, self.__confxml) == 0
+        if not self.valid:
+            return False
+        tree = etree.parse(self.__confxml)
+        # Library filename and library schema filename.
+        self.libfile = tree.findtext("./library")
+        self.schemafile = tree.findtext("./schema")
+        # Configured library types.
+        self.types = [node.text for node in tree.findall("./types/type")]
+        # Sorting keys generator.
+        self.collator = self.__collator(tree)
+        # Calculate statistics using columnar tables.
+        self.columnar = tree.findtext("./columnar", "").strip() in ["true", "1"]
+        # Append library changes to journals.
+        self.journal = tree.findtext("./journal", "").strip() in ["true", "1"]
+        return True
+    # End of method load.
+
+    """
+    Method: __stamp
+
+    Gets a stamp of the configuration files, which changes whenever they are written.
+
+    :return tuple_or_None: Union[tuple, None], the stamp, None if configuration files cannot be read.
+    """
+    def __stamp(self):
+        try:
+            stamp = ()
+            for conffile in (self.__confxml, self.__confxsd):
+                stat = os.stat(conffile)
+                stamp += (stat.st_mtime_ns, stat.st_size)
+            return stamp
+        except OSError:
+            return None
+    # End of method __stamp.
+
+    """
+    Method: __collator
+
+    Creates the sorting keys generator based on the optional collation settings.
+    Missing settings keep Collator defaults. A configured locale is set here,
+    once for the whole process, since locales are global state.
+
+    :param etree.ElementTree tree: The configuration tree.
+    :return Collator: The collator.
+    """
+    def __collator(self, tree):
+        options = {}
+        localename = tree.findtext("./collation/locale")
+        if localename is not None:
+            # Locale collation is used only if the locale is available.
+            options["uselocale"] = Collator.set_locale(localename.strip())
+        natural = tree.findtext("./collation/natural")
+        if natural is not None:
+            options["natural"] = natural.strip() in ["true", "1"]
+        articles = tree.findtext("./collation/articles")
+        if articles is not None:
+            options["articles"] = articles.split()
+        return Collator(**options)
+    # End of method __collator.
+# End of class Configuration.
 
 """
 Class: Application
@@ -19,8 +129,11 @@ The main class for starting the appilcation.
 class Application:
     """
     Initializer
+
+    :param bool keepmanagers[=True]: Reuse library managers, with their indexes, while configuration is unchanged.
+    :param float batchwindow[=None]: Coalesce concurrent writes of library managers arriving within batchwindow seconds, None to write immediately.
     """
-    def __init__(self):
+    def __init__(self, keepmanagers = True, batchwindow = None):
         super().__init__()
         # Initialize application directory values.
         fullpath = os.path.abspath(__file__)
@@ -28,6 +141,13 @@ class Application:
         self.__confdir = os.path.join(self.__rundir, "config")
         self.__confxsd = os.path.join(self.__confdir, "config.xsd")
         self.__confxml = os.path.join(self.__confdir, "config.xml")
+        # Configuration, loaded on demand and reloaded whenever its files change.
+        self.__configuration = Configuration(self.__confxml, self.__confxsd)
+        # Library managers by type and the configuration stamp they have been created with.
+        self.__keepmanagers = keepmanagers
+        self.__managers = {}
+        self.__managerstamp = None
+        self.__batchwindow = batchwindow
     # End of initializer.
 
     """
@@ -36,14 +156,16 @@ class Application:
     Check for configuration vallidity.
     Notify the user and exit in case of invalid settings.
 
+    :return Configuration: The valid configuration.
     :sys.exit 2: Invalid configuration.
     """
     def __invalid_configuration_exit(self):
-        # Load configuration
-        if Utility.validate(self.__confxsd, self.__confxml) != 0:
+        # Load configuration, if changed.
+        if not self.__configuration.load():
             # Validation has failed.
             print("Invalid configuration. Please reconfigure the application")
             sys.exit(2)
+        return self.__configuration
     # End of method __invalid_configuration_exit,
 
     """
@@ -57,30 +179,28 @@ class Application:
     """
     def get_manager(self, libtype):
         # Configuration vallidity check.
-        self.__invalid_configuration_exit()
+        configuration = self.__invalid_configuration_exit()
+        # Drop managers created with a different configuration.
+        if configuration.stamp != self.__managerstamp:
+            self.__managers = {}
+            self.__managerstamp = configuration.stamp
+        if libtype in self.__managers:
+            return self.__managers[libtype]
         # Chech if library type is supported.
-        supportedlibs = self.library_types()
-        if libtype not in supportedlibs:
+        if libtype not in configuration.types:
             print("Unsupported library type {}.".format(libtype))
-            print("Supported library types by current configuration: {}".format(supportedlibs))
+            print("Supported library types by current configuration: {}".format(configuration.types))
             sys.exit(3)
 
-        # Create xml tree.
-        tree = etree.parse(self.__confxml)
-        # Find library filename.
-        libfile = tree.find("/library").text
-        # Find library schema filename.
-        libschemafile =tree.find("/schema").text
-
         # Create library manager for specific library type.
-        if libtype == "book":
-            manager = BookManager(os.path.join(self.__rundir, "storage"), libfile, libschemafile)
-        elif libtype == "game":
-            manager = GameManager(os.path.join(self.__rundir, "storage"), libfile, libschemafile)
-        elif libtype == "music":
-            manager = MusicManager(os.path.join(self.__rundir, "storage"), libfile, libschemafile)
-        elif libtype == "video":
-            manager = VideoManager(os.path.join(self.__rundir, "storage"), libfile, libschemafile)
+        modulename, classname = MANAGERS[libtype]
+        # __import__ rather than importlib, so that -X importtime reports the manager module.
+        managerclass = getattr(__import__(modulename, fromlist = [classname]), classname)
+        manager = managerclass(os.path.join(self.__rundir, "storage"), configuration.libfile, configuration.schemafile,
+                               collator = configuration.collator, columnar = configuration.columnar,
+                               batchwindow = self.__batchwindow, journal = configuration.journal)
+        if self.__keepmanagers:
+            self.__managers[libtype] = manager
         # Return managet object.
         return manager
     # End of method get_manager.
@@ -109,19 +229,82 @@ class Application:
     """
     def library_types(self):
         # Configuration vallidity check.
-        self.__invalid_configuration_exit()
-
-        # Create xml tree.
-        tree = etree.parse(self.__confxml)
-        # Find all type nodes.
-        tnodes = tree.findall("/types/type")
-        # Get type text and append it to libtypes list.
-        libtypes = []
-        for t in tnodes:
-            libtypes.append(t.text)
-        return libtypes
+        return list(self.__invalid_configuration_exit().types)
     # End of method library_types
 
+    """
+    Method: search_all
+
+    Searches titles of all configured library types concurrently.
+    Results are ranked by exact match, prefix match and containment, followed
+    by title order.
+
+    :param str value: The value to search for.
+    :return list: List of (libtype, etree.Element) tuples.
+    """
+    def search_all(self, value):
+        # Create managers first, since invalid configuration terminates the application.
+        managers = []
+        for libtype in self.library_types():
+            managers.append((libtype, self.get_manager(libtype)))
+        collator = self.__configuration.collator
+
+        # Parsing and searching each library file runs in its own thread.
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers = len(managers)) as executor:
+            futures = []
+            for libtype, manager in managers:
+                futures.append((libtype, executor.submit(manager.search_elements, "title", value)))
+            results = []
+            for libtype, future in futures:
+                elements = future.result()
+                if isinstance(elements, int):
+                    print("Invalid storage file for library type {}.".format(libtype))
+                elif elements is not None:
+                    for element in elements:
+                        results.append((libtype, element))
+
+        # Rank results.
+        folded = Utility.fold(value)
+        def rank(result):
+            title = result[1].findtext("title").strip()
+            ftitle = Utility.fold(title)
+            if ftitle == folded:
+                match = 0
+            elif ftitle.startswith(folded):
+                match = 1
+            else:
+                match = 2
+            return (match, collator.key(title), result[0])
+        results.sort(key = rank)
+        return results
+    # End of method search_all.
+
+    """
+    Method: show_search_all
+
+    Shows titles of all configured library types containing a value.
+
+    :param str value: The value to search for.
+    """
+    def show_search_all(self, value):
+        results = self.search_all(value)
+        if not results:
+            print("No item with title containing '{}' has been found.".format(value))
+            return
+        # Calculate max column widths.
+        typewidth = 4
+        titlewidth = 5
+        for result in results:
+            typewidth = max(typewidth, len(result[0]))
+            titlewidth = max(titlewidth, len(result[1].findtext("title").strip()))
+        # Display results.
+        print("{:{}} | {:{}}".format("Type", typewidth, "Title", titlewidth))
+        print("{}-|-{}".format("-" * typewidth, "-" * titlewidth))
+        for result in results:
+            print("{:{}} | {:{}}".format(result[0], typewidth, result[1].findtext("title").strip(), titlewidth))
+    # End of method show_search_all.
+
     """
     Method: show_menu
 
@@ -282,6 +465,16 @@ class Application:
     </xs:simpleType>
 </xs:element>
 
+<xs:element name="locale" type="xs:string"/>
+
+<xs:element name="natural" type="xs:boolean"/>
+
+<xs:element name="articles" type="xs:string"/>
+
+<xs:element name="columnar" type="xs:boolean"/>
+
+<xs:element name="journal" type="xs:boolean"/>
+
 <!-- definition of complex types -->
 <xs:element name="types">
     <xs:complexType>
@@ -291,12 +484,25 @@ class Application:
     </xs:complexType>
 </xs:element>
 
+<xs:element name="collation">
+    <xs:complexType>
+        <xs:sequence>
+            <xs:element ref="locale" minOccurs="0" maxOccurs="1"/>
+            <xs:element ref="natural" minOccurs="0" maxOccurs="1"/>
+            <xs:element ref="articles" minOccurs="0" maxOccurs="1"/>
+        </xs:sequence>
+    </xs:complexType>
+</xs:element>
+
 <xs:element name="config">
     <xs:complexType>
         <xs:sequence>
             <xs:element ref="library"/>
             <xs:element ref="schema"/>
             <xs:element ref="types"/>
+            <xs:element ref="collation" minOccurs="0" maxOccurs="1"/>
+            <xs:element ref="columnar" minOccurs="0" maxOccurs="1"/>
+            <xs:element ref="journal" minOccurs="0" maxOccurs="1"/>
         </xs:sequence>
     </xs:complexType>
 </xs:element>
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+# Imports
+import sys
+import json
+
+"""
+Class: BatchRunner
+
+Runs a stream of library commands in one process, one JSON object per line:
+    {"type": "book", "op": "add", "item": {...}}
+    {"type": "book", "op": "edit", "key": "", "item": {...}}
+    {"type": "book", "op": "remove", "key": ""}
+    {"type": "book", "op": "get", "key": ""}
+    {"type": "book", "op": "search", "element": "title", "value": "", "ascending": true}
+    {"type": "book", "op": "get_all", "element": "title", "ascending": true}
+    {"type": "book", "op": "import_csv", "file": "", "jobs": 1, "mode": "replace"}
+    {"type": "book", "op": "import_jsonl", "file": "", "mode": "replace"}
+where type is any configured library type and items are in the python
+dictionary form used to add items. An optional "id" is copied to the result.
+
+Adds, edits and removes are grouped per library and committed together, when
+a later command reads or imports to the same library, when the group reaches
+the group size, or at the end of the stream. Results are written as JSON lines
+in the order of their commands, with the line number of the command:
+    {"line": 1, "result": 0} for adds, edits and removes.
+    {"line": 1, "result": 0, "counts": {"inserted": 0, "updated": 0, "unchanged": 0}} for imports.
+    {"line": 2, "item": {...}} or {"line": 2, "items": [...]} for reads.
+    {"line": 3, "error": ""} for invalid commands and storage errors.
+Parameters of the wrong type and errors raised while a command runs are
+reported for that command only, so that the stream goes on and changes queued
+for other libraries are still committed.
+"""
+class BatchRunner:
+    # Commands changing library elements.
+    _changes = ("add", "edit", "remove")
+    # Commands reading library elements.
+    _reads = ("get", "search", "get_all")
+    # Commands importing files.
+    _imports = ("import_csv", "import_jsonl")
+    # Types of command parameters, which may be missing or null for their default.
+    _parameters = {"key": (str, "a string"), "element": (str, "a string"), "value": (str, "a string"),
+                   "file": (str, "a string"), "jobs": (int, "an integer"), "ascending": (bool, "a boolean")}
+
+    """
+    Initializer
+
+    :param Application app: The application, which should keep library managers.
+    :param file out[=None]: The output stream of results, sys.stdout if None.
+    :param int groupsize[=1000]: The maximum number of changes of a library committed together.
+    """
+    def __init__(self, app, out = None, groupsize = 1000):
+        super().__init__()
+        self._app = app
+        self._out = out if out is not None else sys.stdout
+        self._groupsize = groupsize
+        self._types = None
+        # Results in command order, None until known, the number already written and the number of failures.
+        self._results = []
+        self._written = 0
+        self._failures = 0
+        # Changes not committed yet: lists of (result position, change tuple, result) by library type.
+        self._pending = {}
+    # End of initializer.
+
+    """
+    Method: run
+
+    Runs the commands of a stream.
+
+    :param iterable lines: The command lines.
+    :return int: The number of failed commands.
+    """
+    def run(self, lines):
+        self._types = self._app.library_types()
+        for number, line in enumerate(lines, 1):
+            if line.strip():
+                self._run_command(number, line)
+        for libtype in list(self._pending):
+            self._commit(libtype)
+        self._write()
+        return self._failures
+    # End of method run.
+
+    """
+    Method: _run_command
+
+    Runs a command, or queues it if it changes library elements.
+
+    :param int number: The line number of the command.
+    :param str line: The command line.
+    """
+    def _run_command(self, number, line):
+        position = len(self._results)
+        self._results.append(None)
+        result = {"line": number}
+        try:
+            command = json.loads(line)
+            if not isinstance(command, dict):
+                raise ValueError("Command should be a JSON object.")
+        except ValueError as error:
+            result["error"] = "Invalid command: {}".format(error)
+            self._results[position] = result
+            self._write()
+            return
+        if "id" in command:
+            result["id"] = command["id"]
+        try:
+            if self._queue_command(command, position, result):
+                return
+        except Exception as error:
+            result["error"] = "An error occurred: {}".format(error)
+        self._results[position] = result
+        self._write()
+    # End of method _run_command.
+
+    """
+    Method: _queue_command
+
+    Queues a change, or runs any other command.
+
+    :param dict command: The command object.
+    :param int position: The position of the result.
+    :param dict result: The result object to fill in.
+    :return bool: True if the change has been queued, so that its result is not known yet.
+    """
+    def _queue_command(self, command, position, result):
+        libtype = command.get("type")
+        operation = command.get("op")
+        if not isinstance(libtype, str) or libtype not in self._types:
+            result["error"] = "Unsupported library type {}.".format(libtype)
+        elif operation in BatchRunner._changes:
+            if operation != "add" and not isinstance(command.get("key"), str):
+                result["error"] = "Command {} requires a key.".format(operation)
+            elif operation != "remove" and not isinstance(command.get("item"), dict):
+                result["error"] = "Command {} requires an item object.".format(operation)
+            else:
+                if operation == "add":
+                    change = ("add", command.get("item"))
+                elif operation == "edit":
+                    change = ("edit", command["key"], command.get("item"))
+                else:
+                    change = ("remove", command["key"])
+                self._pending.setdefault(libtype, []).append((position, change, result))
+                if len(self._pending[libtype]) >= self._groupsize:
+                    self._commit(libtype)
+                return True
+        elif operation in BatchRunner._reads or operation in BatchRunner._imports:
+            error = BatchRunner._check_parameters(command)
+            if error is not None:
+                result["error"] = error
+                return False
+            # Reads and imports see every earlier change.
+            self._commit(libtype)
+            self._run_read(self._app.get_manager(libtype), operation, command, result)
+        else:
+            result["error"] = "Unsupported command {}.".format(operation)
+        return False
+    # End of method _queue_command.
+
+    """
+    Static method: _check_parameters
+
+    Checks the types of the parameters of a command.
+
+    :param dict command: The command object.
+    :return str_or_None: Union[str, None], the error message, None if parameters are valid.
+    """
+    @staticmethod
+    def _check_parameters(command):
+        for name, (kind, description) in BatchRunner._parameters.items():
+            value = command.get(name)
+            # Booleans are integers in python, but not in JSON.
+            if value is not None and (not isinstance(value, kind) or (kind is int and isinstance(value, bool))):
+                return "Parameter {} of command {} should be {}.".format(name, command["op"], description)
+        if command.get("jobs") is not None and command["jobs"] < 1:
+            return "Parameter jobs of command {} should be positive.".format(command["op"])
+        return None
+    # End of static method _check_parameters.
+
+    """
+    Method: _run_read
+
+    Runs a read or import command.
+
+    :param Manager manager: The library manager.
+    :param str operation: The command.
+    :param dict command: The command object.
+    :param dict result: The result object to fill in.
+    """
+    def _run_read(self, manager, operation, command, result):
+        ascending = command.get("ascending") is not False
+        if operation in BatchRunner._imports:
+            mode = command.get("mode", "replace")
+            if mode not in ("replace", "upsert", "merge"):
+                result["error"] = "Unsupported import mode {}.".format(mode)
+                return
+            counts = {}
+            if operation == "import_csv":
+                result["result"] = manager.import_csv(command.get("file") or "", jobs = command.get("jobs") or 1, mode = mode, counts = counts)
+            else:
+                result["result"] = manager.import_jsonl(command.get("file") or "", mode = mode, counts = counts)
+            result["counts"] = counts
+            return
+        if operation == "get":
+            elements = manager.get_element(command.get("key") or "")
+        elif operation == "search":
+            elements = manager.search_elements(command.get("element") or "title", command.get("value") or "", ascending)
+        else:
+            elements = manager.get_all_elements(command.get("element"), ascending)
+        if isinstance(elements, int):
+            result["error"] = "Invalid storage file."
+        elif operation == "get":
+            result["item"] = None if elements is None else manager.element_to_dict(elements)
+        else:
+            result["items"] = [manager.element_to_dict(element) for element in elements or []]
+    # End of method _run_read.
+
+    """
+    Method: _commit
+
+    Commits the pending changes of a library.
+
+    :param str libtype: The library type.
+    """
+    def _commit(self, libtype):
+        pending = self._pending.pop(libtype, None)
+        if not pending:
+            return
+        try:
+            codes = self._app.get_manager(libtype).change_elements([change for position, change, result in pending])
+        except Exception as error:
+            # Every change of the group is reported, so that later results are still written.
+            codes = None
+            message = "An error occurred: {}".format(error)
+        for i, (position, change, result) in enumerate(pending):
+            if codes is None:
+                result["error"] = message
+            else:
+                result["result"] = codes[i]
+            self._results[position] = result
+        self._write()
+    # End of method _commit.
+
+    """
+    Method: _write
+
+    Writes the results known so far, stopping at the first pending change.
+    """
+    def _write(self):
+        while self._written < len(self._results):
+            result = self._results[self._written]
+            if result is None:
+                break
+            self._out.write(json.dumps(result, ensure_ascii = False) + "\n")
+            if "error" in result or result.get("result", 0) != 0:
+                self._failures += 1
+            # Written results are not kept.
+            self._results[self._written] = True
+            self._written += 1
+        self._out.flush()
+    # End of method _write.
+# End of class BatchRunner.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
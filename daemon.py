@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+# Imports
+import os
+import json
+import socket
+import signal
+# Default socket file, next to the application.
+SOCKETFILE = os.path.join(os.path.split(os.path.abspath(__file__))[0], "library.sock")
+
+"""
+Class: Daemon
+
+Long running library server. Keeps the application, its library managers and
+their indexes in memory and runs command line requests sent over a Unix domain
+socket, so that repeated commands pay neither Python startup nor library
+loading.
+
+Requests and responses are single JSON lines:
+    request: {"argv": [command line arguments], "cwd": client working directory}
+    response: {"output": printed text, "code": exit code}
+    rejected request: {"rejected": true}, the command has not run.
+Requests run one at a time, in the order they are received. Clients run a
+command themselves only if it has been rejected or could not be sent, so that
+no command runs twice.
+"""
+class Daemon:
+    """
+    Initializer
+
+    :param callable handler: Runs a command, gets the list of command line arguments and returns the exit code.
+    :param str socketfile[=SOCKETFILE]: The socket file path.
+    """
+    def __init__(self, handler, socketfile = SOCKETFILE):
+        super().__init__()
+        self._handler = handler
+        self._socketfile = socketfile
+    # End of initializer.
+
+    """
+    Method: serve
+
+    Listens for requests until interrupted.
+
+    :return int: 0 on normal termination, 1 if a daemon is already running or Unix domain sockets are not supported.
+    """
+    def serve(self):
+        if not hasattr(socket, "AF_UNIX"):
+            print("Unix domain sockets are not supported on this platform.")
+            return 1
+        if os.path.exists(self._socketfile):
+            if Daemon.running(self._socketfile):
+                print("A library daemon is already running on {}.".format(self._socketfile))
+                return 1
+            # Remove the socket file left behind by a terminated daemon.
+            os.remove(self._socketfile)
+        # Terminate cleanly when stopped, like on Ctrl+C.
+        signal.signal(signal.SIGTERM, Daemon._terminate)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            # Only the user running the daemon may connect.
+            oldmask = os.umask(0o177)
+            try:
+                server.bind(self._socketfile)
+            finally:
+                os.umask(oldmask)
+            server.listen()
+            print("Library daemon listening on {}. Press Ctrl+C to stop.".format(self._socketfile))
+            while True:
+                connection = server.accept()[0]
+                with connection:
+                    self._serve_connection(connection)
+        except KeyboardInterrupt:
+            print()
+        finally:
+            server.close()
+            if os.path.exists(self._socketfile):
+                os.remove(self._socketfile)
+        return 0
+    # End of method serve.
+
+    """
+    Method: _serve_connection
+
+    Runs the request of a connection and sends back its output.
+
+    :param socket.socket connection: The client connection.
+    """
+    def _serve_connection(self, connection):
+        try:
+            request = json.loads(Daemon._receive(connection))
+            argv = request["argv"]
+            cwd = request["cwd"]
+            if not isinstance(argv, list) or not isinstance(cwd, str):
+                raise TypeError("Invalid request.")
+        except (OSError, ValueError, KeyError, TypeError):
+            # Broken or invalid request, the client falls back to running the command itself.
+            response = {"rejected": True}
+        else:
+            response = self._run(argv, cwd)
+        try:
+            connection.sendall(json.dumps(response).encode("utf-8") + b"\n")
+        except OSError:
+            # The client has gone away.
+            pass
+    # End of method _serve_connection.
+
+    """
+    Method: _run
+
+    Runs a command in the working directory of the client and captures its output.
+    Errors of the command are reported in the response, so that they never stop the daemon.
+
+    :param list argv: The command line arguments.
+    :param str cwd: The client working directory.
+    :return dict: The response, with keys "output" and "code".
+    """
+    def _run(self, argv, cwd):
+        from io import StringIO
+        from contextlib import redirect_stdout
+        out = StringIO()
+        rundir = os.getcwd()
+        code = 0
+        try:
+            os.chdir(cwd)
+            with redirect_stdout(out):
+                code = self._handler(argv) or 0
+        except SystemExit as exit:
+            code = exit.code if isinstance(exit.code, int) else 1
+        except Exception as error:
+            out.write("An error occurred: {}\n".format(error))
+            code = 1
+        finally:
+            os.chdir(rundir)
+        return {"output": out.getvalue(), "code": code}
+    # End of method _run.
+
+    """
+    Static method: request
+
+    Sends a command to a running daemon.
+
+    :param list argv: The command line arguments.
+    :param str socketfile[=SOCKETFILE]: The socket file path.
+    :return dict_or_None: Union[dict, None], the response, None if no daemon is running or the command has not been run.
+    """
+    @staticmethod
+    def request(argv, socketfile = SOCKETFILE):
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(socketfile):
+            return None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            try:
+                client.connect(socketfile)
+                request = {"argv": list(argv), "cwd": os.getcwd()}
+                client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            except OSError:
+                return None
+            try:
+                response = json.loads(Daemon._receive(client))
+            except (OSError, ValueError):
+                # The command may have run, so it should not run again.
+                return {"output": "The library daemon did not answer, the command may have been run.\n", "code": 1}
+        if not isinstance(response, dict) or response.get("rejected"):
+            return None
+        return response
+    # End of static method request.
+
+    """
+    Static method: running
+
+    Checks if a daemon accepts connections.
+
+    :param str socketfile[=SOCKETFILE]: The socket file path.
+    :return bool: True if a daemon is running.
+    """
+    @staticmethod
+    def running(socketfile = SOCKETFILE):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socketfile)
+            return True
+        except OSError:
+            return False
+    # End of static method running.
+
+    """
+    Static method: _terminate
+
+    Signal handler stopping the daemon.
+
+    :param int signum: The signal number.
+    :param frame frame: The current stack frame.
+    :raise KeyboardInterrupt: Always.
+    """
+    @staticmethod
+    def _terminate(signum, frame):
+        raise KeyboardInterrupt()
+    # End of static method _terminate.
+
+    """
+    Static method: _receive
+
+    Reads a JSON line.
+
+    :param socket.socket connection: The connection.
+    :return str: The line.
+    :raise ValueError: If the connection is closed before the end of the line.
+    """
+    @staticmethod
+    def _receive(connection):
+        data = bytearray()
+        while not data.endswith(b"\n"):
+            block = connection.recv(65536)
+            if not block:
+                raise ValueError("Incomplete message.")
+            data += block
+        return data.decode("utf-8")
+    # End of static method _receive.
+# End of class Daemon.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import re
 from lxml import etree
 from library.management import Manager
 from library.support.utility import Utility
+from library.support.records import BookRecord
 
 """
 Class: BookManager
@@ -19,131 +20,99 @@ The class also supports validation of the XML file given an XSD schema, so that
 it may be used independently.
 """
 class BookManager(Manager):
+    # Record fields of exported CSV files.
+    _csvfields = ["title", "authors", "category", "formats", "isbn", "finished"]
+
     """
     Initializer
     """
-    def __init__(self, storageroot, libfile, schemafile):
+    def __init__(self, storageroot, libfile, schemafile, **options):
         # Library type.
         libtype = "book"
         # Allow sorting element tags.
         sortingtags = ["title", "author", "category", "format", "isbn", "finished"]
         uniquekey = "isbn"
+        # Element tags supporting lookups and counts by value.
+        grouptags = ["author", "category", "format", "publisher", "shop", "finished"]
+        # Element tags of library statistics.
+        facettags = ["category", "format", "finished", "shop"]
+        # Element tags of reading progress statistics.
+        progresstags = ("pagenumber", "lastpageread")
+        # Element tags supporting range queries.
+        rangetags = {"publicationdate": "date", "pagenumber": "int", "lastpageread": "int"}
         # Call parent initializer.
-        super().__init__(storageroot, libfile, schemafile, libtype, sortingtags, uniquekey)
+        super().__init__(storageroot, libfile, schemafile, libtype, sortingtags, uniquekey, BookRecord, grouptags, facettags, progresstags, rangetags, **options)
     # End of initializer.
 
     # File import and export functionality.
     """
-    Method: import_csv
+    Method: _csv_element
 
-    Imports a CSV file as the XML library file.
+    Creates a library element from a CSV row.
     Only fields listed in sortingtags are supported.
 
-    Character set: UTF-8
-    Field delimiter: ,
-    Text delimiter: \
-
     Valid CSV header:
     Title,Author,Category,Format,ISBN,Finished
 
-    :param str impfile: the file to import.
-    :return int: 0 on success, 1 if CSV header is not valid and 2 in case of filesystem write error.
+    :param dict row: The CSV row values by column name.
+    :return etree.Element: The new element.
+    :raise KeyError: If a column is missing.
     """
-    def import_csv(self, impfile):
-        try:
-            # List of books.
-            books = []
-            with open(impfile, newline="") as csvfile:
-                filereader = csv.DictReader(csvfile, quotechar="\\")
-                for row in filereader:
-                    # Create new element from elementdict.
-                    element = etree.Element(self._libtype)
-                    # Add subelements.
-                    subelement = etree.SubElement(element, "title")
-                    subelement.text = row["Title"]
-                    # Add author subelements.
-                    authors = row["Author"].split(", ")
-                    subelement = etree.SubElement(element, "authors")
-                    for author in authors:
-                        authorelement = etree.SubElement(subelement, "author")
-                        authorelement.text = author
-                    subelement = etree.SubElement(element, "category")
-                    subelement.text = row["Category"]
-                    # Add format subelements.
-                    formats = row["Format"].split(", ")
-                    subelement = etree.SubElement(element, "formats")
-                    for bformat in formats:
-                        formatelement = etree.SubElement(subelement, "format")
-                        formatelement.text = bformat
-                    # Add remaining subelements
-                    subelement = etree.SubElement(element, "isbn")
-                    subelement.text = row["ISBN"]
-                    subelement = etree.SubElement(element, "finished")
-                    subelement.text = row["Finished"]
-
-                    # Add new element to books list.
-                    books.append(element)
-                # Write the elements to a new library file.
-                wbooks = self._write_tree(books)
-                if wbooks != 0:
-                    return wbooks
-        except OSError:
-            return 2
-        except KeyError:
-            return 1
-        # File import was successful.
-        return 0
-    # End of method import_csv.
+    def _csv_element(self, row):
+        # Create new element from row.
+        element = etree.Element(self._libtype)
+        # Add subelements.
+        subelement = etree.SubElement(element, "title")
+        subelement.text = row["Title"]
+        # Add author subelements.
+        authors = row["Author"].split(", ")
+        subelement = etree.SubElement(element, "authors")
+        for author in authors:
+            authorelement = etree.SubElement(subelement, "author")
+            authorelement.text = author
+        subelement = etree.SubElement(element, "category")
+        subelement.text = row["Category"]
+        # Add format subelements.
+        formats = row["Format"].split(", ")
+        subelement = etree.SubElement(element, "formats")
+        for bformat in formats:
+            formatelement = etree.SubElement(subelement, "format")
+            formatelement.text = bformat
+        # Add remaining subelements
+        subelement = etree.SubElement(element, "isbn")
+        subelement.text = row["ISBN"]
+        subelement = etree.SubElement(element, "finished")
+        subelement.text = row["Finished"]
+        return element
+    # End of method _csv_element.
 
     """
-    Method: export_csv
+    Method: _csv_header
 
-    Exports XML library file as a CSV file.
-    Only fields listed in sortingtags are supported.
+    Gets the header row of exported CSV files.
 
-    Character set: UTF-8
-    Field delimiter: ,
-    Text delimiter: \
+    :return list: List of str, the column names.
+    """
+    def _csv_header(self):
+        return [self._sortingtags[0].title(), self._sortingtags[1].title(), self._sortingtags[2].title(),
+                self._sortingtags[3].title(), self._sortingtags[4].upper(), self._sortingtags[5].title()]
+    # End of method _csv_header.
+
+    """
+    Method: _csv_row
+
+    Gets the CSV row of an item.
+    Only fields listed in sortingtags are supported.
 
     Valid CSV header:
     Title,Author,Category,Format,ISBN,Finished
 
-    :param str expfile: the file to export.
-    :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
+    :param Record record: The item record, with the fields of _csvfields decoded.
+    :return list: List of str, the column values.
     """
-    def export_csv(self, expfile):
-        try:
-            # Open CSV file for writing.
-            with open(expfile, "w", newline = "") as csvfile:
-                filewriter = csv.writer(csvfile, quotechar = "\\", quoting = csv.QUOTE_MINIMAL)
-                # Write header row.
-                filewriter.writerow([self._sortingtags[0].title(), self._sortingtags[1].title(), self._sortingtags[2].title(),
-                                    self._sortingtags[3].title(), self._sortingtags[4].upper(), self._sortingtags[5].title()])
-                # Get all items
-                items = self.get_all_elements()
-                # Check for errors before proceed.
-                if isinstance(items, int):
-                    return items
-                # Check if library is empty.
-                if items is None:
-                    return 0
-                # Write items to CSV file.
-                for item in items:
-                    authors = []
-                    formats = []
-                    # Add authors.
-                    for author in item[1]:
-                        authors.append(author.text)
-                    # Add formats.
-                    for bformat in item[3]:
-                        formats.append(bformat.text)
-                    # Write row.
-                    filewriter.writerow([item[0].text, ", ".join(authors), item[2].text, ", ".join(formats), item[4].text, item[-1].text])
-        except OSError:
-            return 2
-        # File export was successful.
-        return 0
-    # End of method export_csv.
+    def _csv_row(self, record):
+        return [record.title, ", ".join(record.authors), record.category, ", ".join(record.formats), record.isbn, record.finished]
+    # End of method _csv_row.
 
     # Storage management methods.
     """
@@ -315,116 +284,9 @@ class BookManager(Manager):
 
     # Element manipulation methods.
     """
-    Method: search_elements
-
-    Search for elements containing a given value.
-
-    :param str element: The element tag containing the value. Should be in _sortingtags list.
-    :param str value: The value inside element tag to search for.
-    :param bool ascending[=True]: The order to sort the results.
-    :return int_or_list_or_None: Union[int, list, None].
-    """
-    def search_elements(self, element, value, ascending = True):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        if element not in self._sortingtags:
-            return None
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Search for elements containing the value.
-        tnodes = None
-        if element == "author" or element == "format":
-            tnodes = tree.xpath("/library/{0}/{1}s/{1}[contains(translate(., '{3}', '{4}'), '{2}')]/ancestor::{0}".format(self._libtype, element, value.lower(), self._uppercase, self._lowercase))
-        else:
-            tnodes = tree.xpath("/library/{0}/{1}[contains(translate(., '{3}', '{4}'), '{2}')]/ancestor::{0}".format(self._libtype, element, value.lower(), self._uppercase, self._lowercase))
-
-        # Return elements if exist or none if list is empty.
-        if tnodes:
-            # Sort the list.
-            index = self._sortingtags.index(element)
-            if element == "author" or element == "format":
-                # Sort by the first listed author or format.
-                tnodes.sort(key = lambda element: element[index][0].text.title(), reverse = not ascending)
-            else:
-                tnodes.sort(key = lambda element: element[index].text.title(), reverse = not ascending)
-            return tnodes
-        else:
-            return None
-    # End of method search_elements.
-
-    """
-    Method: get_all_elements
+    Method: _create_element
 
-    Gets all elements in the specified order.
-
-    :param str element[=None]: The element tag on which get will be based. Should be in _sortingtags list.
-    :param bool ascending[=True]: The order to sort the results.
-    :return int_or_list_or_None: Union[int, list, None].
-    """
-    def get_all_elements(self, element = None, ascending = True):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Get a list of all elements.
-        tnodes = tree.xpath("/library/{}".format(self._libtype))
-
-        # Return elements if exist or none if list is empty.
-        if tnodes:
-            # If element is None, title is used.
-            if element is None:
-                element = "title"
-            # Sort the list.
-            index = self._sortingtags.index(element)
-            if element == "author" or element == "format":
-                # Sort by the first listed author or format.
-                tnodes.sort(key = lambda element: element[index][0].text.title(), reverse = not ascending)
-            else:
-                tnodes.sort(key = lambda element: element[index].text.title(), reverse = not ascending)
-            return tnodes
-        else:
-            return None
-    # End of method get_all_elements.
-
-    """
-    Method: get_element
-
-    Gets an element by unique value.
-
-    :param str element: The exact value in element isbn.
-    :return int_or_etree.Element_or_None: Union[int, etree.Element, None].
-    """
-    def get_element(self, element):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Find node.
-        # Scheme validation garanties unique key value, so a list containing
-        # only one element on an empty one will be returned.
-        tnodes = tree.xpath("/library/{0}/isbn[text()='{1}']/ancestor::{0}".format(self._libtype, element))
-
-        # Return element if exists or none if list is empty
-        if tnodes:
-            return tnodes[0]
-        else:
-            return None
-    # End of method get_element.
-
-    """
-    Method: add_element
-
-    Adds an element.
+    Creates a library element from its python dictionary form.
 
     Python dictionary form:
     {
@@ -433,78 +295,52 @@ class BookManager(Manager):
         "pagenumber": "", "lastpageread": "", "shop": "", "finished": "Yes/No"
     }
 
-    :param dict elementdict: The python dictionary containing the values of the element to be added to library.
-    :return int: 0 on success, 1 on dictionary key error, 2 on write file error and 3 on validation error.
+    :param dict elementdict: The python dictionary containing the values of the element.
+    :return etree.Element: The new element.
+    :raise KeyError: If a mandatory value is missing.
     """
-    def add_element(self, elementdict):
+    def _create_element(self, elementdict):
         # Create new element from elementdict.
         element = etree.Element(self._libtype)
-        try:
-            subelement = etree.SubElement(element, "title")
-            subelement.text = elementdict["title"]
-            # Add author subelements.
-            subelement = etree.SubElement(element, "authors")
-            for author in elementdict["authors"]:
-                authorelement = etree.SubElement(subelement, "author")
-                authorelement.text = author
-            subelement = etree.SubElement(element, "category")
-            subelement.text = elementdict["category"]
-            # Add format subelements.
-            subelement = etree.SubElement(element, "formats")
-            for bformat in elementdict["formats"]:
-                formatelement = etree.SubElement(subelement, "format")
-                formatelement.text = bformat
-            subelement = etree.SubElement(element, "isbn")
-            subelement.text = elementdict["isbn"]
-            # Add optional subelements.
-            if "publicationdate" in elementdict:
-                subelement = etree.SubElement(element, "publicationdate")
-                subelement.text = elementdict["publicationdate"]
-            if "publisher" in elementdict:
-                subelement = etree.SubElement(element, "publisher")
-                subelement.text = elementdict["publisher"]
-            if "edition" in elementdict:
-                subelement = etree.SubElement(element, "edition")
-                subelement.text = elementdict["edition"]
-            if "pagenumber" in elementdict:
-                subelement = etree.SubElement(element, "pagenumber")
-                subelement.text = elementdict["pagenumber"]
-            if "lastpageread" in elementdict:
-                subelement = etree.SubElement(element, "lastpageread")
-                subelement.text = elementdict["lastpageread"]
-            if "shop" in elementdict:
-                subelement = etree.SubElement(element, "shop")
-                subelement.text = elementdict["shop"]
-            subelement = etree.SubElement(element, "finished")
-            subelement.text = elementdict["finished"]
-            # Write to file.
-            return self._add_element_to_tree(element)
-        except KeyError:
-            return 1
-    # End of method add_element.
-
-    """
-    Method: remove_element
-
-    Removes an element.
-
-    :param str element: The exact value in element isbn.
-    :return int: 0 on success, 1 in case no node found, 2 on write file error and 3 on validation error.
-    """
-    def remove_element(self, element):
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Get a list of all elements.
-        nodes = tree.xpath("/library/{}".format(self._libtype))
-        # Find the element to remove using exact match.
-        node = tree.xpath("/library/{0}/isbn[text()='{1}']/ancestor::{0}".format(self._libtype, element))
-        if not node:
-            return 1
-        # Remove element's node.
-        nodes.remove(node[0])
-        # Write to file.
-        return self._write_tree(nodes)
-    # End of method remove_element.
+        subelement = etree.SubElement(element, "title")
+        subelement.text = elementdict["title"]
+        # Add author subelements.
+        subelement = etree.SubElement(element, "authors")
+        for author in elementdict["authors"]:
+            authorelement = etree.SubElement(subelement, "author")
+            authorelement.text = author
+        subelement = etree.SubElement(element, "category")
+        subelement.text = elementdict["category"]
+        # Add format subelements.
+        subelement = etree.SubElement(element, "formats")
+        for bformat in elementdict["formats"]:
+            formatelement = etree.SubElement(subelement, "format")
+            formatelement.text = bformat
+        subelement = etree.SubElement(element, "isbn")
+        subelement.text = elementdict["isbn"]
+        # Add optional subelements.
+        if "publicationdate" in elementdict:
+            subelement = etree.SubElement(element, "publicationdate")
+            subelement.text = elementdict["publicationdate"]
+        if "publisher" in elementdict:
+            subelement = etree.SubElement(element, "publisher")
+            subelement.text = elementdict["publisher"]
+        if "edition" in elementdict:
+            subelement = etree.SubElement(element, "edition")
+            subelement.text = elementdict["edition"]
+        if "pagenumber" in elementdict:
+            subelement = etree.SubElement(element, "pagenumber")
+            subelement.text = elementdict["pagenumber"]
+        if "lastpageread" in elementdict:
+            subelement = etree.SubElement(element, "lastpageread")
+            subelement.text = elementdict["lastpageread"]
+        if "shop" in elementdict:
+            subelement = etree.SubElement(element, "shop")
+            subelement.text = elementdict["shop"]
+        subelement = etree.SubElement(element, "finished")
+        subelement.text = elementdict["finished"]
+        return element
+    # End of method _create_element.
 
     """
     Method: show_table
@@ -522,27 +358,22 @@ class BookManager(Manager):
         isbnwidth = 13
         finishedwidth = 8
         # Prepare for displaying.
-        for item in elements:
+        records = self._records(elements, ["title", "authors", "category", "formats", "isbn", "finished"])
+        for record in records:
             # Title width.
-            width = len(item[0].text.strip())
+            width = len(record.title)
             if titlewidth < width:
                 titlewidth = width
             # Author width.
-            authors = []
-            for author in item[1]:
-                authors.append(author.text.strip())
-            width = len(", ".join(authors))
+            width = len(", ".join(record.authors))
             if authorwidth < width:
                 authorwidth = width
             # Category width.
-            width = len(item[2].text.strip())
+            width = len(record.category)
             if categorywidth < width:
                 categorywidth = width
             # Format width.
-            formats = []
-            for bformat in item[3]:
-                formats.append(bformat.text.strip())
-            width = len(", ".join(formats))
+            width = len(", ".join(record.formats))
             if formatwidth < width:
                 formatwidth = width
         # Display header.
@@ -557,22 +388,14 @@ class BookManager(Manager):
                 "-" * titlewidth, "-" * authorwidth, "-" * categorywidth,
                 "-" * formatwidth, "-" * isbnwidth, "-" * finishedwidth))
         # Iterate though result as needed and display book information.
-        for item in elements:
-            authors = []
-            for author in item[1]:
-                authors.append(author.text.strip())
-            authorstr = ", ".join(authors)
-            formats = []
-            for bformat in item[3]:
-                formats.append(bformat.text.strip())
-            formatstr = ", ".join(formats)
+        for record in records:
             print("{:{}} | {:{}} | {:{}} | {:{}} | {:{}} | {:{}}".format(
-                item[0].text.strip(), titlewidth,
-                authorstr, authorwidth,
-                item[2].text.strip(), categorywidth,
-                formatstr, formatwidth,
-                item[4].text.strip(), isbnwidth,
-                item[-1].text.strip(), finishedwidth))
+                record.title, titlewidth,
+                ", ".join(record.authors), authorwidth,
+                record.category, categorywidth,
+                ", ".join(record.formats), formatwidth,
+                record.isbn, isbnwidth,
+                record.finished, finishedwidth))
     # End of method show_table.
 
     # Display methods.
@@ -633,36 +456,8 @@ class BookManager(Manager):
     :return dict: The python dictionary version of the XML node.
     """
     def _xmlitem_to_dict(self, element):
-        # Create python dictionary parsing element's values.
-        bookdict = {}
-        for item in element.iterchildren():
-            # Making sure authors and formats tags have text,
-            # so that they will be iterated.
-            if item.tag == "authors":
-                item.text = " "
-            if item.tag == "formats":
-                item.text = " "
-
-            # Elements in book.
-            if item.text is not None:
-                bookdict[item.tag] = item.text.strip()
-                if item.tag == "authors":
-                    authors = []
-                    # Elements in authors.
-                    for subitem in item.iterchildren():
-                        if subitem.text is not None:
-                            authors.append(subitem.text.strip())
-                if item.tag == "formats":
-                    formats = []
-                    # Elements in formats.
-                    for subitem in item.iterchildren():
-                        if subitem.text is not None:
-                            formats.append(subitem.text.strip())
-        # Add lists to book dictionary.
-        bookdict["authors"] = authors
-        bookdict["formats"] = formats
-
-        return bookdict
+        # Create python dictionary from the element's record.
+        return BookRecord.from_node(element).to_dict()
     # End of method _xmlitem_to_dict.
 
     """
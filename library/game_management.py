@@ -7,6 +7,7 @@ import csv
 from lxml import etree
 from library.management import Manager
 from library.support.utility import Utility
+from library.support.records import GameRecord
 
 """
 Class: GameManager
@@ -18,120 +19,87 @@ The class also supports validation of the XML file given an XSD schema, so that
 it may be used independently.
 """
 class GameManager(Manager):
+    # Record fields of exported CSV files.
+    _csvfields = ["title", "shop", "finished", "installers"]
+
     """
     Initializer
     """
-    def __init__(self, storageroot, libfile, schemafile):
+    def __init__(self, storageroot, libfile, schemafile, **options):
         # Library type.
         libtype = "game"
         # Allow sorting element tags.
         sortingtags = ["title", "shop", "finished"]
         # Unique key.
         uniquekey = "title"
+        # Element tags supporting lookups and counts by value.
+        grouptags = ["shop", "finished", "system"]
+        # Element tags of library statistics.
+        facettags = ["shop", "finished", "system"]
         # Call parent initializer.
-        super().__init__(storageroot, libfile, schemafile, libtype, sortingtags, uniquekey)
+        super().__init__(storageroot, libfile, schemafile, libtype, sortingtags, uniquekey, GameRecord, grouptags, facettags, **options)
     # End of initializer.
 
     # File import and export functionality.
     """
-    Method: import_csv
+    Method: _csv_element
 
-    Imports a CSV file as the XML library file.
+    Creates a library element from a CSV row.
     Only fields listed in sortingtags and installer element's system tag are supported.
 
-    Character set: UTF-8
-    Field delimiter: ,
-    Text delimiter: \
-
     Valid CSV header:
     Title,Shop,Finished,System
 
-    :param str impfile: the file to import.
-    :return int: 0 on success, 1 if CSV header is not valid and 2 in case of filesystem write error.
+    :param dict row: The CSV row values by column name.
+    :return etree.Element: The new element.
+    :raise KeyError: If a column is missing.
     """
-    def import_csv(self, impfile):
-        try:
-            # List of games.
-            games = []
-            with open(impfile, newline="") as csvfile:
-                filereader = csv.DictReader(csvfile, quotechar="\\")
-                for row in filereader:
-                    # Create new element from elementdict.
-                    element = etree.Element(self._libtype)
-                    # Add subelements.
-                    subelement = etree.SubElement(element, "title")
-                    subelement.text = row["Title"]
-                    subelement = etree.SubElement(element, "shop")
-                    subelement.text = row["Shop"]
-                    subelement = etree.SubElement(element, "finished")
-                    subelement.text = row["Finished"]
-                    # Add installer subelements.
-                    if row["System"] != "":
-                        systems = row["System"].split(" ")
-                        for system in systems:
-                            subelement = etree.SubElement(element, "installer")
-                            systemelement = etree.SubElement(subelement, "system")
-                            systemelement.text = system
-                    # Add new element to games list.
-                    games.append(element)
-                # Write the elements to a new library file.
-                wgames = self._write_tree(games)
-                if wgames != 0:
-                    return wgames
-        except OSError:
-            return 2
-        except KeyError:
-            return 1
-        # File import was successful.
-        return 0
-    # End of method import_csv.
+    def _csv_element(self, row):
+        # Create new element from row.
+        element = etree.Element(self._libtype)
+        # Add subelements.
+        subelement = etree.SubElement(element, "title")
+        subelement.text = row["Title"]
+        subelement = etree.SubElement(element, "shop")
+        subelement.text = row["Shop"]
+        subelement = etree.SubElement(element, "finished")
+        subelement.text = row["Finished"]
+        # Add installer subelements.
+        if row["System"] != "":
+            systems = row["System"].split(" ")
+            for system in systems:
+                subelement = etree.SubElement(element, "installer")
+                systemelement = etree.SubElement(subelement, "system")
+                systemelement.text = system
+        return element
+    # End of method _csv_element.
 
     """
-    Method: export_csv
+    Method: _csv_header
 
-    Exports XML library file as a CSV file.
-    Only fields listed in sortingtags and installer element's system tag are supported.
+    Gets the header row of exported CSV files.
+
+    :return list: List of str, the column names.
+    """
+    def _csv_header(self):
+        return [self._sortingtags[0].title(), self._sortingtags[1].title(), self._sortingtags[2].title(), "System"]
+    # End of method _csv_header.
 
-    Character set: UTF-8
-    Field delimiter: ,
-    Text delimiter: \
+    """
+    Method: _csv_row
+
+    Gets the CSV row of an item.
+    Only fields listed in sortingtags and installer element's system tag are supported.
 
     Valid CSV header:
     Title,Shop,Finished,System
 
-    :param str expfile: the file to export.
-    :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
+    :param Record record: The item record, with the fields of _csvfields decoded.
+    :return list: List of str, the column values.
     """
-    def export_csv(self, expfile):
-        try:
-            # Open CSV file for writing.
-            with open(expfile, "w", newline = "") as csvfile:
-                filewriter = csv.writer(csvfile, quotechar = "\\", quoting = csv.QUOTE_MINIMAL)
-                # Write header row.
-                filewriter.writerow([self._sortingtags[0].title(), self._sortingtags[1].title(), self._sortingtags[2].title(), "System"])
-                # Get all items
-                items = self.get_all_elements()
-                # Check for errors before proceed.
-                if isinstance(items, int):
-                    return items
-                # Check if library is empty.
-                if items is None:
-                    return 0
-                # Write items to CSV file.
-                for item in items:
-                    system = []
-                    # Check if installer element exists.
-                    itemlength = len(item)
-                    if itemlength > 3:
-                        for i in range(3, itemlength):
-                            system.append(item[i][0].text)
-                    # Write row.
-                    filewriter.writerow([item[0].text, item[1].text, item[2].text, " ".join(system)])
-        except OSError:
-            return 2
-        # File export was successful.
-        return 0
-    # End of method export_csv.
+    def _csv_row(self, record):
+        return [record.title, record.shop, record.finished, " ".join(record.values("system"))]
+    # End of method _csv_row.
 
     # Storage management methods.
     """
@@ -241,104 +209,9 @@ class GameManager(Manager):
 
     # Element manipulation methods.
     """
-    Method: search_elements
-
-    Search for elements containing a given value.
-
-    :param str element: The element tag containing the value. Should be in _sortingtags list.
-    :param str value: The value inside element tag to search for.
-    :param bool ascending[=True]: The order to sort the results.
-    :return int_or_list_or_None: Union[int, list, None].
-    """
-    def search_elements(self, element, value, ascending = True):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        if element not in self._sortingtags:
-            return None
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Search for elements containing the value.
-        tnodes = tree.xpath("/library/{0}/{1}[contains(translate(., '{3}', '{4}'), '{2}')]/ancestor::{0}".format(self._libtype, element, value.lower(), self._uppercase, self._lowercase))
-
-        # Return elements if exist or none if list is empty.
-        if tnodes:
-            # Sort the list.
-            index = self._sortingtags.index(element)
-            tnodes.sort(key = lambda element: element[index].text.title(), reverse = not ascending)
-            return tnodes
-        else:
-            return None
-    # End of method search_elements.
-
-    """
-    Method: get_all_elements
+    Method: _create_element
 
-    Gets all elements in the specified order.
-
-    :param str element[=None]: The element tag on which get will be based. Should be in _sortingtags list.
-    :param bool ascending[=True]: The order to sort the results.
-    :return int_or_list_or_None: Union[int, list, None].
-    """
-    def get_all_elements(self, element = None, ascending = True):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Get a list of all elements.
-        tnodes = tree.xpath("/library/{}".format(self._libtype))
-
-        # Return elements if exist or none if list is empty.
-        if tnodes:
-            # If element is None, title is used.
-            if element is None:
-                element = "title"
-            # Sort the list.
-            index = self._sortingtags.index(element)
-            tnodes.sort(key = lambda element: element[index].text.title(), reverse = not ascending)
-            return tnodes
-        else:
-            return None
-    # End of method get_all_elements.
-
-    """
-    Method: get_element
-
-    Gets an element by unique value.
-
-    :param str element: The exact value in element title.
-    :return int_or_etree.Element_or_None: Union[int, etree.Element, None].
-    """
-    def get_element(self, element):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Find node.
-        # Scheme validation garanties unique key value, so a list containing
-        # only one element on an empty one will be returned.
-        tnodes = tree.xpath("/library/{0}/title[text()='{1}']/ancestor::{0}".format(self._libtype, element))
-
-        # Return element if exists or none if list is empty
-        if tnodes:
-            return tnodes[0]
-        else:
-            return None
-    # End of method get_element.
-
-    """
-    Method: add_element
-
-    Adds an element.
+    Creates a library element from its python dictionary form.
 
     Python dictionary form:
     {
@@ -348,62 +221,36 @@ class GameManager(Manager):
         ]
     }
 
-    :param dict elementdict: The python dictionary containing the values of the element to be added to library.
-    :return int: 0 on success, 1 on dictionary key error, 2 on write file error and 3 on validation error.
+    :param dict elementdict: The python dictionary containing the values of the element.
+    :return etree.Element: The new element.
+    :raise KeyError: If a mandatory value is missing.
     """
-    def add_element(self, elementdict):
+    def _create_element(self, elementdict):
         # Create new element from elementdict.
         element = etree.Element(self._libtype)
-        try:
-            subelement = etree.SubElement(element, "title")
-            subelement.text = elementdict["title"]
-            subelement = etree.SubElement(element, "shop")
-            subelement.text = elementdict["shop"]
-            subelement = etree.SubElement(element, "finished")
-            subelement.text = elementdict["finished"]
-
-            # Get installer list.
-            if "installer" in elementdict:
-                for installer in elementdict["installer"]:
-                    installertag = etree.SubElement(element, "installer")
-                    subelement = etree.SubElement(installertag, "system")
-                    subelement.text = installer["system"]
-                    if "lastupdated" in installer:
-                        subelement = etree.SubElement(installertag, "lastupdated")
-                        subelement.text = installer["lastupdated"]
-                    # Get filename list
-                    if "filename" in installer:
-                        for filename in installer["filename"]:
-                            subelement = etree.SubElement(installertag, "filename")
-                            subelement.text = filename
-            # Write to file.
-            return self._add_element_to_tree(element)
-        except KeyError:
-            return 1
-    # End of method add_element.
-
-    """
-    Method: remove_element
-
-    Removes an element.
-
-    :param str element: The exact value in element title.
-    :return int: 0 on success, 1 in case no node found, 2 on write file error and 3 on validation error.
-    """
-    def remove_element(self, element):
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Get a list of all elements.
-        nodes = tree.xpath("/library/{}".format(self._libtype))
-        # Find the element to remove using exact match.
-        node = tree.xpath("/library/{0}/title[text()='{1}']/ancestor::{0}".format(self._libtype, element))
-        if not node:
-            return 1
-        # Remove element's node.
-        nodes.remove(node[0])
-        # Write to file.
-        return self._write_tree(nodes)
-    # End of method remove_element.
+        subelement = etree.SubElement(element, "title")
+        subelement.text = elementdict["title"]
+        subelement = etree.SubElement(element, "shop")
+        subelement.text = elementdict["shop"]
+        subelement = etree.SubElement(element, "finished")
+        subelement.text = elementdict["finished"]
+
+        # Get installer list.
+        if "installer" in elementdict:
+            for installer in elementdict["installer"]:
+                installertag = etree.SubElement(element, "installer")
+                subelement = etree.SubElement(installertag, "system")
+                subelement.text = installer["system"]
+                if "lastupdated" in installer:
+                    subelement = etree.SubElement(installertag, "lastupdated")
+                    subelement.text = installer["lastupdated"]
+                # Get filename list
+                if "filename" in installer:
+                    for filename in installer["filename"]:
+                        subelement = etree.SubElement(installertag, "filename")
+                        subelement.text = filename
+        return element
+    # End of method _create_element.
 
     """
     Method: show_table
@@ -416,24 +263,24 @@ class GameManager(Manager):
         # Calculate max column widths.
         titlewidth = 5
         shopwidth = 4
-        for item in elements:
+        records = self._records(elements, ["title", "shop", "finished", "installers"])
+        for record in records:
             # Title width.
-            width = len(item[0].text.strip())
+            width = len(record.title)
             if titlewidth < width:
                 titlewidth = width
             # Shop width.
-            width = len(item[1].text.strip())
+            width = len(record.shop)
             if shopwidth < width:
                 shopwidth = width
         # Display header.
         print("{:{}} | {:{}} | {:8} | {}".format(self._sortingtags[0].title(), titlewidth, self._sortingtags[1].title(), shopwidth, self._sortingtags[2].title(), "System"))
         print("{}-|-{}-|-{}-|-{}".format("-" * titlewidth, "-" * shopwidth, "-" * 8, "-" * 6))
         # Iterate though result as needed and display game information.
-        for item in elements:
-            print("{:{}} | {:{}} | {:8} | ".format(item[0].text.strip(), titlewidth, item[1].text.strip(), shopwidth, item[2].text.strip()), end = "")
-            for subitem in item:
-                if subitem.tag == "installer":
-                    print("{} ".format(subitem[0].text.strip()), end = "")
+        for record in records:
+            print("{:{}} | {:{}} | {:8} | ".format(record.title, titlewidth, record.shop, shopwidth, record.finished), end = "")
+            for system in record.values("system"):
+                print("{} ".format(system), end = "")
             print()
     # End of method show_table.
 
@@ -491,33 +338,8 @@ class GameManager(Manager):
     :return dict: The python dictionary version of the XML node.
     """
     def _xmlitem_to_dict(self, element):
-        # Create python dictionary parsing element's values.
-        gamedict = {}
-        installer = []
-        for item in element.iterchildren():
-            # Making sure installer tag has text, so that it will be iterated.
-            if item.tag == "installer":
-                item.text = " "
-            # Elements in game.
-            if item.text is not None:
-                gamedict[item.tag] = item.text.strip()
-                if item.tag == "installer":
-                    installerdict = {}
-                    filename = []
-                    # Elements in installer.
-                    for subitem in item.iterchildren():
-                        if subitem.text is not None:
-                            if subitem.tag == "filename":
-                                filename.append(subitem.text.strip())
-                            else:
-                                installerdict[subitem.tag] = subitem.text.strip()
-                    if filename:
-                        installerdict["filename"] = filename
-                    installer.append(installerdict)
-        if installer:
-            gamedict["installer"] = installer
-
-        return gamedict
+        # Create python dictionary from the element's record.
+        return GameRecord.from_node(element).to_dict()
     # End of method _xmlitem_to_dict.
 
     """
@@ -2,11 +2,22 @@
 
 # imports
 import os
+import io
 import sys
+import csv
+import json
 import shutil
 import platform
+import heapq
+import copy
+import threading
+import contextlib
 from lxml import etree
 from library.support.utility import Utility
+from library.support.index import LibraryIndex
+from library.support.collation import Collator
+from library.support.records import Record
+from library.support.snapshot import Snapshot
 
 """
 Class: Manager
@@ -16,21 +27,72 @@ The Manager class uses XML to store and manage elements.
 Contents maybe created, parsed and destroyed.
 """
 class Manager:
+    # Size of the chunks of CSV files imported by more than one process.
+    _csvchunksize = 1 << 20
+    # Record fields of exported CSV files, all if None.
+    _csvfields = None
+
     """
     Initializer
     """
-    def __init__(self, storageroot, libfile, schemafile, libtype, sortingtags, uniquekey):
+    def __init__(self, storageroot, libfile, schemafile, libtype, sortingtags, uniquekey, recordclass = Record, grouptags = None, facettags = None, progresstags = None, rangetags = None, accentfold = False, collator = None, columnar = False, snapshots = True, batchwindow = None, batchsize = 100, journal = False, journallimit = 1 << 20):
         super().__init__()
         # Initialize library variables.
         self._storageroot = storageroot
         self._libtype = libtype
         self._xmlfile = os.path.join(self._storageroot, self._libtype, libfile)
         self._xsdfile = os.path.join(self._storageroot, self._libtype, schemafile)
+        # Binary snapshot of the library, for loading without parsing.
+        self._snapshotfile = self._xmlfile + ".snapshot"
+        self._snapshots = snapshots
         self._sortingtags = sortingtags
         self._uniquekey = uniquekey
-        # Initialize character sets for case inseincitive rearches.
-        self._uppercase = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        self._lowercase = 'abcdefghijklmnopqrstuvwxyz'
+        # Record class decoding library elements.
+        self._recordclass = recordclass
+        # Element tags supporting lookups by value and counts by value.
+        self._grouptags = grouptags if grouptags is not None else []
+        # Element tags reported by library statistics.
+        self._facettags = facettags if facettags is not None else []
+        # Element tags of the number of units and of the last unit reached, for progress statistics.
+        self._progresstags = progresstags
+        # Integer and date element tags supporting range queries, mapped to "int" or "date".
+        self._rangetags = rangetags if rangetags is not None else {}
+        # Calculate statistics using the columnar table instead of counters.
+        self._columnar = columnar
+        # All element tags of the library index.
+        self._indexedtags = list(self._sortingtags)
+        for tag in self._grouptags + self._facettags + list(self._progresstags or ()):
+            if tag not in self._indexedtags:
+                self._indexedtags.append(tag)
+        # Full text search weights of element tags, 1 if not listed.
+        self._fieldweights = {"title": 3.0, "author": 2.0, "artist": 2.0, self._uniquekey: 2.0}
+        # Element tags supporting approximate searches.
+        self._fuzzytags = [tag for tag in ["title", "author", "artist"] if tag in self._sortingtags]
+        # Strip accents for case insensitive searches.
+        self._accentfold = accentfold
+        # Sorting keys generator.
+        self._collator = collator if collator is not None else Collator()
+        # In memory index of the library file, loaded on demand.
+        self._index = None
+        # Stamps of the library and schema files when the library file has last been validated.
+        self._validstamp = None
+        # Serializes commits of concurrent callers.
+        self._writelock = threading.RLock()
+        # Journal of mutations applying to the library file, if writes are journaled.
+        self._journal = None
+        if journal:
+            from library.support.journal import Journal
+            self._journal = Journal(self._xmlfile + ".journal")
+        # Hash of the library file the journal applies to, calculated on demand.
+        self._journalbase = None
+        # Size of the journal, which triggers its compaction.
+        self._journallimit = journallimit
+        # Coalesces concurrent mutations arriving within batchwindow seconds, if set.
+        self._scheduler = None
+        if batchwindow is not None:
+            # Imported only when set, since the scheduler depends on concurrent.futures.
+            from library.support.scheduler import WriteScheduler
+            self._scheduler = WriteScheduler(self._commit, batchwindow, batchsize)
     # End of initializer.
 
     # Implemented methods, whis may be called from a Manager instance object.
@@ -41,7 +103,7 @@ class Manager:
     """
     def show_menu(self):
         # Initialize local variables
-        avchoices = range(7)
+        avchoices = range(11)
         choice = None
 
         # Generate menu
@@ -56,7 +118,10 @@ class Manager:
             print("4. Add new item")
             print("5. Edit existing item")
             print("6. Remove item")
-            print("9. Storage utilities")
+            print("7. Search as you type")
+            print("8. Search in all fields")
+            print("9. Library statistics")
+            print("10. Storage utilities")
             print("0. Exit library")
             # Get user choice.
             try:
@@ -82,7 +147,15 @@ class Manager:
                 self.show_edit_element()
             elif choice == 6:
                 self.show_remove_element()
+            elif choice == 7:
+                self.show_incremental_search()
+            elif choice == 8:
+                Utility.clear()
+                self.show_find_elements()
             elif choice == 9:
+                Utility.clear()
+                self.show_statistics(menu = True)
+            elif choice == 10:
                 self.show_utility_menu()
             choice = None
     # End of method show_menu.
@@ -108,6 +181,7 @@ class Manager:
             print("3. Restore library from backup")
             print("4. Create new empty library")
             print("5. Restore library schema")
+            print("6. Compact library journal")
             print("0. Back")
             # Get user choice.
             try:
@@ -128,6 +202,8 @@ class Manager:
                 self.show_create_library()
             elif choice == 5:
                 self.show_restore_schema()
+            elif choice == 6:
+                self.show_compact()
             choice = None
     # End of method show_utility_menu.
 
@@ -238,6 +314,26 @@ class Manager:
         input("Press 'Enter' to continue: ")
     # End of method show_backup.
 
+    """
+    Method: show_compact
+
+    Shows messages about folding the journal into the library file.
+    """
+    def show_compact(self):
+        Utility.clear()
+        if self._journal is None:
+            print("Library changes are not journaled.")
+        else:
+            result = self.compact()
+            if result == 0:
+                print("Library journal has been compacted successfully.")
+            elif result == 2:
+                print("A filesystem error occurred. Make sure you have write provileges in '{}'.".format(os.path.join(self._storageroot, self._libtype)))
+            else:
+                print("Library file '{}' is not valid.".format(self._xmlfile))
+        input("Press 'Enter' to continue: ")
+    # End of method show_compact.
+
     """
     Method: show_restore
 
@@ -336,7 +432,11 @@ class Manager:
     Returns 0 if validates, 1 if not and 2 in case of error.
     """
     def validate(self):
-        return Utility.validate(self._xsdfile, self._xmlfile)
+        validstamp = (self._file_stamp(), self._schema_stamp())
+        result = Utility.validate(self._xsdfile, self._xmlfile)
+        if result == 0:
+            self._validstamp = validstamp
+        return result
     # End of method validate.
 
     """
@@ -347,6 +447,9 @@ class Manager:
     :return int: 0 on success and 2 in case of error.
     """
     def backup(self):
+        # Journaled changes should be part of the backup.
+        if self.compact() == 2:
+            return 2
         try:
             shutil.copy2(self._xmlfile, self._xmlfile + ".back")
             return 0
@@ -362,11 +465,15 @@ class Manager:
     :return int: 0 on success and 2 in case of error.
     """
     def restore(self):
-        try:
-            shutil.copy2(self._xmlfile + ".back", self._xmlfile)
-            return 0
-        except OSError:
-            return 2
+        with self._writelock, self._journal or contextlib.nullcontext():
+            try:
+                shutil.copy2(self._xmlfile + ".back", self._xmlfile)
+                # Changes journaled since the backup are discarded along with the library file.
+                if self._journal is not None:
+                    self._journal.remove()
+                return 0
+            except OSError:
+                return 2
     # End of method restore.
 
     """
@@ -391,47 +498,168 @@ class Manager:
 
         # Write xml tree to storage file
         xmlout = etree.ElementTree(root)
+        with self._writelock, self._journal or contextlib.nullcontext():
+            try:
+                xmlout.write(self._xmlfile, xml_declaration=True, encoding="UTF-8", pretty_print=True)
+                # Changes of the previous library are discarded along with it.
+                if self._journal is not None:
+                    self._journal.remove()
+                return 0
+            except OSError:
+                return 2
+    # End of method create_library.
+
+    """
+    Method: import_csv
+
+    Imports a CSV file to the XML library file.
+    Rows are read, checked and written one at a time, so that memory does not
+    grow with the size of the file. Rows which are not valid, or repeat the
+    unique value of an earlier row, are reported, and the library is changed
+    only if there are none, so that a file is imported either as a whole or
+    not at all. The CSV header is specific to the library type.
+
+    Modes:
+    replace: the library is replaced by the items of the file.
+    upsert: items of the file are added, or replace the library items with the same unique value.
+    merge: items of the file are added, or their values replace the values of the library items with the same unique value, keeping values missing from the file.
+    Upsert and merge modes write only new and changed items, with a single write.
+
+    With more than one job, the file is split into chunks of whole records,
+    which are converted and checked by a pool of processes. Their elements are
+    written in file order and their unique values are checked while written.
+
+    Character set: UTF-8
+    Field delimiter: ,
+    Text delimiter: \
+
+    :param str impfile: the file to import.
+    :param list report[=None]: List to append a (line number, message) tuple of every row which is not valid to, in line order.
+    :param int jobs[=1]: The number of processes converting rows.
+    :param str mode[="replace"]: The import mode, "replace", "upsert" or "merge".
+    :param dict counts[=None]: Dictionary to set the number of "inserted", "updated" and "unchanged" items to.
+    :return int: 0 on success, 1 if CSV header is not valid or library file is not valid, 2 in case of filesystem error and 3 if rows are not valid or on validation error.
+    """
+    def import_csv(self, impfile, report = None, jobs = 1, mode = "replace", counts = None):
+        if report is None:
+            report = []
+        if counts is None:
+            counts = {}
+        counts.update(inserted = 0, updated = 0, unchanged = 0)
         try:
-            xmlout.write(self._xmlfile, xml_declaration=True, encoding="UTF-8", pretty_print=True)
-            return 0
+            if jobs > 1:
+                rows = self._csv_rows_parallel(impfile, report, jobs)
+            else:
+                rows = self._csv_file_rows(impfile, report)
+            result = self._import_rows(rows, report, mode, counts)
         except OSError:
             return 2
-    # End of method create_library.
+        except KeyError:
+            return 1
+        finally:
+            report.sort()
+        if result != 0:
+            return result
+        # File import was successful.
+        return 0
+    # End of method import_csv.
 
     """
-    Method: edit_element
+    Method: export_csv
 
-    Edits an element.
+    Exports XML library file as a CSV file, written next to it first and
+    moved in place once complete.
+    Sorted exports are written from the library index. Unsorted exports are
+    streamed from the library file in file order, in constant memory, and the
+    file is validated while read, unless it has been validated since its last
+    change. The library index is used instead, if it is loaded already or the
+    library has journaled changes.
 
-    :return int: 0 on success, 1 in case of directory tree error and 2 in case of file error.
+    Character set: UTF-8
+    Field delimiter: ,
+    Text delimiter: \
+
+    :param str expfile: the file to export.
+    :param bool sort[=True]: Sort items by title, otherwise keep the order of the library file.
+    :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
     """
-    def edit_element(self, originalkey, elementdict):
-        # Initialization is not necessary, but helps readability.
-        value = 0
+    def export_csv(self, expfile, sort = True):
+        def write(csvfile, records):
+            filewriter = csv.writer(csvfile, quotechar = "\\", quoting = csv.QUOTE_MINIMAL)
+            filewriter.writerow(self._csv_header())
+            for record in records:
+                filewriter.writerow(self._csv_row(record))
+        return self._export(expfile, sort, self._csvfields, write)
+    # End of method export_csv.
+
+    """
+    Method: import_jsonl
+
+    Imports a JSON Lines file to the library, one line at a time: every line
+    holds an item in the python dictionary form used to add items, so that
+    every value of the library is imported. Lines which are not valid, or
+    repeat the unique value of an earlier line, are reported, and the library
+    is changed only if there are none. Modes are the modes of import_csv.
+
+    Character set: UTF-8
+
+    :param str impfile: the file to import.
+    :param list report[=None]: List to append a (line number, message) tuple of every line which is not valid to, in line order.
+    :param str mode[="replace"]: The import mode, "replace", "upsert" or "merge".
+    :param dict counts[=None]: Dictionary to set the number of "inserted", "updated" and "unchanged" items to.
+    :return int: 0 on success, 1 if library file is not valid, 2 in case of filesystem error and 3 if lines are not valid or on validation error.
+    """
+    def import_jsonl(self, impfile, report = None, mode = "replace", counts = None):
+        if report is None:
+            report = []
+        if counts is None:
+            counts = {}
+        counts.update(inserted = 0, updated = 0, unchanged = 0)
         try:
-            # Create a temporary library backup.
-            temp =  self._xmlfile + ".temp"
-            shutil.copy2(self._xmlfile, temp)
-            # Remove original element.
-            value = self.remove_element(originalkey)
-            if value == 0:
-                # Save new file containing the edited element.
-                value = self.add_element(elementdict)
-                if value != 0:
-                    # Restore original file from temp.
-                    shutil.copy2(temp, self._xmlfile)
-        except OSError:
+            result = self._import_rows(self._jsonl_rows(impfile, report), report, mode, counts)
+        except (OSError, UnicodeDecodeError):
             return 2
-        finally:
-            # Remove temporary file.
-            # If a new exception will be raised here, keep the temporary file on
-            # disk, so that library restoration may still be possible and let
-            # the exception bubbling.
-            # Since the users has the privilege to create the file, its revoval
-            # should have been possible too.
-            os.remove(temp)
+        # File import was successful, unless result is not 0.
+        return result
+    # End of method import_jsonl.
+
+    """
+    Method: export_jsonl
+
+    Exports XML library file as a JSON Lines file, one item per line in the
+    python dictionary form used to add items, holding every value of the item.
+    Items are read as by export_csv.
+
+    Character set: UTF-8
+
+    :param str expfile: the file to export.
+    :param bool sort[=True]: Sort items by title, otherwise keep the order of the library file.
+    :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
+    """
+    def export_jsonl(self, expfile, sort = True):
+        def write(jsonfile, records):
+            encoder = json.JSONEncoder(ensure_ascii = False)
+            for record in records:
+                jsonfile.write(encoder.encode(record.to_dict()))
+                jsonfile.write("\n")
+        return self._export(expfile, sort, None, write)
+    # End of method export_jsonl.
 
-        return value
+    """
+    Method: edit_element
+
+    Edits an element, replacing it with a new element in a single write.
+
+    :param str originalkey: The exact value in unique element tag of the element to edit.
+    :param dict elementdict: The python dictionary containing the new values of the element.
+    :return int: 0 on success, 1 if the element does not exist or on dictionary key error, 2 on write file error and 3 on validation error.
+    """
+    def edit_element(self, originalkey, elementdict):
+        try:
+            element = self._create_element(elementdict)
+        except KeyError:
+            return 1
+        return self._mutate(("edit", originalkey, element, "title"))
     # End of method edit_element.
 
     # Display methods.
@@ -443,8 +671,10 @@ class Manager:
     :param str element[=None]: The element tag containing the value. Should be in _sortingtags list.
     :param str value[=None]: The value inside element tag to search for.
     :param bool ascending[=True]: The order to sort the results.
+    :param bool fuzzy[=False]: Search for approximate matches, best matches first.
+    :param int distance[=2]: The maximum edit distance of every word of approximate matches, at most 2.
     """
-    def show_search_elements(self, element = None, value = None, ascending = True):
+    def show_search_elements(self, element = None, value = None, ascending = True, fuzzy = False, distance = 2):
         menu = None
         # Get all elements
         if element is None:
@@ -454,13 +684,24 @@ class Manager:
             value = input("Enter a value to search for: ")
             elements = self.search_elements(element, value, self.get_sorting_order())
             Utility.clear()
+            # Suggest closest matches.
+            if elements is None and element in self._fuzzytags:
+                print("No item with '{}' containing '{}' has been found.".format(element.title(), value))
+                elements = self.fuzzy_search_elements(element, value, distance)
+                if elements is not None:
+                    print("Closest matches:")
+        elif fuzzy:
+            elements = self.fuzzy_search_elements(element, value, distance, ascending)
         else:
             elements = self.search_elements(element, value, ascending)
         # Display results
         if isinstance(elements, int):
             print("Invalid storage file {}.".format(self._xmlfile))
         elif elements is None:
-            print("No item with '{}' containing '{}' has been found.".format(element.title(), value))
+            if fuzzy:
+                print("No item with '{}' close to '{}' has been found.".format(element.title(), value))
+            elif not menu or element not in self._fuzzytags:
+                print("No item with '{}' containing '{}' has been found.".format(element.title(), value))
         else:
             # Show table of results.
             self.show_table(elements)
@@ -470,6 +711,204 @@ class Manager:
             input("Press 'Enter' to return to menu: ")
     # End of method show_search_elements.
 
+    """
+    Method: show_elements_by
+
+    Shows elements holding a value of an element tag.
+
+    :param str element: The element tag containing the value. Should be in _indexedtags list.
+    :param str value: The exact value or the prefix of values.
+    :param bool prefix[=False]: Show elements holding values starting with value.
+    :param bool ascending[=True]: The order to sort the results by title.
+    """
+    def show_elements_by(self, element, value, prefix = False, ascending = True):
+        elements = self.get_elements_by(element, value, prefix, ascending)
+        # Display results
+        if isinstance(elements, int):
+            print("Invalid storage file {}.".format(self._xmlfile))
+        elif elements is None:
+            print("No item with '{}' {} '{}' has been found.".format(element.title(), "starting with" if prefix else "equal to", value))
+        else:
+            # Show table of results.
+            self.show_table(elements)
+    # End of method show_elements_by.
+
+    """
+    Method: show_count_elements_by
+
+    Shows the number of elements by distinct value of an element tag.
+
+    :param str element: The element tag. Should be in _indexedtags list.
+    """
+    def show_count_elements_by(self, element):
+        counts = self.count_elements_by(element)
+        # Display results
+        if isinstance(counts, int):
+            print("Invalid storage file {}.".format(self._xmlfile))
+        elif counts is None:
+            if element not in self._indexedtags:
+                print("Items cannot be counted by '{}'. Supported elements: {}.".format(element, self._indexedtags))
+            else:
+                print("The library is empty.")
+        else:
+            # Calculate max column width.
+            width = len(element)
+            for count in counts:
+                width = max(width, len(count[0]))
+            print("{:{}} | {}".format(element.title(), width, "Items"))
+            print("{}-|-{}".format("-" * width, "-" * 5))
+            for count in counts:
+                print("{:{}} | {}".format(count[0], width, count[1]))
+    # End of method show_count_elements_by.
+
+    """
+    Method: show_elements_in_range
+
+    Shows elements with an integer or date value within a range.
+
+    :param str element: The element tag. Should be in _rangetags dictionary.
+    :param str low[=None]: The lowest value, unbounded if None.
+    :param str high[=None]: The highest value, unbounded if None.
+    :param bool ascending[=True]: The order to sort the results by element.
+    """
+    def show_elements_in_range(self, element, low = None, high = None, ascending = True):
+        elements = self.get_elements_in_range(element, low, high, ascending)
+        # Display results
+        if isinstance(elements, int):
+            print("Invalid storage file {}.".format(self._xmlfile))
+        elif elements is None:
+            if element not in self._rangetags:
+                print("Items cannot be filtered by range of '{}'. Supported elements: {}.".format(element, list(self._rangetags)))
+            else:
+                print("No item with '{}' from '{}' to '{}' has been found.".format(element.title(), low or "", high or ""))
+        else:
+            # Show table of results.
+            self.show_table(elements)
+    # End of method show_elements_in_range.
+
+    """
+    Method: show_statistics
+
+    Shows library statistics.
+
+    :param bool menu[=None]: Display menu.
+    """
+    def show_statistics(self, menu = None):
+        statistics = self.get_statistics()
+        # Display results
+        if isinstance(statistics, int):
+            print("Invalid storage file {}.".format(self._xmlfile))
+        else:
+            print("Library {} contains {} items.".format(self._libtype.upper(), statistics["total"]))
+            for tag, counts in statistics["facets"]:
+                # Calculate max column width.
+                width = len(tag)
+                for count in counts:
+                    width = max(width, len(count[0]))
+                print()
+                print("{:{}} | {}".format(tag.title(), width, "Items"))
+                print("{}-|-{}".format("-" * width, "-" * 5))
+                for count in counts:
+                    print("{:{}} | {}".format(count[0], width, count[1]))
+            progress = statistics["progress"]
+            if progress is not None and progress.items:
+                print()
+                print("Progress: {} of {} ({:.1f}%), {} of {} items started, {} completed.".format(
+                    progress.reached, progress.units, 100.0 * progress.reached / progress.units,
+                    progress.started, progress.items, progress.completed))
+            values = statistics["values"]
+            print()
+            print("Value dictionary: {} distinct values ({} bytes), {} references, {} bytes saved.".format(
+                values["values"], values["bytes"], values["references"], values["saved"]))
+        # Pause if the method has been called from the menu.
+        if menu is not None:
+            print()
+            input("Press 'Enter' to return to menu: ")
+    # End of method show_statistics.
+
+    """
+    Method: show_find_elements
+
+    Shows elements containing words of a text in any field, best matches first.
+
+    :param str text[=None]: The text to search for.
+    """
+    def show_find_elements(self, text = None):
+        menu = None
+        if text is None:
+            menu = True
+            text = input("Enter words to search for: ")
+            Utility.clear()
+        elements = self.find_elements(text)
+        # Display results
+        if isinstance(elements, int):
+            print("Invalid storage file {}.".format(self._xmlfile))
+        elif elements is None:
+            print("No item containing '{}' has been found.".format(text))
+        else:
+            # Show table of results.
+            self.show_table(elements)
+        # Pause if the method has been called without a text.
+        if menu:
+            print()
+            input("Press 'Enter' to return to menu: ")
+    # End of method show_find_elements.
+
+    """
+    Method: show_incremental_search
+
+    Searches for elements as the user types.
+    Elements having a word of the element tag starting with the typed text are
+    shown after every key press. Each key press narrows the previous results,
+    instead of querying the library again.
+
+    :param str element[=None]: The element tag containing the value. Should be in _sortingtags list.
+    :param int limit[=20]: The maximum number of elements shown while typing.
+    """
+    def show_incremental_search(self, element = None, limit = 20):
+        if element is None:
+            element = self.get_sorting_element()
+        index = self._load_index()
+        if isinstance(index, int):
+            Utility.clear()
+            print("Invalid storage file {}.".format(self._xmlfile))
+            input("Press 'Enter' to return to menu: ")
+            return
+        search = index.prefix_search(element)
+        text = ""
+        key = None
+        while key not in ["", "\r", "\n"]:
+            Utility.clear()
+            print("Search for {} as you type [press 'Enter' to finish]:".format(element))
+            print("> {}".format(text))
+            print()
+            entries = search.items()
+            if entries is not None:
+                if entries:
+                    nodes = heapq.nsmallest(limit, [entry.node for entry in entries], key = lambda node: index.sortkey(node, element))
+                    self.show_table(nodes)
+                    if len(entries) > limit:
+                        print("... {} of {} items shown.".format(limit, len(entries)))
+                else:
+                    print("No item found.")
+            # Get next key press.
+            key = Utility.get_key()
+            if key in ["\x7f", "\b"]:
+                text = text[:-1]
+            elif key.isprintable():
+                text += key
+            search.refine(index.fold(text))
+        # Show all results.
+        entries = search.items()
+        if entries:
+            Utility.clear()
+            nodes = [entry.node for entry in entries]
+            self._sort_nodes(nodes, element)
+            self.show_table(nodes)
+        print()
+        input("Press 'Enter' to return to menu: ")
+    # End of method show_incremental_search.
+
     """
     Method: show_all_elements
 
@@ -618,36 +1057,59 @@ class Manager:
     Valid CSV header is subclass specific.
 
     :param str impfile: the file to import.
-    :return int: 0 on success, 1 if CSV is not valid, 2 in case of filesystem write error and 3 if XML the tree created in memory is not valid.
+    :param int jobs[=1]: The number of processes converting rows.
+    :param str mode[="replace"]: The import mode, "replace", "upsert" or "merge".
+    :return int: 0 on success, 1 if CSV is not valid, 2 in case of filesystem write error and 3 if rows are not valid.
     """
-    def show_import_csv(self, impfile):
+    def show_import_csv(self, impfile, jobs = 1, mode = "replace"):
         result = 1
         # Check if file exists.
         if not os.path.isfile(impfile):
             print("File {} does not exist.".format(impfile))
             return result
         # Import file.
-        result = self.import_csv(impfile)
-        if result == 0:
-            print("File '{}' has been imported successfully.".format(impfile))
-        elif result == 1 or result == 3:
-            print("CSV file is not valid.")
-        else:
-            print("A filesystem error occurred. Make sure you have write provileges in '{}'.".format(os.path.join(self._storageroot, self._libtype)))
+        report = []
+        counts = {}
+        result = self.import_csv(impfile, report, jobs, mode, counts)
+        self._show_import(impfile, result, report, counts, "CSV file is not valid.")
         return result
     # End of method show_import_csv.
 
+    """
+    Method: show_import_jsonl
+
+    Shows import JSON Lines file messages.
+
+    :param str impfile: the file to import.
+    :param str mode[="replace"]: The import mode, "replace", "upsert" or "merge".
+    :return int: 0 on success, 1 if library file is not valid, 2 in case of filesystem error and 3 if lines are not valid.
+    """
+    def show_import_jsonl(self, impfile, mode = "replace"):
+        result = 1
+        # Check if file exists.
+        if not os.path.isfile(impfile):
+            print("File {} does not exist.".format(impfile))
+            return result
+        # Import file.
+        report = []
+        counts = {}
+        result = self.import_jsonl(impfile, report, mode, counts)
+        self._show_import(impfile, result, report, counts, "Library file is not valid.")
+        return result
+    # End of method show_import_jsonl.
+
     """
     Method: show_export_csv
 
     Shows export CSV messages.
 
     :param str expfile: the file to export.
+    :param bool sort[=True]: Sort items by title, otherwise keep the order of the library file.
     :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
     """
-    def show_export_csv(self, expfile):
+    def show_export_csv(self, expfile, sort = True):
         # Export file.
-        result = self.export_csv(expfile)
+        result = self.export_csv(expfile, sort)
         if result == 0:
             print("File '{}' has been exported successfully.".format(expfile))
         else:
@@ -655,12 +1117,59 @@ class Manager:
         return result
     # End of method show_export_csv.
 
+    """
+    Method: show_export_jsonl
+
+    Shows export JSON Lines messages.
+
+    :param str expfile: the file to export.
+    :param bool sort[=True]: Sort items by title, otherwise keep the order of the library file.
+    :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
+    """
+    def show_export_jsonl(self, expfile, sort = True):
+        # Export file.
+        result = self.export_jsonl(expfile, sort)
+        if result == 0:
+            print("File '{}' has been exported successfully.".format(expfile))
+        else:
+            print("An error occurred.")
+        return result
+    # End of method show_export_jsonl.
+
     # Utility methods, which meant to be called only form inside Manager class or its subclasses.
     # Like protected methods in other languages.
+    """
+    Method: _show_import
+
+    Shows the result of a file import.
+
+    :param str impfile: The imported file.
+    :param int result: The result of the import.
+    :param list report: The (line number, message) tuples of lines which are not valid.
+    :param dict counts: The counts of inserted, updated and unchanged items.
+    :param str invalid: The message shown if the result is 1.
+    """
+    def _show_import(self, impfile, result, report, counts, invalid):
+        if result == 0:
+            print("File '{}' has been imported successfully.".format(impfile))
+            print("Items inserted: {inserted}, updated: {updated}, unchanged: {unchanged}.".format(**counts))
+        elif result == 3 and report:
+            print("File '{}' has not been imported, since {} rows are not valid:".format(impfile, len(report)))
+            for line, message in report:
+                print("Line {}: {}".format(line, message))
+        elif result == 3:
+            print("Imported items are not valid.")
+        elif result == 1:
+            print(invalid)
+        else:
+            print("A filesystem error occurred. Make sure you have write provileges in '{}'.".format(os.path.join(self._storageroot, self._libtype)))
+    # End of method _show_import.
+
     """
     Method: _write_tree
 
     Adds nodes to tree and writes it to file.
+    The library index is refreshed on success and dropped on failure.
 
     :param list nodes: The list of etree.Element nodes.
     :return int: 0 on success, 2 on write file error and 3 on validation error.
@@ -676,15 +1185,523 @@ class Manager:
             xmlout = etree.ElementTree(root)
             # Validate tree.
             if Utility.validate_tree(self._xsdfile, xmlout) != 0:
+                self._index = None
                 return 3
-            # Write to file.
+            # Write to a temporary file replacing the library file, so that
+            # readers never see a partially written library.
+            temp = self._xmlfile + ".new"
             try:
-                xmlout.write(self._xmlfile, xml_declaration = True, encoding = "UTF-8", pretty_print = True)
-                return 0
+                xmlout.write(temp, xml_declaration = True, encoding = "UTF-8", pretty_print = True)
+                os.replace(temp, self._xmlfile)
             except OSError:
+                self._index = None
                 return 2
+            # Keep the index up to date, without parsing the file again.
+            stamp = self._file_stamp()
+            if self._index is None:
+                self._index = self._create_index(nodes, stamp)
+            else:
+                self._index.update(nodes, stamp)
+            # The snapshot is refreshed by the next load of the library, or by compaction.
+            return 0
     # End of method _write_tree.
 
+    """
+    Method: _csv_rows
+
+    Creates the library elements of CSV rows, checking every element against
+    the library schema on its own.
+
+    :param csv.DictReader filereader: The CSV rows.
+    :param list report: List to append a (line number, message) tuple of every row which is not valid to.
+    :param int lines[=0]: The number of lines of the file before the rows.
+    :return generator: The (line number, etree.Element) tuples of valid rows.
+    :raise KeyError: If a column is missing.
+    """
+    def _csv_rows(self, filereader, report, lines = 0):
+        xmlschema = etree.XMLSchema(etree.parse(self._xsdfile))
+        # Library holding the element checked.
+        root = etree.Element("library")
+        for row in filereader:
+            try:
+                element = self._csv_element(row)
+            except (AttributeError, TypeError):
+                # Short rows have None values.
+                report.append((lines + filereader.line_num, "Missing values."))
+                continue
+            message = self._invalid(xmlschema, root, element)
+            if message is not None:
+                report.append((lines + filereader.line_num, message))
+                continue
+            yield (lines + filereader.line_num, element)
+    # End of method _csv_rows.
+
+    """
+    Method: _invalid
+
+    Checks an element against the library schema on its own.
+
+    :param etree.XMLSchema xmlschema: The library schema.
+    :param etree.Element root: An empty library element, holding the element while checked.
+    :param etree.Element element: The element.
+    :return str_or_None: Union[str, None], the first schema error, None if the element is valid.
+    """
+    def _invalid(self, xmlschema, root, element):
+        root.append(element)
+        valid = xmlschema.validate(root)
+        root.remove(element)
+        if valid:
+            return None
+        return xmlschema.error_log[0].message
+    # End of method _invalid.
+
+    """
+    Method: _jsonl_rows
+
+    Creates the library elements of the lines of a JSON Lines file, checking
+    every element against the library schema on its own. Empty lines are
+    ignored.
+
+    :param str impfile: The JSON Lines file.
+    :param list report: List to append a (line number, message) tuple of every line which is not valid to.
+    :return generator: The (line number, etree.Element) tuples of valid lines.
+    :raise OSError: If the file cannot be read.
+    """
+    def _jsonl_rows(self, impfile, report):
+        xmlschema = etree.XMLSchema(etree.parse(self._xsdfile))
+        # Library holding the element checked.
+        root = etree.Element("library")
+        decoder = json.JSONDecoder()
+        with open(impfile, encoding = "utf-8") as jsonfile:
+            for number, line in enumerate(jsonfile, 1):
+                if not line.strip():
+                    continue
+                try:
+                    item = decoder.decode(line)
+                except ValueError as error:
+                    report.append((number, "Invalid JSON: {}".format(error)))
+                    continue
+                if not isinstance(item, dict):
+                    report.append((number, "Item should be a JSON object."))
+                    continue
+                try:
+                    element = self._create_element(item)
+                except KeyError as error:
+                    report.append((number, "Missing value {}.".format(error)))
+                    continue
+                except (AttributeError, TypeError, ValueError):
+                    # Values of the wrong type.
+                    report.append((number, "Values are not valid."))
+                    continue
+                message = self._invalid(xmlschema, root, element)
+                if message is not None:
+                    report.append((number, message))
+                    continue
+                yield (number, element)
+    # End of method _jsonl_rows.
+
+    """
+    Method: _import_rows
+
+    Imports the elements of the lines of a file, if every line is valid.
+
+    :param iterable rows: The (line number, etree.Element) tuples of valid lines.
+    :param list report: List to append a (line number, message) tuple of every line which is not valid to.
+    :param str mode: The import mode, "replace", "upsert" or "merge".
+    :param dict counts: The counts of inserted, updated and unchanged items.
+    :return int: 0 on success, 1 if library file is not valid, 2 on write file error and 3 if lines are not valid or on validation error.
+    :raise OSError: If the library file cannot be written.
+    """
+    def _import_rows(self, rows, report, mode, counts):
+        elements = self._unique_elements(rows, report)
+        if mode == "replace":
+            result = 0 if self._write_stream(self._counted(elements, counts), report) else 3
+        else:
+            result = self._import_changes(elements, mode == "merge", counts, report)
+        if report:
+            # Nothing has been imported.
+            counts.update(inserted = 0, updated = 0, unchanged = 0)
+            return 3
+        return result
+    # End of method _import_rows.
+
+    """
+    Method: _csv_file_rows
+
+    Creates the library elements of the rows of a CSV file, checking every
+    element against the library schema on its own.
+
+    :param str impfile: The CSV file.
+    :param list report: List to append a (line number, message) tuple of every row which is not valid to.
+    :return generator: The (line number, etree.Element) tuples of valid rows.
+    :raise KeyError: If a column is missing.
+    :raise OSError: If the file cannot be read.
+    """
+    def _csv_file_rows(self, impfile, report):
+        with open(impfile, newline = "") as csvfile:
+            filereader = csv.DictReader(csvfile, quotechar = "\\")
+            yield from self._csv_rows(filereader, report)
+    # End of method _csv_file_rows.
+
+    """
+    Method: _counted
+
+    Counts elements written as inserted elements.
+
+    :param iterable elements: The etree.Element elements.
+    :param dict counts: The counts of imported items.
+    :return generator: The elements.
+    """
+    def _counted(self, elements, counts):
+        for element in elements:
+            counts["inserted"] += 1
+            yield element
+    # End of method _counted.
+
+    """
+    Method: _import_changes
+
+    Adds new elements and replaces changed elements, with a single write.
+
+    :param iterable elements: The etree.Element elements, with unique values.
+    :param bool merge: Keep values of library elements missing from the new elements.
+    :param dict counts: The counts of inserted, updated and unchanged items.
+    :param list report[=None]: The lines which are not valid, found while elements are read. Nothing is written if there are any.
+    :return int: 0 on success, 1 if library file is not valid, 2 on write file error and 3 on validation error or if lines are not valid.
+    """
+    def _import_changes(self, elements, merge, counts, report = None):
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+        mutations = []
+        for element in elements:
+            key = (element.findtext(self._uniquekey) or "").strip()
+            node = index.get(key)
+            if node is None:
+                mutations.append(("add", element, "title"))
+                counts["inserted"] += 1
+                continue
+            current = index.record(node).to_dict()
+            new = self._xmlitem_to_dict(element)
+            if merge:
+                new = self._merge_dict(current, new)
+            if new == current:
+                counts["unchanged"] += 1
+                continue
+            if merge:
+                element = self._create_element(new)
+            mutations.append(("edit", key, element, "title"))
+            counts["updated"] += 1
+        if report:
+            return 3
+        if not mutations:
+            return 0
+        for code in self._mutate_all(mutations):
+            if code != 0:
+                return code
+        return 0
+    # End of method _import_changes.
+
+    """
+    Method: _merge_dict
+
+    Merges the python dictionary form of an element into another. Values of
+    the new dictionary replace values of the current one, apart from lists of
+    nested items of the same length, which are merged item by item.
+
+    :param dict current: The current python dictionary.
+    :param dict new: The new python dictionary.
+    :return dict: The merged python dictionary.
+    """
+    def _merge_dict(self, current, new):
+        merged = dict(current)
+        for tag, value in new.items():
+            old = current.get(tag)
+            if isinstance(value, list) and isinstance(old, list) and len(value) == len(old) and all(isinstance(item, dict) for item in value + old):
+                merged[tag] = [self._merge_dict(olditem, newitem) for olditem, newitem in zip(old, value)]
+            else:
+                merged[tag] = value
+        return merged
+    # End of method _merge_dict.
+
+    """
+    Method: _unique_elements
+
+    Skips elements repeating the unique value of an earlier element.
+
+    :param iterable rows: The (line number, etree.Element) tuples.
+    :param list report: List to append a (line number, message) tuple of every skipped row to.
+    :return generator: The etree.Element elements with unique values.
+    """
+    def _unique_elements(self, rows, report):
+        keys = set()
+        for line, element in rows:
+            key = (element.findtext(self._uniquekey) or "").strip()
+            if key in keys:
+                report.append((line, "Duplicate {} '{}'.".format(self._uniquekey, key)))
+                continue
+            keys.add(key)
+            yield element
+    # End of method _unique_elements.
+
+    """
+    Method: _csv_rows_parallel
+
+    Creates the library elements of CSV rows in a pool of processes, one chunk
+    of the file per task. At most two chunks per process are converted ahead
+    of the chunk being written.
+
+    :param str impfile: The CSV file.
+    :param list report: List to append a (line number, message) tuple of every row which is not valid to.
+    :param int jobs: The number of processes.
+    :return generator: The (line number, etree.Element) tuples of valid rows, in file order.
+    :raise KeyError: If a column is missing.
+    :raise OSError: If the file cannot be read.
+    """
+    def _csv_rows_parallel(self, impfile, report, jobs):
+        from concurrent.futures import ProcessPoolExecutor
+        chunks = self._csv_chunks(impfile, Manager._csvchunksize)
+        if not chunks:
+            return
+        # The first chunk holds the header.
+        with open(impfile, "rb") as csvfile:
+            header = csvfile.read(chunks[0][1]).decode("utf-8")
+        fieldnames = next(csv.reader(io.StringIO(header, newline = ""), quotechar = "\\"), [])
+        manager = (type(self), self._storageroot, os.path.basename(self._xmlfile), os.path.basename(self._xsdfile))
+        with ProcessPoolExecutor(max_workers = jobs) as executor:
+            futures = []
+            for start, end, lines in chunks[1:]:
+                futures.append(executor.submit(Manager._csv_chunk, manager, impfile, fieldnames, start, end, lines))
+                if len(futures) > 2 * jobs:
+                    yield from self._csv_chunk_rows(futures.pop(0).result(), report)
+            for future in futures:
+                yield from self._csv_chunk_rows(future.result(), report)
+    # End of method _csv_rows_parallel.
+
+    """
+    Method: _csv_chunk_rows
+
+    Decodes the result of a chunk converted by a process.
+
+    :param tuple result: The list of (line number, serialized element) tuples and the report of the chunk.
+    :param list report: List to append the report of the chunk to.
+    :return generator: The (line number, etree.Element) tuples of valid rows.
+    """
+    def _csv_chunk_rows(self, result, report):
+        report.extend(result[1])
+        for line, data in result[0]:
+            yield (line, etree.fromstring(data))
+    # End of method _csv_chunk_rows.
+
+    """
+    Method: _csv_chunk
+
+    Converts and checks the rows of a chunk of a CSV file, in a process of the
+    pool. Elements are serialized, since they cannot be passed between
+    processes.
+
+    :param tuple manager: The manager class and its storage root, library file and schema file.
+    :param str impfile: The CSV file.
+    :param list fieldnames: The column names of the CSV header.
+    :param int start: The offset of the first byte of the chunk.
+    :param int end: The offset after the last byte of the chunk.
+    :param int lines: The number of lines of the file before the chunk.
+    :return tuple: The list of (line number, serialized element) tuples of valid rows and the list of (line number, message) tuples of other rows.
+    :raise KeyError: If a column is missing.
+    """
+    @staticmethod
+    def _csv_chunk(manager, impfile, fieldnames, start, end, lines):
+        managerclass, storageroot, libfile, schemafile = manager
+        manager = managerclass(storageroot, libfile, schemafile, snapshots = False)
+        with open(impfile, "rb") as csvfile:
+            csvfile.seek(start)
+            text = csvfile.read(end - start).decode("utf-8")
+        filereader = csv.DictReader(io.StringIO(text, newline = ""), fieldnames = fieldnames, quotechar = "\\")
+        report = []
+        rows = [(line, etree.tostring(element)) for line, element in manager._csv_rows(filereader, report, lines)]
+        return (rows, report)
+    # End of method _csv_chunk.
+
+    """
+    Method: _csv_chunks
+
+    Splits a CSV file into chunks of whole records. A record ends at a line
+    break outside quoted values, where the number of text delimiters before
+    it is even, since delimiters in values are doubled.
+
+    :param str impfile: The CSV file.
+    :param int chunksize: The size of chunks in bytes, apart from the first chunk, which holds the header.
+    :return list: List of (start, end, lines) tuples of chunks, where lines is the number of lines before the chunk.
+    :raise OSError: If the file cannot be read.
+    """
+    def _csv_chunks(self, impfile, chunksize):
+        quote = b"\\"
+        # Start offsets of chunks and the number of lines before them.
+        starts = [(0, 0)]
+        offset = 0
+        quotes = 0
+        lines = 0
+        # The first record is the header.
+        target = 1
+        with open(impfile, "rb") as csvfile:
+            while True:
+                block = csvfile.read(1 << 20)
+                if not block:
+                    break
+                position = 0
+                while position < len(block):
+                    if offset + position < target:
+                        # Skip to the target size of the chunk.
+                        skip = min(target - offset, len(block))
+                        quotes += block.count(quote, position, skip)
+                        lines += block.count(b"\n", position, skip)
+                        position = skip
+                        continue
+                    newline = block.find(b"\n", position)
+                    if newline < 0:
+                        quotes += block.count(quote, position)
+                        break
+                    quotes += block.count(quote, position, newline)
+                    lines += 1
+                    position = newline + 1
+                    if quotes % 2 == 0:
+                        starts.append((offset + position, lines))
+                        target = offset + position + chunksize
+                offset += len(block)
+        if starts[-1][0] < offset:
+            starts.append((offset, lines))
+        return [(starts[i][0], starts[i + 1][0], starts[i][1]) for i in range(len(starts) - 1)]
+    # End of method _csv_chunks.
+
+    """
+    Method: _write_stream
+
+    Writes elements as the library file, one at a time, without validating
+    the library as a whole. Elements should be valid and their unique values
+    should be unique. The library file is replaced only if every element has
+    been written and, after that, the report is empty.
+
+    :param iterable elements: The etree.Element elements.
+    :param list report[=None]: The lines which are not valid, found while elements are read.
+    :return bool: True if the library file has been replaced.
+    :raise OSError: If the library file cannot be written.
+    """
+    def _write_stream(self, elements, report = None):
+        temp = self._xmlfile + ".new"
+        xsi = "http://www.w3.org/2001/XMLSchema-instance"
+        with self._writelock, self._journal or contextlib.nullcontext():
+            try:
+                with etree.xmlfile(temp, encoding = "UTF-8") as xmlout:
+                    xmlout.write_declaration()
+                    with xmlout.element("library", {"{%s}noNamespaceSchemaLocation" % xsi: os.path.basename(self._xsdfile)}, nsmap = {"xsi": xsi}):
+                        for element in elements:
+                            etree.indent(element, level = 1)
+                            xmlout.write("\n  ", element)
+                        xmlout.write("\n")
+                if report:
+                    # Keep the library file, the file is not imported.
+                    os.remove(temp)
+                    return False
+                os.replace(temp, self._xmlfile)
+            except BaseException:
+                # Keep the library file as it was.
+                if os.path.exists(temp):
+                    os.remove(temp)
+                raise
+            # The library file has been replaced, along with its journal.
+            self._index = None
+            if self._journal is not None:
+                self._journal.remove()
+            return True
+    # End of method _write_stream.
+
+    """
+    Method: _export_records
+
+    Gets the records of all items to export.
+
+    :param bool sort: Sort items by title, otherwise keep the order of the library file.
+    :param list fields: The record fields to decode, all if None.
+    :return int_or_iterable: Union[int, iterable], iterable of Record, 1 if library file is not valid and 2 in case of error.
+    """
+    def _export_records(self, sort, fields):
+        stamp = self._file_stamp()
+        if stamp is None:
+            return 2
+        indexed = self._index is not None and self._index.stamp == stamp
+        journaled = self._journal is not None and os.path.exists(self._journal.path)
+        if not sort and not indexed and not journaled:
+            return self._stream_records(stamp, fields)
+        if sort:
+            records = self.get_all_records(fields = fields)
+            return [] if records is None else records
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+        return self._records(index.nodes(), fields)
+    # End of method _export_records.
+
+    """
+    Method: _export
+
+    Exports the library items to a file, written next to it first and moved
+    in place once complete.
+
+    :param str expfile: The file to export.
+    :param bool sort: Sort items by title, otherwise keep the order of the library file.
+    :param list fields: The record fields to decode, all if None.
+    :param function write: Writes an iterable of Record to the open file.
+    :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
+    """
+    def _export(self, expfile, sort, fields, write):
+        temp = expfile + ".new"
+        try:
+            records = self._export_records(sort, fields)
+            if isinstance(records, int):
+                return records
+            with open(temp, "w", encoding = "utf-8", newline = "") as exportfile:
+                write(exportfile, records)
+            os.replace(temp, expfile)
+        except OSError:
+            result = 2
+        except etree.LxmlError:
+            # The library file is not valid.
+            result = 1
+        else:
+            # File export was successful.
+            return 0
+        if os.path.exists(temp):
+            os.remove(temp)
+        return result
+    # End of method _export.
+
+    """
+    Method: _stream_records
+
+    Decodes the items of the library file one at a time, in file order.
+    Every element is released once its record has been used. The file is
+    validated while parsed, unless it has been validated since its last change.
+
+    :param tuple stamp: The stamp of the library file.
+    :param list fields: The record fields to decode, all if None.
+    :return generator: Generator of Record.
+    :raise etree.LxmlError: If the library file or its schema is not valid.
+    :raise OSError: If the library file or its schema cannot be read.
+    """
+    def _stream_records(self, stamp, fields):
+        validstamp = (stamp, self._schema_stamp())
+        schema = None
+        if self._validstamp != validstamp:
+            schema = etree.XMLSchema(etree.parse(self._xsdfile))
+        for event, node in etree.iterparse(self._xmlfile, tag = self._libtype, schema = schema):
+            yield self._recordclass.from_node(node, fields = fields)
+            node.clear()
+            # Drop earlier elements from the root.
+            while node.getprevious() is not None:
+                del node.getparent()[0]
+        self._validstamp = validstamp
+    # End of method _stream_records.
+
     """
     Method: _add_element_to_tree
 
@@ -695,19 +1712,457 @@ class Manager:
     :return int: 0 on success, 2 on write file error and 3 on validation error.
     """
     def _add_element_to_tree(self, element, sorttag = "title"):
-            # Create xml tree.
-            tree = etree.parse(self._xmlfile)
-            # Get a list of all elements.
-            nodes = tree.xpath("/library/{}".format(self._libtype))
-            # Append to lis.
-            nodes.append(element)
-            # Sort elements list by title.
-            index = self._sortingtags.index(sorttag)
-            nodes.sort(key = lambda element: element[index].text.title())
-            # Write to file.
-            return self._write_tree(nodes)
+        return self._mutate(("add", element, sorttag))
     # End of method _add_element_to_tree.
 
+    """
+    Method: _mutate
+
+    Applies a mutation, through the write scheduler if writes are coalesced.
+
+    :param tuple mutation: The mutation, as described in method _commit.
+    :return int: The result code of the mutation.
+    """
+    def _mutate(self, mutation):
+        if self._scheduler is not None:
+            return self._scheduler.submit(mutation).result()
+        return self._commit([mutation])[0]
+    # End of method _mutate.
+
+    """
+    Method: _mutate_all
+
+    Applies mutations with a single write, or in batches of at most batchsize
+    through the write scheduler if writes are coalesced.
+
+    :param list mutations: List of mutation tuples.
+    :return list: List of int, the result code of every mutation.
+    """
+    def _mutate_all(self, mutations):
+        if self._scheduler is not None:
+            futures = [self._scheduler.submit(mutation) for mutation in mutations]
+            self._scheduler.flush()
+            return [future.result() for future in futures]
+        return self._commit(mutations)
+    # End of method _mutate_all.
+
+    """
+    Method: _commit
+
+    Applies mutations in memory, validates the library once and writes it once.
+    If validation fails, each half of the mutations is committed on its own,
+    until only the invalid mutations fail.
+
+    Mutations are tuples:
+        ("add", etree.Element, sorttag): adds an element and sorts the library by sorttag.
+        ("remove", key): removes the element with unique key value key.
+        ("edit", key, etree.Element, sorttag): replaces the element with unique key value key.
+
+    :param list mutations: List of mutation tuples.
+    :return list: List of int, the result code of every mutation: 0 on success, 1 if the element to remove or edit does not exist, 2 on write file error and 3 on validation error.
+    """
+    def _commit(self, mutations):
+        # Other processes append to the journal only after this process, and the other way around.
+        with self._writelock, self._journal or contextlib.nullcontext():
+            index = self._load_index()
+            if isinstance(index, int):
+                return [3 if index == 1 else index] * len(mutations)
+            nodes, codes, removed = self._apply(index, mutations)
+            if nodes is None:
+                return codes
+            # Write to file.
+            if self._journal is None:
+                result = self._write_tree(nodes)
+            else:
+                result = self._write_journal(index, nodes, [mutation for mutation, code in zip(mutations, codes) if code == 0], removed)
+            if result != 0:
+                # Do not keep the entries of the nodes, which have not been written.
+                index.rollback()
+            if result == 3 and len(mutations) > 1:
+                # Find the invalid mutations by committing halves of the batch.
+                middle = len(mutations) // 2
+                return self._commit(mutations[:middle]) + self._commit(mutations[middle:])
+            return [result if code == 0 else code for code in codes]
+    # End of method _commit.
+
+    """
+    Method: _apply
+
+    Applies mutations to the nodes of the library index, without changing the
+    index.
+
+    :param LibraryIndex index: The library index.
+    :param list mutations: List of mutation tuples, as described in method _commit.
+    :return tuple: The new list of nodes, None if no mutation applies, the list of result codes and the set of ids of removed nodes.
+    """
+    def _apply(self, index, mutations):
+        nodes = index.nodes()
+        codes = []
+        # Elements added and nodes removed by the batch.
+        added = {}
+        removed = set()
+        sorttag = None
+        for mutation in mutations:
+            if mutation[0] != "add":
+                # Find the element to remove using exact match.
+                node = added.pop(mutation[1], None)
+                if node is None:
+                    node = index.get(mutation[1])
+                if node is None or id(node) in removed:
+                    codes.append(1)
+                    continue
+                removed.add(id(node))
+            if mutation[0] != "remove":
+                element = mutation[-2]
+                nodes.append(element)
+                added[(element.findtext(self._uniquekey) or "").strip()] = element
+                sorttag = mutation[-1]
+            codes.append(0)
+        if not removed and sorttag is None:
+            return (None, codes, removed)
+        if removed:
+            nodes = [node for node in nodes if id(node) not in removed]
+        if sorttag is not None:
+            self._sort_nodes(nodes, sorttag)
+        return (nodes, codes, removed)
+    # End of method _apply.
+
+    """
+    Method: _write_journal
+
+    Appends mutations to the journal, instead of writing the library file.
+    Only the new elements are validated, while unique key values are checked
+    against the library index. The journal is compacted once it grows past the
+    journal limit, or right away if it is stale.
+
+    :param LibraryIndex index: The library index, before the mutations.
+    :param list nodes: The list of etree.Element nodes after the mutations.
+    :param list mutations: List of mutation tuples, which apply.
+    :param set removed: The set of ids of removed nodes.
+    :return int: 0 on success, 2 on write file error and 3 on validation error.
+    """
+    def _write_journal(self, index, nodes, mutations, removed):
+        if self._journal.stale:
+            # The journal applies to another version of the library file, so it is
+            # folded into the library file along with the mutations.
+            return self._fold_journal(nodes)
+        elements = [mutation[-2] for mutation in mutations if mutation[0] != "remove"]
+        if elements:
+            # Unique key values should not exist in the library, unless their element is removed.
+            keys = set()
+            for element in elements:
+                key = (element.findtext(self._uniquekey) or "").strip()
+                node = index.get(key)
+                if key in keys or (node is not None and id(node) not in removed):
+                    return 3
+                keys.add(key)
+            # Validate a library containing only the new elements.
+            root = etree.XML("""
+<library xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="{}"></library>
+            """.format(os.path.basename(self._xsdfile)))
+            for element in elements:
+                root.append(copy.deepcopy(element))
+            if Utility.validate_tree(self._xsdfile, etree.ElementTree(root)) != 0:
+                return 3
+        entries = []
+        for mutation in mutations:
+            entry = {"op": mutation[0]}
+            if mutation[0] != "add":
+                entry["key"] = mutation[1]
+            if mutation[0] != "remove":
+                entry["element"] = etree.tostring(mutation[-2], encoding = "unicode", with_tail = False)
+                entry["sort"] = mutation[-1]
+            entries.append(entry)
+        try:
+            if self._journalbase is None:
+                self._journalbase = Snapshot.digest(self._xmlfile).hex()
+            size = self._journal.append(self._journalbase, entries)
+        except OSError:
+            self._index = None
+            return 2
+        if self._journal.recovered:
+            # Entries of another process have been kept, so the journal is read again.
+            self._index = None
+        else:
+            # Keep the index up to date, without reading the journal again.
+            index.update(nodes, self._file_stamp())
+        if size > self._journallimit:
+            return self.compact()
+        return 0
+    # End of method _write_journal.
+
+    """
+    Method: _replay_journal
+
+    Applies the journal of the library file to a new library index.
+    Entries of a stale journal, whose library file has been changed otherwise,
+    are applied by unique value: adds and edits replace the items with their
+    unique value, edits of missing items add them and removes of missing items
+    are skipped. The journal is folded into the library file by the next write.
+
+    :param LibraryIndex index: The library index of the library file.
+    :param str base[=None]: The hash of the library file, calculated if None.
+    """
+    def _replay_journal(self, index, base = None):
+        try:
+            self._journalbase = base if base is not None else Snapshot.digest(self._xmlfile).hex()
+        except OSError:
+            self._journalbase = None
+            return
+        entries = self._journal.read(self._journalbase)
+        stale = self._journal.stale
+        if stale:
+            print("Library file {} has been changed after its journal, whose {} changes are applied again.".format(self._xmlfile, len(entries)))
+        # Keys added or removed by the entries so far.
+        present = {}
+        def exists(key):
+            return present[key] if key in present else index.get(key) is not None
+        mutations = []
+        for entry in entries:
+            if entry["op"] == "remove":
+                if not stale or exists(entry["key"]):
+                    mutations.append(("remove", entry["key"]))
+                    present[entry["key"]] = False
+                continue
+            element = etree.fromstring(entry["element"])
+            key = (element.findtext(self._uniquekey) or "").strip()
+            if entry["op"] == "edit" and (not stale or exists(entry["key"])):
+                if stale and key != entry["key"] and exists(key):
+                    mutations.append(("remove", key))
+                mutations.append(("edit", entry["key"], element, entry["sort"]))
+                present[entry["key"]] = False
+            else:
+                if stale and exists(key):
+                    mutations.append(("remove", key))
+                mutations.append(("add", element, entry["sort"]))
+            present[key] = True
+        if mutations:
+            nodes = self._apply(index, mutations)[0]
+            if nodes is not None:
+                index.update(nodes, index.stamp)
+    # End of method _replay_journal.
+
+    """
+    Method: compact
+
+    Folds the journal into a new library file and removes it.
+
+    :return int: 0 on success, 2 on write file error and 3 on validation error.
+    """
+    def compact(self):
+        if self._journal is None:
+            return 0
+        with self._writelock, self._journal:
+            index = self._load_index()
+            if isinstance(index, int):
+                return 3 if index == 1 else index
+            if not self._journal.exists():
+                return 0
+            result = self._fold_journal(index.nodes())
+            if result == 0:
+                self._write_snapshot(self._file_hashes())
+            return result
+    # End of method compact.
+
+    """
+    Method: _fold_journal
+
+    Writes the library file with the journal applied and removes the journal.
+
+    :param list nodes: The list of etree.Element nodes with the journal applied.
+    :return int: 0 on success, 2 on write file error and 3 on validation error.
+    """
+    def _fold_journal(self, nodes):
+        result = self._write_tree(nodes)
+        if result != 0:
+            return result
+        # A journal left behind is stale, so its entries would be applied again by unique value.
+        try:
+            self._journal.remove()
+        except OSError:
+            pass
+        self._journalbase = None
+        self._index.stamp = self._file_stamp()
+        return 0
+    # End of method _fold_journal.
+
+
+    """
+    Method: _file_stamp
+
+    Gets a stamp identifying the current version of the library file and its journal.
+
+    :return tuple_or_None: Union[tuple, None], None if the file cannot be accessed.
+    """
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self._xmlfile)
+        except OSError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+        if self._journal is not None:
+            try:
+                stat = os.stat(self._journal.path)
+                stamp += (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp += (None, None)
+        return stamp
+    # End of method _file_stamp.
+
+    """
+    Method: _schema_stamp
+
+    Gets a stamp identifying the current version of the library schema file.
+
+    :return tuple_or_None: Union[tuple, None], None if the file cannot be accessed.
+    """
+    def _schema_stamp(self):
+        try:
+            stat = os.stat(self._xsdfile)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+    # End of method _schema_stamp.
+
+    """
+    Method: _create_index
+
+    Creates a library index for the nodes.
+
+    :param list nodes: The list of etree.Element nodes.
+    :param tuple stamp: The stamp of the library file.
+    :param Snapshot snapshot[=None]: The snapshot to load records from, instead of nodes.
+    :return LibraryIndex: The new index.
+    """
+    def _create_index(self, nodes, stamp, snapshot = None):
+        return LibraryIndex(nodes, stamp, self._indexedtags, self._uniquekey, self._recordclass, self._accentfold, self._collator, self._fieldweights, snapshot)
+    # End of method _create_index.
+
+    """
+    Method: _file_hashes
+
+    Calculates the hashes identifying the snapshot of the library.
+
+    :return tuple_or_None: Union[tuple, None], the library and schema file hashes, None if snapshots are disabled or files cannot be read.
+    """
+    def _file_hashes(self):
+        if not self._snapshots:
+            return None
+        try:
+            return (Snapshot.digest(self._xmlfile), Snapshot.digest(self._xsdfile))
+        except OSError:
+            return None
+    # End of method _file_hashes.
+
+    """
+    Method: _write_snapshot
+
+    Writes the snapshot of the indexed library. Failures are ignored, since the
+    library file is still loaded from XML.
+
+    :param tuple hashes: The library and schema file hashes, None to skip writing.
+    """
+    def _write_snapshot(self, hashes):
+        if hashes is None or self._index is None:
+            return
+        nodes = self._index.nodes()
+        # Decode separate records, index records are decoded lazily.
+        records = [self._recordclass.from_node(node) for node in nodes]
+        try:
+            Snapshot.write(self._snapshotfile, hashes[0], hashes[1], records, nodes)
+        except OSError:
+            pass
+    # End of method _write_snapshot.
+
+    """
+    Method: _load_index
+
+    Gets the library index, validating and parsing the library file only if
+    it has changed since the index has been built.
+
+    :return int_or_LibraryIndex: Union[int, LibraryIndex], 1 if library file is not valid and 2 in case of error.
+    """
+    def _load_index(self):
+        stamp = self._file_stamp()
+        if stamp is None:
+            self._index = None
+            return 2
+        if self._index is not None and self._index.stamp == stamp:
+            return self._index
+        # Load the snapshot, if library and schema files have not changed since it has been written.
+        hashes = self._file_hashes()
+        if hashes is not None:
+            snapshot = Snapshot.load(self._snapshotfile, hashes[0], hashes[1])
+            if snapshot is not None:
+                self._index = self._create_index(None, stamp, snapshot)
+                if self._journal is not None:
+                    self._replay_journal(self._index, hashes[0].hex())
+                return self._index
+        # Validate storage.
+        validate = self.validate()
+        if validate != 0:
+            self._index = None
+            return validate
+        # Create xml tree.
+        tree = etree.parse(self._xmlfile)
+        # Get a list of all elements.
+        self._index = self._create_index(tree.xpath("/library/{}".format(self._libtype)), stamp)
+        self._write_snapshot(hashes)
+        if self._journal is not None:
+            self._replay_journal(self._index, hashes[0].hex() if hashes is not None else None)
+        return self._index
+    # End of method _load_index.
+
+    """
+    Method: _columns
+
+    Gets the columns of the columnar table: dictionary encoded statistics tags,
+    integer progress tags and range tags.
+
+    :return dict: Column kinds by element tag.
+    """
+    def _columns(self):
+        columns = {tag: "code" for tag in self._facettags}
+        for tag in self._progresstags or ():
+            columns[tag] = "int"
+        columns.update(self._rangetags)
+        return columns
+    # End of method _columns.
+
+    """
+    Method: _records
+
+    Gets the records of nodes, reusing the records of indexed nodes.
+    Declared fields are decoded in a single pass over every node, any other
+    field is decoded on first access.
+
+    :param list nodes: The list of etree.Element nodes.
+    :param list fields[=None]: The record fields the caller needs, all if None.
+    :return list: List of Record.
+    """
+    def _records(self, nodes, fields = None):
+        if self._index is None:
+            return [self._recordclass.from_node(node, fields = fields) for node in nodes]
+        records = [self._index.record(node) for node in nodes]
+        for record in records:
+            record.load(fields)
+        return records
+    # End of method _records.
+
+    """
+    Method: _sort_nodes
+
+    Sorts a list of nodes in place, using the cached collation keys.
+    Multiple valued elements are sorted by their first value.
+
+    :param list nodes: The list of etree.Element nodes.
+    :param str element: The element tag to sort by. Should be in _sortingtags list.
+    :param bool ascending[=True]: The order to sort the nodes.
+    """
+    def _sort_nodes(self, nodes, element, ascending = True):
+        nodes.sort(key = lambda node: self._index.sortkey(node, element), reverse = not ascending)
+    # End of method _sort_nodes.
+
     # NOT implemented methods. Child class should implemented them, based on their storage settings.
     # Utility methods, which meant to be called only form inside Manager class or its subclasses.
     # Like protected methods in other languages.
@@ -724,6 +2179,18 @@ class Manager:
         raise NotImplementedError("Method _xmlitem_to_dict should be implemented in child class.")
     # End of method _xmlitem_to_dict.
 
+    """
+    Method: _create_element
+
+    Creates a library element from its python dictionary form.
+
+    :param dict elementdict: The python dictionary containing the values of the element.
+    :raise NotImplementedError: Method should be implemented in child class.
+    """
+    def _create_element(self, elementdict):
+        raise NotImplementedError("Method _create_element should be implemented in child class.")
+    # End of method _create_element.
+
     """
     Method: _generate_libtype_element
 
@@ -740,30 +2207,42 @@ class Manager:
 
     # File import and export functionality.
     """
-    Method: import_csv
+    Method: _csv_element
 
-    Imports a CSV file as the XML library file.
+    Creates a library element from a CSV row.
 
-    :param str impfile: the file to import.
-    :return int: 0 on success and 2 in case of error.
+    :param dict row: The CSV row values by column name.
+    :return etree.Element: The new element.
     :raise NotImplementedError: Method should be implemented in child class.
     """
-    def import_csv(self, impfile):
-        raise NotImplementedError("Method import_csv should be implemented in child class.")
-    # End of method import_csv.
+    def _csv_element(self, row):
+        raise NotImplementedError("Method _csv_element should be implemented in child class.")
+    # End of method _csv_element.
 
     """
-    Method: export_csv
+    Method: _csv_header
 
-    Exports XML library file as a CSV file.
+    Gets the header row of exported CSV files.
 
-    :param str expfile: the file to export.
-    :return int: 0 on success and 2 in case of error.
+    :return list: List of str, the column names.
     :raise NotImplementedError: Method should be implemented in child class.
     """
-    def export_csv(self, expfile):
-        raise NotImplementedError("Method export_csv should be implemented in child class.")
-    # End of method export_csv.
+    def _csv_header(self):
+        raise NotImplementedError("Method _csv_header should be implemented in child class.")
+    # End of method _csv_header.
+
+    """
+    Method: _csv_row
+
+    Gets the CSV row of an item.
+
+    :param Record record: The item record, with the fields of _csvfields decoded.
+    :return list: List of str, the column values.
+    :raise NotImplementedError: Method should be implemented in child class.
+    """
+    def _csv_row(self, record):
+        raise NotImplementedError("Method _csv_row should be implemented in child class.")
+    # End of method _csv_row.
 
     # Storage management methods.
     """
@@ -783,16 +2262,235 @@ class Manager:
     Method: search_elements
 
     Search for elements containing a given value.
+    Search is case insensitive for any Unicode text.
 
     :param str element: The element tag containing the value. Should be in _sortingtags list.
     :param str value: The value inside element tag to search for.
     :param bool ascending[=True]: The order to sort the results.
-    :raise NotImplementedError: Method should be implemented in child class.
+    :return int_or_list_or_None: Union[int, list, None].
     """
     def search_elements(self, element, value, ascending = True):
-        raise NotImplementedError("Method search_elements should be implemented in child class.")
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        if element not in self._sortingtags:
+            return None
+
+        # Search for elements containing the value.
+        tnodes = index.search(element, value)
+
+        # Return elements if exist or none if list is empty.
+        if tnodes:
+            # Sort the list.
+            self._sort_nodes(tnodes, element, ascending)
+            return tnodes
+        else:
+            return None
     # End of method search_elements.
 
+    """
+    Method: fuzzy_search_elements
+
+    Search for elements approximately matching a given value.
+    Words of values are compared to the words of value using case insensitive
+    edit distance, so that values missing words of value or holding more words
+    match as well, ranked after values matching every word.
+    Only title, author and artist elements are supported.
+
+    :param str element: The element tag containing the value. Should be in _fuzzytags list.
+    :param str value: The value inside element tag to search for.
+    :param int distance[=2]: The maximum edit distance of every word, at most 2.
+    :param bool ascending[=True]: Closest matches first.
+    :return int_or_list_or_None: Union[int, list, None].
+    """
+    def fuzzy_search_elements(self, element, value, distance = 2, ascending = True):
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        if element not in self._fuzzytags:
+            return None
+
+        # Rank by matched words and distance, then by element value.
+        results = index.fuzzy_search(element, value, distance)
+        results.sort(key = lambda result: (result[0], index.sortkey(result[1], element)), reverse = not ascending)
+        tnodes = [result[1] for result in results]
+
+        # Return elements if exist or none if list is empty.
+        if tnodes:
+            return tnodes
+        else:
+            return None
+    # End of method fuzzy_search_elements.
+
+    """
+    Method: find_elements
+
+    Search for elements containing words of a text in any field.
+    Results are ranked using BM25, weighting matches by the field they occur in.
+
+    :param str text: The words to search for.
+    :return int_or_list_or_None: Union[int, list, None].
+    """
+    def find_elements(self, text):
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        tnodes = [result[1] for result in index.fulltext_search(text)]
+
+        # Return elements if exist or none if list is empty.
+        if tnodes:
+            return tnodes
+        else:
+            return None
+    # End of method find_elements.
+
+    """
+    Method: get_all_records
+
+    Gets the records of all elements in the specified order.
+    Indexed fields are decoded once, when elements are indexed. Other fields
+    are decoded when declared or on first access.
+
+    :param str element[=None]: The element tag on which sorting will be based. Should be in _sortingtags list.
+    :param bool ascending[=True]: The order to sort the results.
+    :param list fields[=None]: The record fields the caller needs, all if None.
+    :return int_or_list_or_None: Union[int, list, None], list of Record.
+    """
+    def get_all_records(self, element = None, ascending = True, fields = None):
+        elements = self.get_all_elements(element, ascending)
+        if elements is None or isinstance(elements, int):
+            return elements
+        return self._records(elements, fields)
+    # End of method get_all_records.
+
+    """
+    Method: get_elements_by
+
+    Gets elements holding a value of an element tag, using a secondary index.
+    Comparison is case insensitive. Multiple valued elements match if any of
+    their values matches, so that all works of an author may be found.
+
+    :param str element: The element tag containing the value. Should be in _indexedtags list.
+    :param str value: The exact value or the prefix of values.
+    :param bool prefix[=False]: Get elements holding values starting with value.
+    :param bool ascending[=True]: The order to sort the results by title.
+    :return int_or_list_or_None: Union[int, list, None].
+    """
+    def get_elements_by(self, element, value, prefix = False, ascending = True):
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        if element not in self._indexedtags:
+            return None
+
+        tnodes = index.lookup(element, value, prefix)
+
+        # Return elements if exist or none if list is empty.
+        if tnodes:
+            self._sort_nodes(tnodes, "title", ascending)
+            return tnodes
+        else:
+            return None
+    # End of method get_elements_by.
+
+    """
+    Method: count_elements_by
+
+    Counts elements by distinct value of an element tag, using a secondary index.
+    Elements with multiple values are counted once for each value.
+
+    :param str element: The element tag. Should be in _indexedtags list.
+    :return int_or_list_or_None: Union[int, list, None], list of (value, count) tuples ordered by value.
+    """
+    def count_elements_by(self, element):
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        if element not in self._indexedtags:
+            return None
+
+        counts = index.counts(element)
+
+        # Return counts if exist or none if list is empty.
+        if counts:
+            counts.sort(key = lambda count: self._collator.key(count[0]))
+            return counts
+        else:
+            return None
+    # End of method count_elements_by.
+
+    """
+    Method: get_statistics
+
+    Gets library statistics: the number of elements, element counts by value of
+    every tag in _facettags and progress totals if _progresstags are set.
+    Counts come from indexes maintained on every write, so the library is not
+    scanned again, or from the columnar table, if the manager is columnar.
+
+    :return int_or_dict: Union[int, dict], dict with keys "total", "facets", a list of (tag, counts) tuples, "progress", a ProgressCounter or None, and "values", the value dictionary counters.
+    """
+    def get_statistics(self):
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        table = index.table(self._columns()) if self._columnar else None
+        facets = []
+        for tag in self._facettags:
+            counts = table.count_by(tag) if table is not None else index.counts(tag)
+            counts.sort(key = lambda count: self._collator.key(count[0]))
+            facets.append((tag, counts))
+        progress = None
+        if self._progresstags is not None:
+            progress = table.progress(*self._progresstags) if table is not None else index.progress(*self._progresstags)
+        return {"total": index.count(), "facets": facets, "progress": progress, "values": index.dictionary.stats()}
+    # End of method get_statistics.
+
+    """
+    Method: get_elements_in_range
+
+    Gets elements with an integer or date value within a range, using the
+    columnar table of the library.
+
+    :param str element: The element tag. Should be in _rangetags dictionary.
+    :param str low[=None]: The lowest value, unbounded if None.
+    :param str high[=None]: The highest value, unbounded if None.
+    :param bool ascending[=True]: The order to sort the results by element.
+    :return int_or_list_or_None: Union[int, list, None].
+    """
+    def get_elements_in_range(self, element, low = None, high = None, ascending = True):
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        if element not in self._rangetags:
+            return None
+
+        table = index.table(self._columns())
+        low = table.parse(element, low) if low is not None else None
+        high = table.parse(element, high) if high is not None else None
+        tnodes = index.rows(table.select_range(element, low, high))
+
+        # Return elements if exist or none if list is empty.
+        if tnodes:
+            self._sort_nodes(tnodes, element, ascending)
+            return tnodes
+        else:
+            return None
+    # End of method get_elements_in_range.
+
     """
     Method: get_all_elements
 
@@ -800,48 +2498,153 @@ class Manager:
 
     :param str element[=None]: The element tag on which get will be based. Should be in _sortingtags list.
     :param bool ascending[=True]: The order to sort the results.
-    :raise NotImplementedError: Method should be implemented in child class.
+    :return int_or_list_or_None: Union[int, list, None].
     """
     def get_all_elements(self, element = None, ascending = True):
-        raise NotImplementedError("Method get_all_elements should be implemented in child class.")
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        # Get a list of all elements.
+        tnodes = index.nodes()
+
+        # Return elements if exist or none if list is empty.
+        if tnodes:
+            # If element is None, title is used.
+            if element is None:
+                element = "title"
+            # Sort the list.
+            self._sort_nodes(tnodes, element, ascending)
+            return tnodes
+        else:
+            return None
     # End of method get_all_elements.
 
     """
     Method: get_element
 
     Gets an element by unique value.
+    The element is a copy, so that callers may change it without affecting the
+    library index.
 
     :param str element: The exact value in element tag. Tag text should be unique.
-    :raise NotImplementedError: Method should be implemented in child class.
+    :return int_or_etree.Element_or_None: Union[int, etree.Element, None].
     """
     def get_element(self, element):
-        raise NotImplementedError("Method get_element should be implemented in child class.")
+        # Validate storage.
+        index = self._load_index()
+        if isinstance(index, int):
+            return index
+
+        node = index.get(element)
+
+        # Return element if exists or none.
+        if node is None:
+            return None
+        return copy.deepcopy(node)
     # End of method get_element.
 
+    """
+    Method: element_to_dict
+
+    Generates the python dictionary form of an element, as accepted by
+    add_element and edit_element.
+
+    :param etree.Element element: The library element.
+    :return dict: The python dictionary.
+    """
+    def element_to_dict(self, element):
+        return self._xmlitem_to_dict(element)
+    # End of method element_to_dict.
+
     """
     Method: add_element
 
     Adds an element.
 
     :param dict elementdict: The python dictionary containing the values of the element to be added to library.
-    :raise NotImplementedError: Method should be implemented in child class.
+    :return int: 0 on success, 1 on dictionary key error, 2 on write file error and 3 on validation error.
     """
     def add_element(self, elementdict):
-        raise NotImplementedError("Method add_element should be implemented in child class.")
+        try:
+            element = self._create_element(elementdict)
+        except KeyError:
+            return 1
+        # Write to file.
+        return self._add_element_to_tree(element)
     # End of method add_element.
 
+    """
+    Method: add_elements
+
+    Adds elements with as few writes as possible.
+
+    :param list elementdicts: List of python dictionaries containing the values of the elements to be added to library.
+    :return list: List of int, the result code of every element as returned by add_element.
+    """
+    def add_elements(self, elementdicts):
+        return self.change_elements([("add", elementdict) for elementdict in elementdicts])
+    # End of method add_elements.
+
+    """
+    Method: change_elements
+
+    Adds, edits and removes elements in the given order with as few writes as
+    possible, a single one unless writes are coalesced.
+
+    Changes are tuples:
+        ("add", elementdict): adds an element, like add_element.
+        ("edit", key, elementdict): edits an element, like edit_element.
+        ("remove", key): removes an element, like remove_element.
+
+    :param list changes: List of change tuples.
+    :return list: List of int, the result code of every change, 1 also if its python dictionary is not valid.
+    """
+    def change_elements(self, changes):
+        codes = [None] * len(changes)
+        mutations = []
+        positions = []
+        for position, change in enumerate(changes):
+            try:
+                if change[0] == "add":
+                    mutations.append(("add", self._create_element(change[1]), "title"))
+                elif change[0] == "edit":
+                    mutations.append(("edit", change[1], self._create_element(change[2]), "title"))
+                else:
+                    mutations.append(("remove", change[1]))
+                positions.append(position)
+            except (KeyError, TypeError, ValueError):
+                codes[position] = 1
+        for position, code in zip(positions, self._mutate_all(mutations)):
+            codes[position] = code
+        return codes
+    # End of method change_elements.
+
     """
     Method: remove_element
 
     Removes an element.
 
     :param str element: The exact value in element tag. Tag text should be unique.
-    :raise NotImplementedError: Method should be implemented in child class.
+    :return int: 0 on success, 1 in case no node found, 2 on write file error and 3 on validation error.
     """
     def remove_element(self, element):
-        raise NotImplementedError("Method remove_element should be implemented in child class.")
+        return self._mutate(("remove", element))
     # End of method remove_element.
 
+    """
+    Method: remove_elements
+
+    Removes elements with as few writes as possible.
+
+    :param list elements: List of exact values in element tag.
+    :return list: List of int, the result code of every element as returned by remove_element.
+    """
+    def remove_elements(self, elements):
+        return self._mutate_all([("remove", element) for element in elements])
+    # End of method remove_elements.
+
     # Display methods.
     """
     Method: show_table
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# imports
+import re
+import locale
+from library.support.utility import Utility
+
+"""
+Class: Collator
+
+Creates sorting keys for element values.
+Supports locale collation, natural ordering of numbers ("Part 2" before
+"Part 10") and leading article stripping ("The Hobbit" sorted as "Hobbit").
+Without a locale, letters are compared casefolded and without accents, so that
+accented letters sort next to their base letters instead of by code point.
+Locale collation uses the process-wide LC_COLLATE locale, which is set once at
+application start-up by method set_locale, never by a collator itself.
+"""
+class Collator:
+    """
+    Initializer
+
+    :param bool uselocale[=False]: Compare text using the LC_COLLATE locale of the process.
+    :param bool natural[=True]: Compare digit sequences by their numeric value.
+    :param list articles[=("a", "an", "the")]: Leading words ignored while sorting.
+    """
+    def __init__(self, uselocale = False, natural = True, articles = ("a", "an", "the")):
+        super().__init__()
+        self._natural = natural
+        self._articles = frozenset(Utility.fold(article) for article in articles)
+        self._digits = re.compile(r"(\d+)")
+        self._strxfrm = locale.strxfrm if uselocale else None
+    # End of initializer.
+
+    """
+    Method: set_locale
+
+    Sets the LC_COLLATE locale of the process. The locale is global state
+    shared by all threads, so it is set once at application start-up, before
+    collators using it are created.
+
+    :param str localename: The LC_COLLATE locale name, "" for the user's default locale.
+    :return bool: True if the locale is set, False if the locale is not available.
+    """
+    @staticmethod
+    def set_locale(localename):
+        try:
+            locale.setlocale(locale.LC_COLLATE, localename)
+            return True
+        except locale.Error:
+            return False
+    # End of method set_locale.
+
+    """
+    Method: key
+
+    Creates the sorting key of a value.
+
+    :param str text: The value.
+    :return tuple: The sorting key.
+    """
+    def key(self, text):
+        text = self._strip_article(text.strip())
+        if not self._natural:
+            return (self._transform(text),)
+        # Even positions hold text and odd positions hold numbers, so that
+        # keys are always comparable.
+        parts = self._digits.split(text)
+        for i in range(len(parts)):
+            if i % 2:
+                parts[i] = int(parts[i])
+            else:
+                parts[i] = self._transform(parts[i])
+        return tuple(parts)
+    # End of method key.
+
+    """
+    Method: _transform
+
+    Transforms text to its collation form.
+
+    :param str text: The text.
+    :return str: The collation form of text.
+    """
+    def _transform(self, text):
+        if self._strxfrm is not None:
+            return self._strxfrm(text)
+        return Utility.fold(text, True)
+    # End of method _transform.
+
+    """
+    Method: _strip_article
+
+    Removes a leading article, if the text contains more words.
+
+    :param str text: The text.
+    :return str: The text without leading article.
+    """
+    def _strip_article(self, text):
+        if self._articles:
+            parts = text.split(None, 1)
+            if len(parts) == 2 and Utility.fold(parts[0]) in self._articles:
+                return parts[1]
+        return text
+    # End of method _strip_article.
+# End of class Collator.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+# imports
+import datetime
+from array import array
+from collections import Counter
+from library.support.progress import ProgressCounter
+try:
+    import numpy
+except ImportError:
+    # Columns are kept in arrays of the array module.
+    numpy = None
+
+"""
+Class: ColumnTable
+
+Columnar copy of library records for analytics and bulk queries.
+Every column is a contiguous array with one value per record (row):
+    "code": dictionary encoded values. Distinct values are stored once and rows
+            hold integer codes. Multiple values are supported: codes of row i
+            are codes[offsets[i]:offsets[i + 1]].
+    "int": integers, 0 if missing.
+    "date": ISO dates as proleptic Gregorian ordinals, 0 if missing.
+Filters and group-bys run as NumPy vectorized operations when NumPy is
+installed and as loops over array module arrays otherwise.
+The table is read only, it is rebuilt after the library changes.
+"""
+class ColumnTable:
+    """
+    Initializer
+
+    :param list records: The list of Record, one per row.
+    :param dict columns: Column kinds by element tag.
+    """
+    def __init__(self, records, columns):
+        super().__init__()
+        self.size = len(records)
+        self._kinds = dict(columns)
+        # Code columns: (dictionary, value to code, offsets, codes) by tag.
+        self._codes = {}
+        # Integer and date columns by tag.
+        self._numbers = {}
+        for tag, kind in self._kinds.items():
+            if kind == "code":
+                self._codes[tag] = self._encode([record.values(tag) for record in records])
+            else:
+                numbers = []
+                for record in records:
+                    values = record.values(tag)
+                    numbers.append(self.parse(tag, values[0]) if values else 0)
+                self._numbers[tag] = self._array(numbers)
+    # End of initializer.
+
+    """
+    Method: kind
+
+    Gets the kind of a column.
+
+    :param str tag: The element tag of the column.
+    :return str_or_None: Union[str, None], None if there is no such column.
+    """
+    def kind(self, tag):
+        return self._kinds.get(tag)
+    # End of method kind.
+
+    """
+    Method: parse
+
+    Converts the text of an integer or date column value to a number.
+
+    :param str tag: The element tag of the column.
+    :param str text: The text value.
+    :return int: The number, 0 if the text is not valid.
+    """
+    def parse(self, tag, text):
+        try:
+            if self._kinds[tag] == "date":
+                return datetime.date.fromisoformat(text.strip()).toordinal()
+            return int(text)
+        except ValueError:
+            return 0
+    # End of method parse.
+
+    """
+    Method: count_by
+
+    Counts rows by distinct value of a code column.
+
+    :param str tag: The element tag of the column.
+    :return list: List of (value, count) tuples in order of first appearance.
+    """
+    def count_by(self, tag):
+        dictionary, lookup, offsets, codes = self._codes[tag]
+        if numpy is not None:
+            counts = numpy.bincount(codes, minlength = len(dictionary)).tolist()
+        else:
+            counter = Counter(codes)
+            counts = [counter[code] for code in range(len(dictionary))]
+        return [(dictionary[code], count) for code, count in enumerate(counts) if count]
+    # End of method count_by.
+
+    """
+    Method: select_equal
+
+    Finds rows holding a value in a code column.
+
+    :param str tag: The element tag of the column.
+    :param str value: The exact value.
+    :return list: List of row numbers in ascending order.
+    """
+    def select_equal(self, tag, value):
+        dictionary, lookup, offsets, codes = self._codes[tag]
+        code = lookup.get(value)
+        if code is None:
+            return []
+        if numpy is not None:
+            positions = numpy.flatnonzero(codes == code)
+            # Map code positions to the rows owning them.
+            return numpy.unique(numpy.searchsorted(offsets, positions, side = "right") - 1).tolist()
+        return [row for row in range(self.size) if code in codes[offsets[row]:offsets[row + 1]]]
+    # End of method select_equal.
+
+    """
+    Method: select_range
+
+    Finds rows with a value of an integer or date column within a range.
+    Rows missing the value are never selected.
+
+    :param str tag: The element tag of the column.
+    :param int low[=None]: The lowest value, unbounded if None.
+    :param int high[=None]: The highest value, unbounded if None.
+    :return list: List of row numbers in ascending order.
+    """
+    def select_range(self, tag, low = None, high = None):
+        column = self._numbers[tag]
+        low = 1 if low is None else max(low, 1)
+        if numpy is not None:
+            mask = column >= low
+            if high is not None:
+                mask &= column <= high
+            return numpy.flatnonzero(mask).tolist()
+        return [row for row, value in enumerate(column) if value >= low and (high is None or value <= high)]
+    # End of method select_range.
+
+    """
+    Method: progress
+
+    Calculates progress totals from an integer column of units and an integer
+    column of the last unit reached.
+
+    :param str unitstag: The element tag of the units column.
+    :param str reachedtag: The element tag of the reached unit column.
+    :return ProgressCounter: The totals.
+    """
+    def progress(self, unitstag, reachedtag):
+        units = self._numbers[unitstag]
+        reached = self._numbers[reachedtag]
+        progress = ProgressCounter()
+        if numpy is not None:
+            counted = units > 0
+            started = counted & (reached > 0)
+            progress.items = int(counted.sum())
+            progress.units = int(units[counted].sum())
+            progress.reached = int(numpy.minimum(units, reached)[started].sum())
+            progress.started = int(started.sum())
+            progress.completed = int((started & (reached >= units)).sum())
+        else:
+            for row in range(self.size):
+                progress.add(units[row] or None, reached[row] or None)
+        return progress
+    # End of method progress.
+
+    """
+    Method: _encode
+
+    Dictionary encodes the values of a code column.
+
+    :param list values: List of lists of str, the values of every row.
+    :return tuple: Tuple of dictionary list, value to code dict, offsets and codes arrays.
+    """
+    def _encode(self, values):
+        dictionary = []
+        lookup = {}
+        offsets = [0]
+        codes = []
+        for rowvalues in values:
+            for value in rowvalues:
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(dictionary)
+                    dictionary.append(value)
+                codes.append(code)
+            offsets.append(len(codes))
+        return (dictionary, lookup, self._array(offsets), self._array(codes))
+    # End of method _encode.
+
+    """
+    Method: _array
+
+    Packs integers in a contiguous array.
+
+    :param list numbers: List of int.
+    :return object: numpy.ndarray if NumPy is installed, array.array otherwise.
+    """
+    def _array(self, numbers):
+        if numpy is not None:
+            return numpy.array(numbers, dtype = numpy.int64)
+        return array("q", numbers)
+    # End of method _array.
+# End of class ColumnTable.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
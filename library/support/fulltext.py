@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+# imports
+import re
+import math
+
+"""
+Class: FullTextIndex
+
+Inverted index of the words of all fields of library items, ranking matches
+using Okapi BM25. Word frequencies are multiplied by the weight of the field
+they have been found in, so that matches in important fields rank higher.
+Items are added and removed one by one, so the index follows library writes
+without being rebuilt.
+"""
+class FullTextIndex:
+    """
+    Initializer
+
+    :param dict weights[=None]: Field weights by element tag. Missing tags weigh 1.
+    :param float k1[=1.2]: BM25 term frequency saturation.
+    :param float b[=0.75]: BM25 length normalization.
+    """
+    def __init__(self, weights = None, k1 = 1.2, b = 0.75):
+        super().__init__()
+        self._weights = weights if weights is not None else {}
+        self._k1 = k1
+        self._b = b
+        self._pattern = re.compile(r"\w+")
+        # Word to {item: weighted frequency}.
+        self._postings = {}
+        # Item to {word: weighted frequency}.
+        self._items = {}
+        # Item to weighted length.
+        self._lengths = {}
+        self._totallength = 0.0
+    # End of initializer.
+
+    """
+    Method: add
+
+    Adds an item.
+
+    :param object item: The item.
+    :param list fields: List of (tag, text) tuples of the item. Text should be casefolded.
+    """
+    def add(self, item, fields):
+        if item in self._items:
+            self.remove(item)
+        frequencies = {}
+        length = 0.0
+        for tag, text in fields:
+            weight = self._weights.get(tag, 1.0)
+            for word in self._pattern.findall(text):
+                frequencies[word] = frequencies.get(word, 0.0) + weight
+                length += weight
+        for word, frequency in frequencies.items():
+            self._postings.setdefault(word, {})[item] = frequency
+        self._items[item] = frequencies
+        self._lengths[item] = length
+        self._totallength += length
+    # End of method add.
+
+    """
+    Method: remove
+
+    Removes an item.
+
+    :param object item: The item.
+    """
+    def remove(self, item):
+        frequencies = self._items.pop(item, None)
+        if frequencies is None:
+            return
+        for word in frequencies:
+            postings = self._postings[word]
+            del postings[item]
+            if not postings:
+                del self._postings[word]
+        self._totallength -= self._lengths.pop(item)
+    # End of method remove.
+
+    """
+    Method: search
+
+    Finds items containing any word of the query, best matches first.
+
+    :param str query: The query. Should be casefolded.
+    :return list: List of (score, item) tuples.
+    """
+    def search(self, query):
+        count = len(self._items)
+        if count == 0:
+            return []
+        average = self._totallength / count or 1.0
+        scores = {}
+        for word in set(self._pattern.findall(query)):
+            postings = self._postings.get(word)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for item, frequency in postings.items():
+                norm = self._k1 * (1.0 - self._b + self._b * self._lengths[item] / average)
+                scores[item] = scores.get(item, 0.0) + idf * frequency * (self._k1 + 1.0) / (frequency + norm)
+        results = [(score, item) for item, score in scores.items()]
+        results.sort(key = lambda result: result[0], reverse = True)
+        return results
+    # End of method search.
+# End of class FullTextIndex.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+# imports
+import re
+
+"""
+Class: FuzzyIndex
+
+Approximate value search, matching the words of the query to the words of the
+values by edit distance, with transposed letters counting as one edit.
+Words of the values are kept in a symmetric deletion index: every word is
+stored under all the strings produced by deleting up to as many of its
+characters as it may differ by. Words within distance of a query word share at
+least one of those strings, so only values containing such words are compared
+to the query and queries stay fast on large libraries.
+Words may differ by one edit from 3 letters on and by two from 6 letters on,
+so that short words, such as articles, match only exactly.
+The index assumes that typos do not split or merge words.
+"""
+class FuzzyIndex:
+    # The maximum edit distance of a word.
+    MAXDISTANCE = 2
+
+    """
+    Initializer
+    """
+    def __init__(self):
+        super().__init__()
+        # Deletion string to its word, or to the set of its words if there are more.
+        self._deletes = {}
+        # Word to values.
+        self._words = {}
+        # Value to items.
+        self._values = {}
+        self._pattern = re.compile(r"\w+")
+    # End of initializer.
+
+    """
+    Method: add
+
+    Adds an item under value.
+
+    :param str value: The value.
+    :param object item: The item, which holds value.
+    """
+    def add(self, value, item):
+        items = self._values.get(value)
+        if items is None:
+            items = self._values[value] = set()
+            for word in set(self._pattern.findall(value)):
+                values = self._words.get(word)
+                if values is None:
+                    values = self._words[word] = set()
+                    for variant in self._variants(word, FuzzyIndex.limit(word, FuzzyIndex.MAXDISTANCE)):
+                        words = self._deletes.get(variant)
+                        if words is None:
+                            # Most deletion strings belong to a single word, which is kept without a set.
+                            self._deletes[variant] = word
+                        elif isinstance(words, str):
+                            self._deletes[variant] = {words, word}
+                        else:
+                            words.add(word)
+                values.add(value)
+        items.add(item)
+    # End of method add.
+
+    """
+    Method: remove
+
+    Removes an item from value.
+
+    :param str value: The value.
+    :param object item: The item, which held value.
+    """
+    def remove(self, value, item):
+        items = self._values.get(value)
+        if items is None:
+            return
+        items.discard(item)
+        if items:
+            return
+        del self._values[value]
+        for word in set(self._pattern.findall(value)):
+            values = self._words[word]
+            values.discard(value)
+            if not values:
+                del self._words[word]
+                for variant in self._variants(word, FuzzyIndex.limit(word, FuzzyIndex.MAXDISTANCE)):
+                    words = self._deletes[variant]
+                    if isinstance(words, str):
+                        del self._deletes[variant]
+                        continue
+                    words.discard(word)
+                    if len(words) == 1:
+                        self._deletes[variant] = words.pop()
+    # End of method remove.
+
+    """
+    Method: search
+
+    Finds items holding values, which contain words matching at least half of
+    the words of the query. Values are ranked by the number of query words
+    they miss, then by the edits of the matched words and then by the number
+    of their words the query does not contain.
+
+    :param str value: The value to search for.
+    :param int maxdistance: The maximum edit distance of a word, not greater than MAXDISTANCE.
+    :return list: List of (rank, item) tuples ordered by rank, a rank being a (missing words, edits, extra words) tuple.
+    """
+    def search(self, value, maxdistance):
+        words = list(dict.fromkeys(self._pattern.findall(value)))
+        if not words:
+            return []
+        # Distances of the indexed words matching every query word.
+        matches = [self._similar_words(word, min(maxdistance, FuzzyIndex.MAXDISTANCE)) for word in words]
+        # Candidates are the values matching any query word. Short words are
+        # too common to select candidates, unless the query has no other words.
+        selective = [similar for word, similar in zip(words, matches) if len(word) > 2] or matches
+        candidates = set()
+        for similar in selective:
+            for word in similar:
+                candidates |= self._words[word]
+        required = (len(words) + 1) // 2
+        results = []
+        for candidate in candidates:
+            valuewords = set(self._pattern.findall(candidate))
+            matched = 0
+            edits = 0
+            for similar in matches:
+                distances = [similar[word] for word in valuewords if word in similar]
+                if distances:
+                    matched += 1
+                    edits += min(distances)
+            if matched >= required:
+                rank = (len(words) - matched, edits, max(len(valuewords) - matched, 0))
+                for item in self._values[candidate]:
+                    results.append((rank, item))
+        results.sort(key = lambda result: result[0])
+        return results
+    # End of method search.
+
+    """
+    Method: _similar_words
+
+    Finds indexed words within a maximum edit distance of word, limited by the
+    length of both words.
+
+    :param str word: The word.
+    :param int maxdistance: The maximum edit distance.
+    :return dict: The edit distances of the words, keyed by word.
+    """
+    def _similar_words(self, word, maxdistance):
+        limit = FuzzyIndex.limit(word, maxdistance)
+        words = set()
+        for variant in self._variants(word, limit):
+            found = self._deletes.get(variant)
+            if isinstance(found, str):
+                words.add(found)
+            elif found is not None:
+                words |= found
+        similar = {}
+        for candidate in words:
+            allowed = FuzzyIndex.limit(candidate, limit)
+            distance = FuzzyIndex.distance(word, candidate, allowed)
+            if distance <= allowed:
+                similar[candidate] = distance
+        return similar
+    # End of method _similar_words.
+
+    """
+    Static method: limit
+
+    Gets the edit distance a word may differ by, depending on its length.
+
+    :param str word: The word.
+    :param int maxdistance: The maximum edit distance.
+    :return int: The edit distance.
+    """
+    @staticmethod
+    def limit(word, maxdistance):
+        if len(word) <= 2:
+            return 0
+        if len(word) <= 5:
+            return min(maxdistance, 1)
+        return min(maxdistance, 2)
+    # End of static method limit.
+
+    """
+    Method: _variants
+
+    Generates all strings produced by deleting up to depth characters of word.
+
+    :param str word: The word.
+    :param int depth: The maximum number of deleted characters, at most 2.
+    :return set: Set of str, including word.
+    """
+    def _variants(self, word, depth):
+        variants = {word}
+        if depth > 0:
+            variants.update([word[:j] + word[j + 1:] for j in range(len(word))])
+        if depth > 1:
+            # Every pair of positions is deleted once.
+            variants.update([word[:i] + word[i + 1:j] + word[j + 1:] for j in range(1, len(word)) for i in range(j)])
+        return variants
+    # End of method _variants.
+
+    """
+    Static method: distance
+
+    Calculates the edit distance of two strings, counting insertions,
+    deletions, substitutions and transpositions of adjacent characters
+    (optimal string alignment), stopping as soon as it exceeds a limit.
+
+    :param str first: The first string.
+    :param str second: The second string.
+    :param int limit: The maximum distance of interest.
+    :return int: The edit distance or limit + 1 if it exceeds limit.
+    """
+    @staticmethod
+    def distance(first, second, limit):
+        if first == second:
+            return 0
+        if len(first) < len(second):
+            first, second = second, first
+        if len(first) - len(second) > limit:
+            return limit + 1
+        before = None
+        previous = list(range(len(second) + 1))
+        for i, fchar in enumerate(first, 1):
+            current = [i]
+            for j, schar in enumerate(second, 1):
+                cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (fchar != schar))
+                if i > 1 and j > 1 and fchar == second[j - 2] and first[i - 2] == schar:
+                    cost = min(cost, before[j - 2] + 1)
+                current.append(cost)
+            # Transpositions reach back two rows.
+            if min(current) > limit and min(previous) > limit:
+                return limit + 1
+            before = previous
+            previous = current
+        return min(previous[-1], limit + 1)
+    # End of static method distance.
+# End of class FuzzyIndex.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+
+# imports
+from library.support.utility import Utility
+from library.support.collation import Collator
+from library.support.records import Record
+from library.support.values import ValueDictionary
+# Search indexes, progress totals and columnar tables are imported when first
+# built, since one-shot commands use one of them at most.
+
+"""
+Class: IndexEntry
+
+Holds the decoded and precomputed values of a single library element.
+"""
+class IndexEntry:
+    __slots__ = ("node", "record", "key", "folded", "sortkeys", "row")
+
+    """
+    Initializer
+
+    :param etree.Element_or_None node: Union[etree.Element, None], the library element node, None until it is parsed from a snapshot.
+    :param Record record: The decoded values of the element.
+    :param str key: The unique key value of the element.
+    :param dict folded: Casefolded values by tag, computed on first use.
+    :param int row[=None]: The record number in the snapshot the entry has been loaded from.
+    """
+    def __init__(self, node, record, key, folded, row = None):
+        self.node = node
+        self.row = row
+        self.record = record
+        self.key = key
+        self.folded = folded
+        # Collation keys, computed once per tag on first sort.
+        self.sortkeys = {}
+    # End of initializer.
+# End of class IndexEntry.
+
+"""
+Class: LibraryIndex
+
+Keeps the elements of a parsed library file in memory, together with shadow
+casefolded values of every searchable tag and cached collation keys, so that
+searching and sorting need no text transformation at query time.
+The index is bound to a file stamp and it is refreshed by the manager after
+every successful write.
+"""
+class LibraryIndex:
+    """
+    Initializer
+
+    :param list nodes: The list of etree.Element library nodes, ignored if snapshot is given.
+    :param tuple stamp: The stamp of the library file the nodes have been read from.
+    :param list tags: The searchable and groupable element tags.
+    :param str uniquekey: The unique key element tag.
+    :param type recordclass[=Record]: The Record subclass decoding library elements.
+    :param bool accentfold[=False]: Strip accents from shadow values.
+    :param Collator collator[=None]: The collator creating sorting keys.
+    :param dict fieldweights[=None]: Full text search weights by element tag.
+    :param Snapshot snapshot[=None]: The snapshot of the library file to load records from.
+    """
+    def __init__(self, nodes, stamp, tags, uniquekey, recordclass = Record, accentfold = False, collator = None, fieldweights = None, snapshot = None):
+        super().__init__()
+        self.stamp = stamp
+        self._tags = tags
+        self._uniquekey = uniquekey
+        self._recordclass = recordclass
+        # Record fields decoded when nodes are indexed, others are decoded on first use.
+        self._keyfields = [recordclass.field(uniquekey)]
+        self._accentfold = accentfold
+        self._collator = collator if collator is not None else Collator()
+        # Shared copies of repetitive record and shadow values.
+        self.dictionary = ValueDictionary()
+        self._entries = []
+        self._bynode = {}
+        self._bykey = {}
+        # Nodes with entries, which have not been indexed yet.
+        self._pending = []
+        # Value indexes of tags, built on first use, keyed by (kind, tag).
+        self._valueindexes = {}
+        # Full text index of all fields, built on first use.
+        self._fieldweights = fieldweights
+        self._fulltext = None
+        # Progress totals, built on first use, and their (units, reached) tags.
+        self._progress = None
+        self._progresstags = None
+        # Columnar table, built on first use and dropped on every update, and its columns.
+        self._table = None
+        self._tablecolumns = None
+        # Snapshot providing element nodes on demand, and the tags decoded from it for all records.
+        self._snapshot = snapshot
+        self._preloaded = set()
+        if snapshot is None:
+            self.update(nodes, stamp)
+        else:
+            # Records decode their fields from the snapshot on first use.
+            for row, key in enumerate(snapshot.column(recordclass, self._keyfields[0])):
+                entry = IndexEntry(None, snapshot.record(recordclass, row, self.dictionary, ()), key, {}, row)
+                self._entries.append(entry)
+                self._bykey[entry.key] = entry
+    # End of initializer.
+
+    """
+    Method: update
+
+    Replaces indexed nodes. Values of nodes already indexed are reused, so only
+    new nodes are processed.
+
+    :param list nodes: The list of etree.Element library nodes.
+    :param tuple stamp: The stamp of the library file after writing the nodes.
+    """
+    def update(self, nodes, stamp):
+        entries = []
+        bynode = {}
+        bykey = {}
+        for node in nodes:
+            entry = self._entry(node)
+            entries.append(entry)
+            bynode[node] = entry
+            bykey[entry.key] = entry
+        old = set(self._entries)
+        new = set(entries)
+        # Keep value and full text indexes up to date.
+        if self._valueindexes or self._fulltext is not None or self._progress is not None:
+            for key, valueindex in self._valueindexes.items():
+                for entry in old - new:
+                    for value in self._folded(entry, key[1]):
+                        valueindex.remove(value, entry)
+                for entry in new - old:
+                    for value in self._folded(entry, key[1]):
+                        valueindex.add(value, entry)
+            if self._fulltext is not None:
+                for entry in old - new:
+                    self._fulltext.remove(entry)
+                for entry in new - old:
+                    self._fulltext.add(entry, self._fields(self._node(entry)))
+            if self._progress is not None:
+                for entry in old - new:
+                    self._progress.remove(*self._progress_values(entry))
+                for entry in new - old:
+                    self._progress.add(*self._progress_values(entry))
+        # Records decode their remaining fields from the nodes instead of the
+        # snapshot, or now if the node has never been parsed.
+        if self._snapshot is not None:
+            for entry in old | new:
+                if entry.node is None:
+                    entry.record.load()
+                else:
+                    entry.record.rebind(entry.node)
+        # Release the dictionary values of entries, which are not indexed any more.
+        for entry in old - new:
+            self._release(entry)
+        self._table = None
+        self._entries = entries
+        self._bynode = bynode
+        self._bykey = bykey
+        self._pending = []
+        self.stamp = stamp
+        # The snapshot is not needed any more.
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+    # End of method update.
+
+    """
+    Method: rollback
+
+    Drops the entries of nodes, which have not been indexed, such as the nodes
+    of a failed write.
+    """
+    def rollback(self):
+        for node in self._pending:
+            entry = self._bynode.pop(node, None)
+            if entry is not None:
+                self._release(entry)
+        self._pending = []
+    # End of method rollback.
+
+    """
+    Method: count
+
+    Gets the number of indexed nodes.
+
+    :return int: The number of nodes.
+    """
+    def count(self):
+        return len(self._entries)
+    # End of method count.
+
+    """
+    Method: nodes
+
+    Gets all indexed nodes in document order.
+
+    :return list: List of etree.Element.
+    """
+    def nodes(self):
+        return [self._node(entry) for entry in self._entries]
+    # End of method nodes.
+
+    """
+    Method: get
+
+    Gets a node by its unique key value.
+
+    :param str key: The exact unique key value.
+    :return etree.Element_or_None: Union[etree.Element, None].
+    """
+    def get(self, key):
+        entry = self._bykey.get(key)
+        if entry is None:
+            return None
+        return self._node(entry)
+    # End of method get.
+
+    """
+    Method: search
+
+    Finds nodes with at least one value of tag containing value.
+    Comparison is case insensitive, based on str.casefold.
+
+    :param str tag: The element tag containing the value.
+    :param str value: The value to search for.
+    :return list: List of etree.Element in document order.
+    """
+    def search(self, tag, value):
+        value = Utility.fold(value, self._accentfold)
+        results = []
+        for entry in self._entries:
+            for folded in self._folded(entry, tag):
+                if value in folded:
+                    results.append(self._node(entry))
+                    break
+        return results
+    # End of method search.
+
+    """
+    Method: fuzzy_search
+
+    Finds nodes with values of tag, whose words approximately match the words
+    of value. Comparison is case insensitive, based on str.casefold.
+
+    :param str tag: The element tag containing the value.
+    :param str value: The value to search for.
+    :param int distance: The maximum edit distance of a word, at most FuzzyIndex.MAXDISTANCE.
+    :return list: List of (rank, etree.Element) tuples ordered by rank, as described in FuzzyIndex.search.
+    """
+    def fuzzy_search(self, tag, value, distance):
+        fuzzy = self._valueindexes.get(("fuzzy", tag))
+        if fuzzy is None:
+            from library.support.fuzzy import FuzzyIndex
+            fuzzy = FuzzyIndex()
+            for entry in self._entries:
+                for folded in self._folded(entry, tag):
+                    fuzzy.add(folded, entry)
+            self._valueindexes[("fuzzy", tag)] = fuzzy
+        # Keep the closest value of every node.
+        results = []
+        found = set()
+        for result in fuzzy.search(Utility.fold(value, self._accentfold), distance):
+            if result[1] not in found:
+                found.add(result[1])
+                results.append((result[0], self._node(result[1])))
+        return results
+    # End of method fuzzy_search.
+
+    """
+    Method: fulltext_search
+
+    Finds nodes containing any word of the query in any field, best matches first.
+
+    :param str query: The query.
+    :return list: List of (score, etree.Element) tuples.
+    """
+    def fulltext_search(self, query):
+        if self._fulltext is None:
+            from library.support.fulltext import FullTextIndex
+            self._fulltext = FullTextIndex(self._fieldweights)
+            for entry in self._entries:
+                self._fulltext.add(entry, self._fields(self._node(entry)))
+        return [(result[0], self._node(result[1])) for result in self._fulltext.search(self.fold(query))]
+    # End of method fulltext_search.
+
+    """
+    Method: lookup
+
+    Finds nodes holding a value of tag, using the secondary index of tag.
+    Comparison is case insensitive, based on str.casefold.
+
+    :param str tag: The element tag containing the value.
+    :param str value: The exact value or the prefix of values.
+    :param bool prefix[=False]: Find values starting with value.
+    :return list: List of etree.Element.
+    """
+    def lookup(self, tag, value, prefix = False):
+        secondary = self._secondary(tag)
+        if prefix:
+            entries = secondary.prefix(self.fold(value))
+        else:
+            entries = secondary.exact(self.fold(value))
+        return [self._node(entry) for entry in entries]
+    # End of method lookup.
+
+    """
+    Method: counts
+
+    Counts nodes by distinct value of tag, using the secondary index of tag.
+    Values differing only in case are counted together.
+
+    :param str tag: The element tag.
+    :return list: List of (value, count) tuples.
+    """
+    def counts(self, tag):
+        counts = []
+        for value, count, entry in self._secondary(tag).counts():
+            # Show the original form of the value found in the first node.
+            display = value
+            for original in entry.record.values(tag):
+                if self.fold(original) == value:
+                    display = original
+                    break
+            counts.append((display, count))
+        return counts
+    # End of method counts.
+
+    """
+    Method: progress
+
+    Gets the progress totals of nodes having a number of units, such as pages.
+    Totals are built on first use and then maintained on every update.
+
+    :param str unitstag: The element tag of the number of units.
+    :param str reachedtag: The element tag of the last unit reached.
+    :return ProgressCounter: The totals.
+    """
+    def progress(self, unitstag, reachedtag):
+        if self._progress is None or self._progresstags != (unitstag, reachedtag):
+            self._progresstags = (unitstag, reachedtag)
+            from library.support.progress import ProgressCounter
+            self._progress = ProgressCounter()
+            for entry in self._entries:
+                self._progress.add(*self._progress_values(entry))
+        return self._progress
+    # End of method progress.
+
+    """
+    Method: table
+
+    Gets the columnar table of the indexed records, building it on first use.
+
+    :param dict columns: Column kinds by element tag.
+    :return ColumnTable: The table. Row numbers are positions in document order.
+    """
+    def table(self, columns):
+        if self._table is None or self._tablecolumns != columns:
+            from library.support.columns import ColumnTable
+            self._table = ColumnTable([entry.record for entry in self._entries], columns)
+            self._tablecolumns = dict(columns)
+        return self._table
+    # End of method table.
+
+    """
+    Method: rows
+
+    Gets the nodes of rows of the columnar table.
+
+    :param list rows: List of row numbers.
+    :return list: List of etree.Element.
+    """
+    def rows(self, rows):
+        return [self._node(self._entries[row]) for row in rows]
+    # End of method rows.
+
+    """
+    Method: prefix_search
+
+    Starts an incremental search for nodes with a word of tag starting with a prefix.
+
+    :param str tag: The element tag containing the value.
+    :return PrefixSearch: The search, refined by casefolded prefixes.
+    """
+    def prefix_search(self, tag):
+        from library.support.prefix import PrefixIndex, PrefixSearch
+        prefix = self._valueindexes.get(("prefix", tag))
+        if prefix is None:
+            prefix = PrefixIndex([(folded, entry) for entry in self._entries for folded in self._folded(entry, tag)])
+            self._valueindexes[("prefix", tag)] = prefix
+        return PrefixSearch(prefix)
+    # End of method prefix_search.
+
+    """
+    Method: fold
+
+    Folds a value the way shadow values are folded.
+
+    :param str value: The value.
+    :return str: The folded value.
+    """
+    def fold(self, value):
+        return Utility.fold(value, self._accentfold)
+    # End of method fold.
+
+    """
+    Method: sortkey
+
+    Gets the cached collation key of a node for a tag.
+    Multiple valued tags are sorted by their first value.
+
+    :param etree.Element node: The library element node.
+    :param str tag: The element tag.
+    :return tuple: The sorting key.
+    """
+    def sortkey(self, node, tag):
+        entry = self._entry(node)
+        key = entry.sortkeys.get(tag)
+        if key is None:
+            values = self.values(node, tag)
+            key = self._collator.key(values[0]) if values else ()
+            entry.sortkeys[tag] = key
+        return key
+    # End of method sortkey.
+
+    """
+    Method: record
+
+    Gets the record of a node, decoded once when the node is indexed.
+
+    :param etree.Element node: The library element node.
+    :return Record: The record.
+    """
+    def record(self, node):
+        return self._entry(node).record
+    # End of method record.
+
+    """
+    Method: values
+
+    Gets the stripped text values of a tag in a node.
+
+    :param etree.Element node: The library element node.
+    :param str tag: The element tag.
+    :return list: List of str.
+    """
+    def values(self, node, tag):
+        return self._entry(node).record.values(tag)
+    # End of method values.
+
+    """
+    Method: _secondary
+
+    Gets the secondary index of tag, building it on first use.
+
+    :param str tag: The element tag.
+    :return SecondaryIndex: The index.
+    """
+    def _secondary(self, tag):
+        secondary = self._valueindexes.get(("secondary", tag))
+        if secondary is None:
+            from library.support.secondary import SecondaryIndex
+            secondary = SecondaryIndex([(folded, entry) for entry in self._entries for folded in self._folded(entry, tag)])
+            self._valueindexes[("secondary", tag)] = secondary
+        return secondary
+    # End of method _secondary.
+
+    """
+    Method: _progress_values
+
+    Gets the number of units and the last unit reached of an entry.
+
+    :param IndexEntry entry: The entry.
+    :return tuple: Tuple of two Union[int, None].
+    """
+    def _progress_values(self, entry):
+        values = []
+        for tag in self._progresstags:
+            folded = self._folded(entry, tag)
+            values.append(int(folded[0]) if folded and folded[0].isdigit() else None)
+        return tuple(values)
+    # End of method _progress_values.
+
+    """
+    Method: _fields
+
+    Gets the folded text of every element of a node.
+
+    :param etree.Element node: The library element node.
+    :return list: List of (tag, text) tuples.
+    """
+    def _fields(self, node):
+        fields = []
+        for subnode in node.iterdescendants():
+            if subnode.text is not None and subnode.text.strip():
+                fields.append((subnode.tag, self.fold(subnode.text)))
+        return fields
+    # End of method _fields.
+
+    """
+    Method: _release
+
+    Releases the dictionary values held by an entry, which is dropped.
+
+    :param IndexEntry entry: The entry.
+    """
+    def _release(self, entry):
+        for value in entry.record.interned():
+            self.dictionary.release(value)
+        for tag, values in entry.folded.items():
+            if self._recordclass.interns(tag):
+                for value in values:
+                    self.dictionary.release(value)
+    # End of method _release.
+
+    """
+    Method: _folded
+
+    Gets the shadow values of a tag in an entry, computing them on first use.
+
+    :param IndexEntry entry: The entry.
+    :param str tag: The element tag.
+    :return tuple: Tuple of casefolded str.
+    """
+    def _folded(self, entry, tag):
+        values = entry.folded.get(tag)
+        if values is None:
+            if self._snapshot is not None and tag not in self._preloaded:
+                self._preload(tag)
+            values = tuple(Utility.fold(value, self._accentfold) for value in entry.record.values(tag))
+            if values and self._recordclass.interns(tag):
+                values = tuple(self.dictionary.intern(value) for value in values)
+            entry.folded[tag] = values
+        return values
+    # End of method _folded.
+
+    """
+    Method: _preload
+
+    Decodes the values of a tag for every record loaded from the snapshot at
+    once, instead of record by record, since values of a tag are usually needed
+    for all records.
+
+    :param str tag: The element tag.
+    """
+    def _preload(self, tag):
+        self._preloaded.add(tag)
+        field = self._recordclass.field(tag)
+        values = self._snapshot.column(self._recordclass, field)
+        if values is not None:
+            for entry in self._entries:
+                if entry.row is not None:
+                    entry.record.preload(field, values[entry.row])
+    # End of method _preload.
+
+    """
+    Method: _node
+
+    Gets the node of an entry, parsing it from the snapshot on first use.
+
+    :param IndexEntry entry: The entry.
+    :return etree.Element: The node.
+    """
+    def _node(self, entry):
+        if entry.node is None:
+            entry.node = self._snapshot.node(entry.row)
+            self._bynode[entry.node] = entry
+        return entry.node
+    # End of method _node.
+
+    """
+    Method: _entry
+
+    Gets the entry of a node, creating it if the node has not been indexed yet.
+    Entries of nodes about to be written are kept, so that their values are
+    computed only once, until they are indexed or rolled back.
+
+    :param etree.Element node: The library element node.
+    :return IndexEntry: The entry.
+    """
+    def _entry(self, node):
+        entry = self._bynode.get(node)
+        if entry is None:
+            entry = self._create_entry(node)
+            self._bynode[node] = entry
+            self._pending.append(node)
+        return entry
+    # End of method _entry.
+
+    """
+    Method: _create_entry
+
+    Decodes the unique key of a node. Other fields are decoded on first use.
+
+    :param etree.Element node: The library element node.
+    :return IndexEntry: The new entry.
+    """
+    def _create_entry(self, node):
+        record = self._recordclass.from_node(node, self.dictionary, self._keyfields)
+        key = getattr(record, self._uniquekey, None)
+        return IndexEntry(node, record, key, {})
+    # End of method _create_entry.
+# End of class LibraryIndex.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+# Imports
+import os
+import json
+import zlib
+try:
+    import fcntl
+except ImportError:
+    # Journals are not locked, where flock is not supported.
+    fcntl = None
+
+"""
+Class: Journal
+
+Append-only log of library mutations, kept next to the library file, so that
+a write costs the size of the change instead of the size of the library.
+
+The first line identifies the library file the journal applies to by its
+SHA-256 hash:
+    LIBJOURNAL1 <library file hash>
+A journal, whose library file has been changed otherwise, such as by hand, is
+stale: its entries are still read, since they are keyed by unique value, and
+it is never replaced, until its entries have been folded into the library file.
+Every other line is an entry, a JSON object with its CRC-32 checksum:
+    <checksum> {"op": "add" | "remove" | "edit", "key": "", "element": "<xml/>", "sort": ""}
+Reading stops at the first incomplete or corrupted entry, which is discarded
+by the next append. Entries appended by another process since the journal has
+last been read are kept.
+
+Processes sharing a library should hold the journal lock, an exclusive flock of
+the lock file next to the journal, from checking that their library index is
+current until their entries have been appended.
+"""
+class Journal:
+    # Header line prefix.
+    MAGIC = "LIBJOURNAL1"
+
+    """
+    Initializer
+
+    :param str path: The journal file path.
+    """
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        # Hash of the library file of the entries read, None if there are none.
+        self._base = None
+        # Length of the valid part of the file.
+        self._length = 0
+        # Number of entries of other processes found by the last append.
+        self.recovered = 0
+        # True if the entries read apply to another version of the library file.
+        self.stale = False
+        # Open lock file and the depth of nested locks.
+        self._lockfile = None
+        self._lockdepth = 0
+    # End of initializer.
+
+    """
+    Method: lock
+
+    Acquires the journal lock, waiting for other processes to release it.
+    Locks may be nested and every lock should be released. If the lock file
+    cannot be created, the storage directory is not writable and neither is
+    the journal, so no lock is held.
+    """
+    def lock(self):
+        if self._lockdepth == 0 and fcntl is not None:
+            try:
+                self._lockfile = open(self.path + ".lock", "ab")
+                fcntl.flock(self._lockfile.fileno(), fcntl.LOCK_EX)
+            except OSError:
+                if self._lockfile is not None:
+                    self._lockfile.close()
+                self._lockfile = None
+        self._lockdepth += 1
+    # End of method lock.
+
+    """
+    Method: unlock
+
+    Releases the journal lock.
+    """
+    def unlock(self):
+        self._lockdepth -= 1
+        if self._lockdepth == 0 and self._lockfile is not None:
+            # Closing the file releases the lock.
+            self._lockfile.close()
+            self._lockfile = None
+    # End of method unlock.
+
+    """
+    Method: __enter__
+
+    Acquires the journal lock for a with statement.
+
+    :return Journal: The journal.
+    """
+    def __enter__(self):
+        self.lock()
+        return self
+    # End of method __enter__.
+
+    """
+    Method: __exit__
+
+    Releases the journal lock at the end of a with statement.
+    """
+    def __exit__(self, *exception):
+        self.unlock()
+    # End of method __exit__.
+
+    """
+    Method: read
+
+    Reads the entries of the journal. Entries applying to another version of
+    the library file are read as well, marking the journal as stale.
+
+    :param str base: The hash of the library file.
+    :return list: List of entry dictionaries, empty if the journal is missing or holds no entries.
+    """
+    def read(self, base):
+        self._base = None
+        self._length = 0
+        self.stale = False
+        try:
+            with open(self.path, "rb") as journalfile:
+                data = journalfile.read()
+        except OSError:
+            return []
+        lines = data.split(b"\n")
+        magic, separator, header = lines[0].decode("ascii", "replace").partition(" ")
+        if magic != Journal.MAGIC or len(lines) == 1:
+            return []
+        entries, length = Journal._entries(lines[1:])
+        if header != base and not entries:
+            # Nothing to apply, so the journal may be replaced.
+            return []
+        self._base = header
+        self._length = len(lines[0]) + 1 + length
+        self.stale = header != base
+        return entries
+    # End of method read.
+
+    """
+    Static method: _entries
+
+    Decodes entry lines, up to the first incomplete or corrupted entry.
+
+    :param list lines: List of bytes, the lines. The last line is empty or incomplete.
+    :return tuple: The list of entry dictionaries and the length of their lines.
+    """
+    @staticmethod
+    def _entries(lines):
+        entries = []
+        length = 0
+        for line in lines[:-1]:
+            checksum, separator, payload = line.partition(b" ")
+            try:
+                if int(checksum, 16) != zlib.crc32(payload):
+                    break
+                entries.append(json.loads(payload.decode("utf-8")))
+            except ValueError:
+                break
+            length += len(line) + 1
+        return (entries, length)
+    # End of static method _entries.
+
+    """
+    Method: append
+
+    Appends entries and flushes them to disk. A journal without entries is
+    replaced. Entries found after the part of the journal last read are kept,
+    if their checksums are valid, and counted in recovered; only a corrupted
+    tail is discarded.
+
+    :param str base: The hash of the library file.
+    :param list entries: List of entry dictionaries.
+    :return int: The size of the journal.
+    :raise OSError: If the journal cannot be written, has been replaced since last read or holds entries of another library file.
+    """
+    def append(self, base, entries):
+        if self._base is not None and self._base != base:
+            raise OSError("Journal {} applies to another library file.".format(self.path))
+        data = bytearray()
+        for entry in entries:
+            payload = json.dumps(entry, ensure_ascii = False, separators = (",", ":")).encode("utf-8")
+            data += "{:08x} ".format(zlib.crc32(payload)).encode("ascii") + payload + b"\n"
+        if self._base is None:
+            data[0:0] = "{} {}\n".format(Journal.MAGIC, base).encode("ascii")
+            mode = "wb"
+            self._length = 0
+        else:
+            mode = "ab"
+        self.recovered = 0
+        with open(self.path, mode) as journalfile:
+            if mode == "ab" and journalfile.tell() != self._length:
+                self._recover(journalfile)
+            journalfile.write(data)
+            journalfile.flush()
+            os.fsync(journalfile.fileno())
+        self._base = base
+        self._length += len(data)
+        return self._length
+    # End of method append.
+
+    """
+    Method: _recover
+
+    Checks the part of the journal after the part last read, keeping the
+    entries with valid checksums and discarding a corrupted tail.
+
+    :param file journalfile: The journal, open for appending.
+    :raise OSError: If the journal is shorter than the part last read.
+    """
+    def _recover(self, journalfile):
+        size = journalfile.tell()
+        if size < self._length:
+            raise OSError("Journal {} has been replaced.".format(self.path))
+        with open(self.path, "rb") as tailfile:
+            tailfile.seek(self._length)
+            tail = tailfile.read(size - self._length)
+        entries, length = Journal._entries(tail.split(b"\n"))
+        self.recovered = len(entries)
+        self._length += length
+        if self._length != size:
+            journalfile.truncate(self._length)
+    # End of method _recover.
+
+    """
+    Method: exists
+
+    Checks if there are entries applying to the library file last read.
+
+    :return bool: True if the journal holds entries.
+    """
+    def exists(self):
+        return self._base is not None
+    # End of method exists.
+
+    """
+    Method: remove
+
+    Removes the journal file.
+
+    :raise OSError: If an existing journal cannot be removed.
+    """
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._base = None
+        self._length = 0
+        self.stale = False
+    # End of method remove.
+# End of class Journal.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+# imports
+import re
+from bisect import bisect_left, bisect_right
+
+"""
+Class: PrefixIndex
+
+Sorted array of value suffixes starting at word boundaries, so that all values
+containing a word starting with a prefix are found using binary search.
+"""
+class PrefixIndex:
+    """
+    Initializer
+
+    :param list pairs[=None]: List of (value, item) tuples to index.
+    """
+    def __init__(self, pairs = None):
+        super().__init__()
+        self._pattern = re.compile(r"\w+")
+        # Parallel sorted lists of suffixes and the items holding them.
+        suffixes = []
+        if pairs is not None:
+            for value, item in pairs:
+                for suffix in self._suffixes(value):
+                    suffixes.append((suffix, item))
+        suffixes.sort(key = lambda suffix: suffix[0])
+        self._keys = [suffix[0] for suffix in suffixes]
+        self._items = [suffix[1] for suffix in suffixes]
+    # End of initializer.
+
+    """
+    Method: add
+
+    Adds an item under value.
+
+    :param str value: The value.
+    :param object item: The item, which holds value.
+    """
+    def add(self, value, item):
+        for suffix in self._suffixes(value):
+            position = bisect_right(self._keys, suffix)
+            self._keys.insert(position, suffix)
+            self._items.insert(position, item)
+    # End of method add.
+
+    """
+    Method: remove
+
+    Removes an item from value.
+
+    :param str value: The value.
+    :param object item: The item, which held value.
+    """
+    def remove(self, value, item):
+        for suffix in self._suffixes(value):
+            position = bisect_left(self._keys, suffix)
+            end = bisect_right(self._keys, suffix, position)
+            while position < end:
+                if self._items[position] is item:
+                    del self._keys[position]
+                    del self._items[position]
+                    break
+                position += 1
+    # End of method remove.
+
+    """
+    Method: search
+
+    Finds suffixes starting with prefix.
+
+    :param str prefix: The prefix.
+    :return list: List of (suffix, item) tuples.
+    """
+    def search(self, prefix):
+        start = bisect_left(self._keys, prefix)
+        # No string starting with prefix sorts after prefix followed by the greatest code point.
+        end = bisect_right(self._keys, prefix + chr(0x10ffff), start)
+        return list(zip(self._keys[start:end], self._items[start:end]))
+    # End of method search.
+
+    """
+    Method: _suffixes
+
+    Gets the suffixes of value starting at word boundaries.
+
+    :param str value: The value.
+    :return set: Set of str.
+    """
+    def _suffixes(self, value):
+        return {value[match.start():] for match in self._pattern.finditer(value)}
+    # End of method _suffixes.
+# End of class PrefixIndex.
+
+"""
+Class: PrefixSearch
+
+Incremental prefix search.
+Every refinement of the prefix filters the candidates of the previous one, so
+that the index is queried only once per search.
+"""
+class PrefixSearch:
+    """
+    Initializer
+
+    :param PrefixIndex index: The index to query.
+    """
+    def __init__(self, index):
+        super().__init__()
+        self._index = index
+        # Stack of (prefix, candidates) tuples.
+        self._stack = []
+    # End of initializer.
+
+    """
+    Method: prefix
+
+    Gets the current prefix.
+
+    :return str: The prefix.
+    """
+    def prefix(self):
+        if self._stack:
+            return self._stack[-1][0]
+        return ""
+    # End of method prefix.
+
+    """
+    Method: refine
+
+    Sets a new prefix.
+    If the new prefix extends the current one, current candidates are filtered.
+    Shorter prefixes reuse the candidates previously found for them.
+
+    :param str prefix: The new prefix.
+    """
+    def refine(self, prefix):
+        # Drop candidates of prefixes, which the new prefix does not extend.
+        while self._stack and not prefix.startswith(self._stack[-1][0]):
+            self._stack.pop()
+        if not prefix:
+            self._stack = []
+        elif not self._stack:
+            self._stack.append((prefix, self._index.search(prefix)))
+        elif self._stack[-1][0] != prefix:
+            candidates = [candidate for candidate in self._stack[-1][1] if candidate[0].startswith(prefix)]
+            self._stack.append((prefix, candidates))
+    # End of method refine.
+
+    """
+    Method: items
+
+    Gets the distinct items matching the current prefix.
+
+    :return list_or_None: Union[list, None], None if there is no prefix.
+    """
+    def items(self):
+        if not self._stack:
+            return None
+        items = []
+        found = set()
+        for candidate in self._stack[-1][1]:
+            if candidate[1] not in found:
+                found.add(candidate[1])
+                items.append(candidate[1])
+        return items
+    # End of method items.
+# End of class PrefixSearch.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Class: ProgressCounter
+
+Running totals of the progress of library items, which have a number of units
+(pages) and a last unit reached (last page read).
+Items are added and removed one by one, so the totals follow library writes
+without rescanning the library.
+"""
+class ProgressCounter:
+    """
+    Initializer
+    """
+    def __init__(self):
+        super().__init__()
+        # Items with a known number of units.
+        self.items = 0
+        self.units = 0
+        # Units reached, not exceeding the number of units of every item.
+        self.reached = 0
+        self.started = 0
+        self.completed = 0
+    # End of initializer.
+
+    """
+    Method: add
+
+    Adds the progress of an item.
+
+    :param int_or_None units: Union[int, None], the number of units of the item.
+    :param int_or_None reached: Union[int, None], the last unit reached.
+    """
+    def add(self, units, reached):
+        self._count(units, reached, 1)
+    # End of method add.
+
+    """
+    Method: remove
+
+    Removes the progress of an item.
+
+    :param int_or_None units: Union[int, None], the number of units of the item.
+    :param int_or_None reached: Union[int, None], the last unit reached.
+    """
+    def remove(self, units, reached):
+        self._count(units, reached, -1)
+    # End of method remove.
+
+    """
+    Method: _count
+
+    Updates the totals with the progress of an item.
+
+    :param int_or_None units: Union[int, None], the number of units of the item.
+    :param int_or_None reached: Union[int, None], the last unit reached.
+    :param int sign: 1 to add the item, -1 to remove it.
+    """
+    def _count(self, units, reached, sign):
+        if units is None:
+            return
+        self.items += sign
+        self.units += sign * units
+        if reached is not None:
+            self.reached += sign * min(units, reached)
+            self.started += sign
+            if reached >= units:
+                self.completed += sign
+    # End of method _count.
+# End of class ProgressCounter.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
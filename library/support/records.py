@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+
+"""
+Class: RecordSource
+
+Abstract class.
+Provides the values of lazy records, which have not been decoded from an
+element node.
+"""
+class RecordSource:
+    __slots__ = ()
+
+    """
+    Method: decode
+
+    Decodes fields of a record.
+
+    :param type recordclass: The Record subclass.
+    :param dict missing: The (field, kind) tuples of the fields to decode, by child element tag.
+    :param ValueDictionary dictionary: The dictionary sharing values of _interned fields, None to skip sharing.
+    :return dict: The decoded values by field, missing values may be left out.
+    """
+    def decode(self, recordclass, missing, dictionary):
+        raise NotImplementedError
+    # End of method decode.
+# End of class RecordSource.
+
+"""
+Class: Record
+
+Abstract class.
+Compact, read only copy of the values of a library element. Text values are
+stripped once, multiple values are kept in tuples and missing values are None
+or empty tuples.
+Records may be projected: only the requested fields are decoded, in a single
+pass over the children of the element node, and every other field is decoded
+from the node on first access. Fully decoded records release their node.
+Instead of an element node, records may be decoded from a RecordSource, such
+as a row of a snapshot.
+
+Child element tags are described in _children, in document order, by
+(field, kind) tuples. Kind is one of:
+    "text": the text of the child.
+    "list": the texts of the children of the child, such as authors/author.
+    "repeat": the texts of all children with the same tag.
+    Record subclass: the records of all children with the same tag.
+Values of the fields in _interned are highly repetitive, so they may be shared
+through a ValueDictionary.
+"""
+class Record:
+    __slots__ = ("_node", "_dictionary")
+    # Child element tags mapped to (field, kind) tuples.
+    _children = {}
+    # Element tags of multiple values mapped to the fields holding them.
+    _valuefields = {}
+    # Fields with repetitive values.
+    _interned = frozenset()
+
+    """
+    Initializer
+
+    :param dict values: The field values. Missing fields are None or empty tuples.
+    """
+    def __init__(self, **values):
+        self._node = None
+        self._dictionary = None
+        for field, kind in self._children.values():
+            setattr(self, field, values.get(field, None if kind == "text" else ()))
+    # End of initializer.
+
+    """
+    Class method: from_node
+
+    Decodes an element node.
+
+    :param etree.Element_or_RecordSource node: Union[etree.Element, RecordSource], the library element node or the source of its values.
+    :param ValueDictionary dictionary[=None]: The dictionary sharing values of _interned fields.
+    :param iterable fields[=None]: The fields to decode now, all if None.
+    :return Record: The record.
+    """
+    @classmethod
+    def from_node(cls, node, dictionary = None, fields = None):
+        record = cls.__new__(cls)
+        record._node = node
+        record._dictionary = dictionary
+        # No field has been decoded yet.
+        if fields is None:
+            record._fill(cls._children, True)
+        elif fields:
+            record._fill({tag: spec for tag, spec in cls._children.items() if spec[0] in fields}, False)
+        return record
+    # End of class method from_node.
+
+    """
+    Class method: field
+
+    Gets the field holding the values of an element tag.
+
+    :param str tag: The element tag.
+    :return str: The field.
+    """
+    @classmethod
+    def field(cls, tag):
+        return cls._valuefields.get(tag, tag)
+    # End of class method field.
+
+    """
+    Class method: interns
+
+    Checks if values of an element tag are shared through a ValueDictionary.
+
+    :param str tag: The element tag.
+    :return bool: True if values are repetitive.
+    """
+    @classmethod
+    def interns(cls, tag):
+        return cls.field(tag) in cls._interned
+    # End of class method interns.
+
+    """
+    Method: load
+
+    Decodes fields, which have not been decoded yet, in a single pass over the
+    children of the node.
+
+    :param iterable fields[=None]: The fields to decode, all if None.
+    """
+    def load(self, fields = None):
+        if self._node is None:
+            return
+        missing = {}
+        for tag, (field, kind) in self._children.items():
+            if (fields is None or field in fields) and not self._decoded(field):
+                missing[tag] = (field, kind)
+        self._fill(missing, fields is None)
+    # End of method load.
+
+    """
+    Method: _fill
+
+    Decodes fields in a single pass over the children of the node, or from its
+    source.
+
+    :param dict missing: The (field, kind) tuples of the fields to decode, by child element tag.
+    :param bool complete: True if all fields are decoded, so that the node is released.
+    """
+    def _fill(self, missing, complete):
+        if missing:
+            if isinstance(self._node, RecordSource):
+                values = self._node.decode(type(self), missing, self._dictionary)
+            else:
+                values = {}
+                for child in self._node:
+                    spec = missing.get(child.tag)
+                    if spec is not None:
+                        values[spec[0]] = self._decode(child, spec[0], spec[1], values.get(spec[0]))
+            for field, kind in missing.values():
+                setattr(self, field, values.get(field, None if kind == "text" else ()))
+        if complete:
+            # All fields are decoded.
+            self._node = None
+            self._dictionary = None
+    # End of method _fill.
+
+    """
+    Method: preload
+
+    Sets a field, which has not been decoded yet, to a value decoded together
+    with the values of other records.
+
+    :param str field: The field.
+    :param object value: The decoded value, not shared through the ValueDictionary yet.
+    """
+    def preload(self, field, value):
+        if self._node is None or self._decoded(field):
+            return
+        if value is not None and self._dictionary is not None and field in self._interned:
+            intern = self._dictionary.intern
+            value = tuple(intern(text) for text in value) if isinstance(value, tuple) else intern(value)
+        setattr(self, field, value)
+    # End of method preload.
+
+    """
+    Method: rebind
+
+    Decodes the fields, which have not been decoded yet, from an element node
+    instead of the current node or source.
+
+    :param etree.Element node: The library element node.
+    """
+    def rebind(self, node):
+        if self._node is not None:
+            self._node = node
+    # End of method rebind.
+
+    """
+    Method: values
+
+    Gets the values of an element tag.
+
+    :param str tag: The element tag.
+    :return list: List of str.
+    """
+    def values(self, tag):
+        value = getattr(self, self.field(tag), None)
+        if value is None:
+            return []
+        if isinstance(value, tuple):
+            return list(value)
+        return [value]
+    # End of method values.
+
+    """
+    Method: interned
+
+    Gets the decoded values of the _interned fields, including the values of
+    child records, so that they may be released from their ValueDictionary.
+
+    :return list: List of str.
+    """
+    def interned(self):
+        values = []
+        for field, kind in self._children.values():
+            if not self._decoded(field):
+                continue
+            value = object.__getattribute__(self, field)
+            if kind not in ("text", "list", "repeat"):
+                for record in value:
+                    values.extend(record.interned())
+            elif field in self._interned and value is not None:
+                values.extend(value if isinstance(value, tuple) else (value,))
+        return values
+    # End of method interned.
+
+    """
+    Method: to_dict
+
+    Generates the python dictionary form of the record, used to add and edit
+    library elements.
+
+    :return dict: The python dictionary, keyed by element tag.
+    """
+    def to_dict(self):
+        itemdict = {}
+        for tag, (field, kind) in self._children.items():
+            value = getattr(self, field)
+            if kind == "text":
+                if value is not None:
+                    itemdict[tag] = value
+            elif value:
+                if kind in ("list", "repeat"):
+                    itemdict[tag] = list(value)
+                else:
+                    itemdict[tag] = [record.to_dict() for record in value]
+        return itemdict
+    # End of method to_dict.
+
+    """
+    Method: __getattr__
+
+    Decodes a field on first access. Called only for fields not decoded yet.
+
+    :param str name: The field.
+    :return object: The value of the field.
+    :raise AttributeError: If name is not a field of the record.
+    """
+    def __getattr__(self, name):
+        if not name.startswith("_"):
+            for tag, (field, kind) in self._children.items():
+                if field == name:
+                    self._fill({tag: (field, kind)}, False)
+                    return object.__getattribute__(self, name)
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+    # End of method __getattr__.
+
+    """
+    Method: _decoded
+
+    Checks if a field has been decoded.
+
+    :param str field: The field.
+    :return bool: True if the field has a value.
+    """
+    def _decoded(self, field):
+        try:
+            object.__getattribute__(self, field)
+        except AttributeError:
+            return False
+        return True
+    # End of method _decoded.
+
+    """
+    Method: _decode
+
+    Decodes a child of the node.
+
+    :param etree.Element child: The child node.
+    :param str field: The field of the child.
+    :param object kind: The kind of the field.
+    :param object previous: The value decoded from previous children with the same tag, None if there is none.
+    :return object: The value of the field.
+    """
+    def _decode(self, child, field, kind, previous):
+        intern = self._dictionary.intern if self._dictionary is not None and field in self._interned else None
+        if kind == "text":
+            if child.text is None:
+                return previous
+            return child.text.strip() if intern is None else intern(child.text.strip())
+        if kind == "list":
+            texts = [subchild.text.strip() for subchild in child if subchild.text is not None]
+            return tuple(texts) if intern is None else tuple(intern(text) for text in texts)
+        if kind == "repeat":
+            if child.text is None:
+                return previous
+            return (previous or ()) + (child.text.strip(),)
+        return (previous or ()) + (kind.from_node(child, self._dictionary),)
+    # End of method _decode.
+# End of class Record.
+
+"""
+Class: BookRecord
+
+Extends class Record.
+"""
+class BookRecord(Record):
+    __slots__ = ("title", "authors", "category", "formats", "isbn", "publicationdate", "publisher",
+                 "edition", "pagenumber", "lastpageread", "shop", "finished")
+    _children = {"title": ("title", "text"), "authors": ("authors", "list"), "category": ("category", "text"),
+                 "formats": ("formats", "list"), "isbn": ("isbn", "text"), "publicationdate": ("publicationdate", "text"),
+                 "publisher": ("publisher", "text"), "edition": ("edition", "text"), "pagenumber": ("pagenumber", "text"),
+                 "lastpageread": ("lastpageread", "text"), "shop": ("shop", "text"), "finished": ("finished", "text")}
+    _valuefields = {"author": "authors", "format": "formats"}
+    _interned = frozenset(["authors", "category", "formats", "publisher", "shop", "finished"])
+# End of class BookRecord.
+
+"""
+Class: InstallerRecord
+
+Extends class Record.
+Installer of a game.
+"""
+class InstallerRecord(Record):
+    __slots__ = ("system", "lastupdated", "filenames")
+    _children = {"system": ("system", "text"), "lastupdated": ("lastupdated", "text"), "filename": ("filenames", "repeat")}
+    _valuefields = {"filename": "filenames"}
+    _interned = frozenset(["system"])
+# End of class InstallerRecord.
+
+"""
+Class: GameRecord
+
+Extends class Record.
+"""
+class GameRecord(Record):
+    __slots__ = ("title", "shop", "finished", "installers")
+    _children = {"title": ("title", "text"), "shop": ("shop", "text"), "finished": ("finished", "text"),
+                 "installer": ("installers", InstallerRecord)}
+    _interned = frozenset(["shop", "finished"])
+
+    """
+    Method: values
+
+    Gets the values of an element tag, including the tags of installers.
+
+    :param str tag: The element tag.
+    :return list: List of str.
+    """
+    def values(self, tag):
+        if tag in InstallerRecord._children:
+            values = []
+            for installer in self.installers:
+                values.extend(installer.values(tag))
+            return values
+        return super().values(tag)
+    # End of method values.
+
+    """
+    Class method: field
+
+    Gets the field holding the values of an element tag, including the tags of
+    installers.
+
+    :param str tag: The element tag.
+    :return str: The field.
+    """
+    @classmethod
+    def field(cls, tag):
+        if tag in InstallerRecord._children:
+            return "installers"
+        return super().field(tag)
+    # End of class method field.
+
+    """
+    Class method: interns
+
+    Checks if values of an element tag, including the tags of installers, are
+    shared through a ValueDictionary.
+
+    :param str tag: The element tag.
+    :return bool: True if values are repetitive.
+    """
+    @classmethod
+    def interns(cls, tag):
+        if tag in InstallerRecord._children:
+            return InstallerRecord.interns(tag)
+        return super().interns(tag)
+    # End of class method interns.
+# End of class GameRecord.
+
+"""
+Class: MusicRecord
+
+Extends class Record.
+"""
+class MusicRecord(Record):
+    __slots__ = ("title", "artist", "formats", "genres", "tracks", "releasedate", "label", "shop")
+    _children = {"title": ("title", "text"), "artist": ("artist", "text"), "formats": ("formats", "list"),
+                 "genres": ("genres", "list"), "tracks": ("tracks", "list"), "releasedate": ("releasedate", "text"),
+                 "label": ("label", "text"), "shop": ("shop", "text")}
+    _valuefields = {"format": "formats", "genre": "genres", "track": "tracks"}
+    _interned = frozenset(["artist", "formats", "genres", "label", "shop"])
+# End of class MusicRecord.
+
+"""
+Class: VideoRecord
+
+Extends class Record.
+"""
+class VideoRecord(Record):
+    __slots__ = ("title", "formats", "genres", "releasedate", "label", "shop")
+    _children = {"title": ("title", "text"), "formats": ("formats", "list"), "genres": ("genres", "list"),
+                 "releasedate": ("releasedate", "text"), "label": ("label", "text"), "shop": ("shop", "text")}
+    _valuefields = {"format": "formats", "genre": "genres"}
+    _interned = frozenset(["formats", "genres", "label", "shop"])
+# End of class VideoRecord.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+# Imports
+import threading
+from concurrent.futures import Future
+
+"""
+Class: WriteScheduler
+
+Coalesces library mutations arriving close together into group commits.
+Mutations are queued and committed together once the batch window, counted
+from the first queued mutation, has passed or the batch size has been
+reached, whichever comes first. Batches are committed one at a time and in
+the order their mutations have been submitted. Every mutation gets its own
+result through a Future.
+"""
+class WriteScheduler:
+    """
+    Initializer
+
+    :param callable commit: Commits a list of mutations and returns the list of their result codes.
+    :param float window: The batch window in seconds.
+    :param int size[=100]: The maximum number of mutations of a batch.
+    """
+    def __init__(self, commit, window, size = 100):
+        super().__init__()
+        self._commit = commit
+        self._window = window
+        self._size = max(size, 1)
+        # Pending (mutation, future) tuples.
+        self._pending = []
+        self._lock = threading.Lock()
+        # Held while a batch is taken from the queue and committed.
+        self._commitlock = threading.Lock()
+        self._timer = None
+        # Number of commits, for instrumentation.
+        self.commits = 0
+    # End of initializer.
+
+    """
+    Method: submit
+
+    Queues a mutation. A full batch is committed by the submitting thread.
+
+    :param object mutation: The mutation.
+    :return Future: The future result code of the mutation.
+    """
+    def submit(self, mutation):
+        future = Future()
+        with self._lock:
+            self._pending.append((mutation, future))
+            full = len(self._pending) >= self._size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self._window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self._commit_batch()
+        return future
+    # End of method submit.
+
+    """
+    Method: flush
+
+    Commits every queued mutation.
+    """
+    def flush(self):
+        while self._commit_batch():
+            pass
+    # End of method flush.
+
+    """
+    Method: _commit_batch
+
+    Commits the next batch of queued mutations.
+
+    :return bool: True if a batch has been committed, False if the queue was empty.
+    """
+    def _commit_batch(self):
+        with self._commitlock:
+            with self._lock:
+                batch = self._pending[:self._size]
+                del self._pending[:self._size]
+                if not self._pending and self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return False
+            try:
+                codes = self._commit([mutation for mutation, future in batch])
+            except Exception as error:
+                for mutation, future in batch:
+                    future.set_exception(error)
+            else:
+                self.commits += 1
+                for (mutation, future), code in zip(batch, codes):
+                    future.set_result(code)
+            return True
+    # End of method _commit_batch.
+# End of class WriteScheduler.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
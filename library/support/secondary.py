@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+# imports
+from bisect import bisect_left, bisect_right, insort
+
+"""
+Class: SecondaryIndex
+
+Maps every distinct value of a tag to the items holding it.
+Distinct values are also kept sorted, so that prefix lookups use binary search.
+Lookups cost time proportional to the number of results.
+"""
+class SecondaryIndex:
+    """
+    Initializer
+
+    :param list pairs[=None]: List of (value, item) tuples to index.
+    """
+    def __init__(self, pairs = None):
+        super().__init__()
+        # Value to items. Dictionaries keep items in insertion order.
+        self._items = {}
+        if pairs is not None:
+            for value, item in pairs:
+                self._items.setdefault(value, {})[item] = None
+        self._values = sorted(self._items)
+    # End of initializer.
+
+    """
+    Method: add
+
+    Adds an item under value.
+
+    :param str value: The value.
+    :param object item: The item, which holds value.
+    """
+    def add(self, value, item):
+        items = self._items.get(value)
+        if items is None:
+            items = self._items[value] = {}
+            insort(self._values, value)
+        items[item] = None
+    # End of method add.
+
+    """
+    Method: remove
+
+    Removes an item from value.
+
+    :param str value: The value.
+    :param object item: The item, which held value.
+    """
+    def remove(self, value, item):
+        items = self._items.get(value)
+        if items is None:
+            return
+        items.pop(item, None)
+        if not items:
+            del self._items[value]
+            del self._values[bisect_left(self._values, value)]
+    # End of method remove.
+
+    """
+    Method: exact
+
+    Gets the items holding value.
+
+    :param str value: The value.
+    :return list: List of items.
+    """
+    def exact(self, value):
+        return list(self._items.get(value, ()))
+    # End of method exact.
+
+    """
+    Method: prefix
+
+    Gets the items holding a value starting with prefix.
+
+    :param str prefix: The prefix.
+    :return list: List of distinct items.
+    """
+    def prefix(self, prefix):
+        start = bisect_left(self._values, prefix)
+        end = bisect_right(self._values, prefix + chr(0x10ffff), start)
+        items = {}
+        for value in self._values[start:end]:
+            items.update(self._items[value])
+        return list(items)
+    # End of method prefix.
+
+    """
+    Method: groups
+
+    Gets every distinct value with its items.
+
+    :return list: List of (value, list of items) tuples, ordered by value.
+    """
+    def groups(self):
+        return [(value, list(self._items[value])) for value in self._values]
+    # End of method groups.
+
+    """
+    Method: counts
+
+    Gets every distinct value with the number of its items and its first item.
+    Counts are kept by the index, so no items are visited.
+
+    :return list: List of (value, count, item) tuples, ordered by value.
+    """
+    def counts(self):
+        counts = []
+        for value in self._values:
+            items = self._items[value]
+            counts.append((value, len(items), next(iter(items))))
+        return counts
+    # End of method counts.
+# End of class SecondaryIndex.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+
+# imports
+import os
+import mmap
+import struct
+import hashlib
+from array import array
+from lxml import etree
+from library.support.records import RecordSource
+
+"""
+Class: Snapshot
+
+Binary sidecar of a library file, holding its decoded records, so that the
+library may be loaded without parsing and validating XML again.
+A snapshot is valid only for the library and schema files it has been created
+from, identified by their SHA-256 hashes.
+
+File layout, integers are 64 bit in native byte order and sections are 8 byte aligned:
+    header: magic, library hash, schema hash, number of strings, number of records.
+    string offsets and UTF-8 string data: every distinct value is stored once.
+    record offsets and record codes: the fields of every record as string codes,
+    one slot per field followed by the values of multiple value fields.
+    element offsets and element data: the XML of every element, parsed only
+    when the element node is needed.
+The file is memory mapped and arrays are read in place. Strings are decoded on
+first use and records are decoded lazily, field by field, from their codes.
+"""
+class Snapshot:
+    # File format identifier.
+    MAGIC = b"LIBSNAP2"
+    _header = struct.Struct("<8s32s32sqq")
+    # Slots of record classes, fields mapped to (slot, kind) tuples.
+    _layouts = {}
+
+    """
+    Initializer
+
+    Use static method load to open snapshot files.
+
+    :param mmap.mmap buffer: The mapped snapshot file.
+    :param memoryview stringoffsets: String offsets in string data.
+    :param int stringstart: The position of string data in the file.
+    :param memoryview recordoffsets: Record offsets in codes.
+    :param memoryview codes: The record codes.
+    :param memoryview elementoffsets: Element offsets in element data.
+    :param int elementstart: The position of element data in the file.
+    """
+    def __init__(self, buffer, stringoffsets, stringstart, recordoffsets, codes, elementoffsets, elementstart):
+        super().__init__()
+        self._buffer = buffer
+        self._stringoffsets = stringoffsets
+        self._stringstart = stringstart
+        # Decoded strings by code, None until first use.
+        self._strings = [None] * (len(stringoffsets) - 1)
+        self._recordoffsets = recordoffsets
+        self._codes = codes
+        self._elementoffsets = elementoffsets
+        self._elementstart = elementstart
+    # End of initializer.
+
+    """
+    Method: size
+
+    Gets the number of records.
+
+    :return int: The number of records.
+    """
+    def size(self):
+        return len(self._recordoffsets) - 1
+    # End of method size.
+
+    """
+    Method: record
+
+    Gets the record of a row. Fields are decoded on first access, as long as the
+    snapshot is open.
+
+    :param type recordclass: The Record subclass of the library.
+    :param int row: The record number.
+    :param ValueDictionary dictionary[=None]: The dictionary sharing values of _interned fields.
+    :param iterable fields[=None]: The fields to decode now, all if None.
+    :return Record: The record.
+    """
+    def record(self, recordclass, row, dictionary = None, fields = None):
+        return recordclass.from_node(SnapshotRow(self, self._recordoffsets[row]), dictionary, fields)
+    # End of method record.
+
+    """
+    Method: column
+
+    Decodes a text or multiple value field of every record, without creating
+    records. Values are not shared through a ValueDictionary.
+
+    :param type recordclass: The Record subclass of the library.
+    :param str field: The field.
+    :return list_or_None: Union[list, None], the values by record number, None if the field is missing or holds nested records.
+    """
+    def column(self, recordclass, field):
+        slot, kind = Snapshot._slots(recordclass).get(field, (None, None))
+        codes = self._codes
+        strings = self._strings
+        values = []
+        if kind == "text":
+            for position in self._recordoffsets[:-1]:
+                code = codes[position + slot]
+                values.append(None if code < 0 else strings[code] or self._string(code))
+        elif kind in ("list", "repeat"):
+            for position in self._recordoffsets[:-1]:
+                start = position + codes[position + slot] + 1
+                values.append(tuple([strings[code] or self._string(code) for code in codes[start:start + codes[start - 1]]]))
+        else:
+            return None
+        return values
+    # End of method column.
+
+    """
+    Method: node
+
+    Parses the element node of a record.
+
+    :param int row: The record number.
+    :return etree.Element: The node.
+    """
+    def node(self, row):
+        start = self._elementstart + self._elementoffsets[row]
+        end = self._elementstart + self._elementoffsets[row + 1]
+        return etree.fromstring(self._buffer[start:end])
+    # End of method node.
+
+    """
+    Method: close
+
+    Releases the mapped file.
+    """
+    def close(self):
+        for view in (self._stringoffsets, self._recordoffsets, self._codes, self._elementoffsets):
+            view.release()
+        self._buffer.close()
+    # End of method close.
+
+    """
+    Static method: digest
+
+    Calculates the SHA-256 hash of a file.
+
+    :param str path: The file path.
+    :return bytes: The hash.
+    :raise OSError: If the file cannot be read.
+    """
+    @staticmethod
+    def digest(path):
+        sha = hashlib.sha256()
+        with open(path, "rb") as hashfile:
+            for block in iter(lambda: hashfile.read(1 << 20), b""):
+                sha.update(block)
+        return sha.digest()
+    # End of static method digest.
+
+    """
+    Static method: load
+
+    Opens a snapshot file, if it has been created from files with the given hashes.
+
+    :param str path: The snapshot file path.
+    :param bytes xmlhash: The hash of the library file.
+    :param bytes xsdhash: The hash of the schema file.
+    :return Snapshot_or_None: Union[Snapshot, None], None if the snapshot is missing, stale or corrupted.
+    """
+    @staticmethod
+    def load(path, xmlhash, xsdhash):
+        try:
+            with open(path, "rb") as snapshotfile:
+                buffer = mmap.mmap(snapshotfile.fileno(), 0, access = mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        # Views of the mapped file, released before the file is closed.
+        views = []
+        try:
+            magic, xmlsnap, xsdsnap, stringcount, recordcount = Snapshot._header.unpack_from(buffer, 0)
+            if magic != Snapshot.MAGIC or xmlsnap != xmlhash or xsdsnap != xsdhash:
+                buffer.close()
+                return None
+            view = memoryview(buffer)
+            views.append(view)
+            position = Snapshot._header.size
+            stringoffsets, position = Snapshot._ints(view, position, stringcount + 1)
+            views.append(stringoffsets)
+            stringstart = position
+            position = Snapshot._align(position + stringoffsets[-1])
+            recordoffsets, position = Snapshot._ints(view, position, recordcount + 1)
+            views.append(recordoffsets)
+            codes, position = Snapshot._ints(view, position, recordoffsets[-1])
+            views.append(codes)
+            elementoffsets, position = Snapshot._ints(view, position, recordcount + 1)
+            views.append(elementoffsets)
+            view.release()
+            if position + elementoffsets[-1] > len(buffer):
+                raise ValueError("Truncated snapshot.")
+            return Snapshot(buffer, stringoffsets, stringstart, recordoffsets, codes, elementoffsets, position)
+        except (struct.error, ValueError, TypeError, IndexError):
+            # Corrupted snapshot.
+            for view in views:
+                view.release()
+            buffer.close()
+            return None
+    # End of static method load.
+
+    """
+    Static method: write
+
+    Creates a snapshot file. The file is replaced atomically.
+
+    :param str path: The snapshot file path.
+    :param bytes xmlhash: The hash of the library file.
+    :param bytes xsdhash: The hash of the schema file.
+    :param list records: The list of fully decoded Record of the library.
+    :param list nodes: The list of etree.Element of the records.
+    :raise OSError: If the file cannot be written.
+    """
+    @staticmethod
+    def write(path, xmlhash, xsdhash, records, nodes):
+        strings = {}
+        codes = array("q")
+        recordoffsets = array("q", [0])
+        for record in records:
+            Snapshot._encode(record, codes, strings)
+            recordoffsets.append(len(codes))
+        stringdata = bytearray()
+        stringoffsets = array("q", [0])
+        for string in strings:
+            stringdata += string.encode("utf-8")
+            stringoffsets.append(len(stringdata))
+        elementdata = bytearray()
+        elementoffsets = array("q", [0])
+        for node in nodes:
+            elementdata += etree.tostring(node, encoding = "UTF-8", with_tail = False)
+            elementoffsets.append(len(elementdata))
+        temp = path + ".temp"
+        with open(temp, "wb") as snapshotfile:
+            snapshotfile.write(Snapshot._header.pack(Snapshot.MAGIC, xmlhash, xsdhash, len(strings), len(records)))
+            for section in (stringoffsets, stringdata, recordoffsets, codes, elementoffsets, elementdata):
+                data = section.tobytes() if isinstance(section, array) else bytes(section)
+                snapshotfile.write(data)
+                snapshotfile.write(b"\0" * (Snapshot._align(len(data)) - len(data)))
+        os.replace(temp, path)
+    # End of static method write.
+
+    """
+    Static method: _encode
+
+    Appends the string codes of a record. Every child element tag has a slot,
+    in document order: text fields are one code, -1 if missing, and other fields
+    the position, relative to the record, of their number of values followed by
+    their codes or nested records.
+
+    :param Record record: The fully decoded record.
+    :param array.array codes: The record codes.
+    :param dict strings: The string table, strings mapped to codes.
+    """
+    @staticmethod
+    def _encode(record, codes, strings):
+        start = len(codes)
+        codes.extend([-1] * len(record._children))
+        for slot, (field, kind) in enumerate(record._children.values()):
+            value = getattr(record, field)
+            if kind == "text":
+                if value is not None:
+                    codes[start + slot] = strings.setdefault(value, len(strings))
+            else:
+                codes[start + slot] = len(codes) - start
+                codes.append(len(value))
+                for item in value:
+                    if isinstance(item, str):
+                        codes.append(strings.setdefault(item, len(strings)))
+                    else:
+                        Snapshot._encode(item, codes, strings)
+    # End of static method _encode.
+
+    """
+    Static method: _slots
+
+    Gets the slots of the fields of a record class.
+
+    :param type recordclass: The Record subclass.
+    :return dict: The (slot, kind) tuples by field, in document order.
+    """
+    @staticmethod
+    def _slots(recordclass):
+        slots = Snapshot._layouts.get(recordclass)
+        if slots is None:
+            slots = {field: (slot, kind) for slot, (field, kind) in enumerate(recordclass._children.values())}
+            Snapshot._layouts[recordclass] = slots
+        return slots
+    # End of static method _slots.
+
+    """
+    Method: _decode
+
+    Decodes fields of a record from its string codes.
+
+    :param type recordclass: The Record subclass.
+    :param int position: The position of the record in codes.
+    :param ValueDictionary dictionary: The dictionary sharing values of _interned fields, None to skip sharing.
+    :param iterable fields[=None]: The fields to decode, all if None.
+    :return tuple: The decoded values by field and, if all fields are decoded, the position following the record.
+    """
+    def _decode(self, recordclass, position, dictionary, fields = None):
+        codes = self._codes
+        slots = Snapshot._slots(recordclass)
+        values = {}
+        end = position + len(slots)
+        for field in (slots if fields is None else fields):
+            slot, kind = slots[field]
+            code = codes[position + slot]
+            intern = dictionary.intern if dictionary is not None and field in recordclass._interned else None
+            if kind == "text":
+                if code >= 0:
+                    values[field] = self._string(code) if intern is None else intern(self._string(code))
+                continue
+            start = position + code + 1
+            count = codes[start - 1]
+            if kind in ("list", "repeat"):
+                texts = [self._string(code) for code in codes[start:start + count]]
+                values[field] = tuple(texts) if intern is None else tuple(intern(text) for text in texts)
+                end = start + count
+            else:
+                items = []
+                for i in range(count):
+                    itemvalues, start = self._decode(kind, start, dictionary)
+                    items.append(kind(**itemvalues))
+                values[field] = tuple(items)
+                end = start
+        return (values, end)
+    # End of method _decode.
+
+    """
+    Method: _string
+
+    Gets a string of the string table, decoding it on first use.
+
+    :param int code: The string code.
+    :return str: The string.
+    """
+    def _string(self, code):
+        string = self._strings[code]
+        if string is None:
+            start = self._stringstart + self._stringoffsets[code]
+            string = self._buffer[start:self._stringstart + self._stringoffsets[code + 1]].decode("utf-8")
+            self._strings[code] = string
+        return string
+    # End of method _string.
+
+    """
+    Static method: _ints
+
+    Gets a 64 bit integer array of a mapped file without copying it.
+
+    :param memoryview view: The file view.
+    :param int position: The position of the array.
+    :param int count: The number of integers.
+    :return tuple: The array as a memoryview and the position following it.
+    """
+    @staticmethod
+    def _ints(view, position, count):
+        end = position + 8 * count
+        if end > len(view):
+            raise ValueError("Truncated snapshot.")
+        return (view[position:end].cast("q"), end)
+    # End of static method _ints.
+
+    """
+    Static method: _align
+
+    Rounds a size up to a multiple of 8.
+
+    :param int size: The size.
+    :return int: The aligned size.
+    """
+    @staticmethod
+    def _align(size):
+        return (size + 7) & ~7
+    # End of static method _align.
+# End of class Snapshot.
+
+"""
+Class: SnapshotRow
+
+Extends class RecordSource.
+Provides the values of a record from the codes of a snapshot row.
+"""
+class SnapshotRow(RecordSource):
+    __slots__ = ("_snapshot", "_position")
+
+    """
+    Initializer
+
+    :param Snapshot snapshot: The open snapshot.
+    :param int position: The position of the record in the snapshot codes.
+    """
+    def __init__(self, snapshot, position):
+        self._snapshot = snapshot
+        self._position = position
+    # End of initializer.
+
+    """
+    Method: decode
+
+    Decodes fields of a record.
+
+    :param type recordclass: The Record subclass.
+    :param dict missing: The (field, kind) tuples of the fields to decode, by child element tag.
+    :param ValueDictionary dictionary: The dictionary sharing values of _interned fields, None to skip sharing.
+    :return dict: The decoded values by field, missing values may be left out.
+    """
+    def decode(self, recordclass, missing, dictionary):
+        return self._snapshot._decode(recordclass, self._position, dictionary, [field for field, kind in missing.values()])[0]
+    # End of method decode.
+# End of class SnapshotRow.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
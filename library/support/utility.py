@@ -2,9 +2,11 @@
 
 # imports
 import os
+import sys
 import platform
 import re
 import calendar
+import unicodedata
 from lxml import etree
 
 """
@@ -42,6 +44,32 @@ class Utility:
         return answer.lower()
     # End of static method get_answer_yn.
 
+    """
+    Static method: get_key
+
+    Reads a single key press, without waiting for 'Enter' when input is a terminal.
+
+    :return str: The character read or an empty string at end of input.
+    """
+    @staticmethod
+    def get_key():
+        if platform.system() == "Windows":
+            # Platform specific modules are imported only where they exist.
+            import msvcrt
+            return msvcrt.getwch()
+        if not sys.stdin.isatty():
+            return sys.stdin.read(1)
+        import termios
+        import tty
+        fd = sys.stdin.fileno()
+        settings = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            return sys.stdin.read(1)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, settings)
+    # End of static method get_key.
+
     """
     Method: validate
 
@@ -144,4 +172,23 @@ class Utility:
         # String is a valid date.
         return match.group()
     # End of static method validate_date.
+
+    """
+    Static method: fold
+
+    Folds text for case insensitive comparison, using full Unicode case folding.
+    Optionally strips accents, so that "ΕΛΛΗΝΙΚΆ" matches "ελληνικα".
+
+    :param str text: The text to fold.
+    :param bool accents[=False]: Strip combining accent marks.
+    :return str: The folded text.
+    """
+    @staticmethod
+    def fold(text, accents = False):
+        text = unicodedata.normalize("NFKC", text).casefold()
+        if accents:
+            # Decompose and drop combining marks.
+            text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+        return text
+    # End of static method fold.
 # End of class Utility.
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+# imports
+import sys
+
+"""
+Class: ValueDictionary
+
+Keeps a single copy of every distinct value of highly repetitive fields, such
+as categories, formats or shops, so that records and indexes share the same
+string objects instead of holding one copy per record.
+Values are reference counted: a value is dropped, once every record holding it
+has released it, so that the dictionary does not grow with values of removed
+or edited elements. The dictionary counts its references and the memory they
+save.
+"""
+class ValueDictionary:
+    """
+    Initializer
+    """
+    def __init__(self):
+        super().__init__()
+        self._values = {}
+        # Number of references of every value.
+        self._counts = {}
+    # End of initializer.
+
+    """
+    Method: intern
+
+    Gets the dictionary copy of a value, adding the value if it is new.
+
+    :param str value: The value.
+    :return str: The equal dictionary value.
+    """
+    def intern(self, value):
+        existing = self._values.setdefault(value, value)
+        self._counts[existing] = self._counts.get(existing, 0) + 1
+        return existing
+    # End of method intern.
+
+    """
+    Method: release
+
+    Releases a reference of a value, dropping the value with its last reference.
+    Values, which are not in the dictionary, are ignored.
+
+    :param str value: The value.
+    """
+    def release(self, value):
+        count = self._counts.get(value)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[value] = count - 1
+        else:
+            del self._counts[value]
+            del self._values[value]
+    # End of method release.
+
+    """
+    Method: size
+
+    Gets the number of distinct values.
+
+    :return int: The number of values.
+    """
+    def size(self):
+        return len(self._values)
+    # End of method size.
+
+    """
+    Method: stats
+
+    Gets the instrumentation counters of the dictionary.
+
+    :return dict: Dictionary with keys "values", "references", "bytes", the size of dictionary values, and "saved".
+    """
+    def stats(self):
+        size = 0
+        references = 0
+        saved = 0
+        for value, count in self._counts.items():
+            valuesize = sys.getsizeof(value)
+            size += valuesize
+            references += count
+            # Every reference but the first one would hold a copy.
+            saved += (count - 1) * valuesize
+        return {"values": len(self._values), "references": references, "bytes": size, "saved": saved}
+    # End of method stats.
+# End of class ValueDictionary.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
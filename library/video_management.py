@@ -7,6 +7,7 @@ import csv
 from lxml import etree
 from library.management import Manager
 from library.support.utility import Utility
+from library.support.records import VideoRecord
 
 """
 Class: VideoManager
@@ -18,113 +19,83 @@ The class also supports validation of the XML file given an XSD schema, so that
 it may be used independently.
 """
 class VideoManager(Manager):
+    # Record fields of exported CSV files.
+    _csvfields = ["title", "formats"]
+
     """
     Initializer
     """
-    def __init__(self, storageroot, libfile, schemafile):
+    def __init__(self, storageroot, libfile, schemafile, **options):
         # Library type.
         libtype = "video"
         # Allow sorting element tags.
         sortingtags = ["title", "format"]
         uniquekey = "title"
+        # Element tags supporting lookups and counts by value.
+        grouptags = ["format", "genre", "label", "shop"]
+        # Element tags of library statistics.
+        facettags = ["format", "genre"]
+        # Element tags supporting range queries.
+        rangetags = {"releasedate": "date"}
         # Call parent initializer.
-        super().__init__(storageroot, libfile, schemafile, libtype, sortingtags, uniquekey)
+        super().__init__(storageroot, libfile, schemafile, libtype, sortingtags, uniquekey, VideoRecord, grouptags, facettags, rangetags = rangetags, **options)
     # End of initializer.
 
     # File import and export functionality.
     """
-    Method: import_csv
+    Method: _csv_element
 
-    Imports a CSV file as the XML library file.
+    Creates a library element from a CSV row.
     Only fields listed in sortingtags are supported.
 
-    Character set: UTF-8
-    Field delimiter: ,
-    Text delimiter: \
-
     Valid CSV header:
     Title,Format
 
-    :param str impfile: the file to import.
-    :return int: 0 on success, 1 if CSV header is not valid and 2 in case of filesystem write error.
+    :param dict row: The CSV row values by column name.
+    :return etree.Element: The new element.
+    :raise KeyError: If a column is missing.
     """
-    def import_csv(self, impfile):
-        try:
-            # List of video items.
-            videoitems = []
-            with open(impfile, newline="") as csvfile:
-                filereader = csv.DictReader(csvfile, quotechar="\\")
-                for row in filereader:
-                    # Create new element from elementdict.
-                    element = etree.Element(self._libtype)
-                    # Add subelements.
-                    subelement = etree.SubElement(element, "title")
-                    subelement.text = row["Title"]
-                    # Add format subelements.
-                    formats = row["Format"].split(", ")
-                    subelement = etree.SubElement(element, "formats")
-                    for bformat in formats:
-                        formatelement = etree.SubElement(subelement, "format")
-                        formatelement.text = bformat
-                    # Add new element to videoitems list.
-                    videoitems.append(element)
-                # Write the elements to a new library file.
-                wvideoitems = self._write_tree(videoitems)
-                if wvideoitems != 0:
-                    return wvideoitems
-        except OSError:
-            return 2
-        except KeyError:
-            return 1
-        # File import was successful.
-        return 0
-    # End of method import_csv.
+    def _csv_element(self, row):
+        # Create new element from row.
+        element = etree.Element(self._libtype)
+        # Add subelements.
+        subelement = etree.SubElement(element, "title")
+        subelement.text = row["Title"]
+        # Add format subelements.
+        formats = row["Format"].split(", ")
+        subelement = etree.SubElement(element, "formats")
+        for bformat in formats:
+            formatelement = etree.SubElement(subelement, "format")
+            formatelement.text = bformat
+        return element
+    # End of method _csv_element.
 
     """
-    Method: export_csv
+    Method: _csv_header
 
-    Exports XML library file as a CSV file.
-    Only fields listed in sortingtags are supported.
+    Gets the header row of exported CSV files.
 
-    Character set: UTF-8
-    Field delimiter: ,
-    Text delimiter: \
+    :return list: List of str, the column names.
+    """
+    def _csv_header(self):
+        return [self._sortingtags[0].title(), self._sortingtags[1].title()]
+    # End of method _csv_header.
+
+    """
+    Method: _csv_row
+
+    Gets the CSV row of an item.
+    Only fields listed in sortingtags are supported.
 
     Valid CSV header:
     Title,Format
 
-    :param str expfile: the file to export.
-    :return int: 0 on success, 1 if library file is not valid and 2 in case of error.
+    :param Record record: The item record, with the fields of _csvfields decoded.
+    :return list: List of str, the column values.
     """
-    def export_csv(self, expfile):
-        try:
-            # Open CSV file for writing.
-            with open(expfile, "w", newline = "") as csvfile:
-                filewriter = csv.writer(csvfile, quotechar = "\\", quoting = csv.QUOTE_MINIMAL)
-                # Write header row.
-                filewriter.writerow([self._sortingtags[0].title(),
-                                     self._sortingtags[1].title()])
-                # Get all items
-                items = self.get_all_elements()
-                # Check for errors before proceed.
-                if isinstance(items, int):
-                    return items
-                # Check if library is empty.
-                if items is None:
-                    return 0
-                # Write items to CSV file.
-                for item in items:
-                    formats = []
-                    # Add formats.
-                    for bformat in item[1]:
-                        formats.append(bformat.text)
-                    # Write row.
-                    filewriter.writerow([item[0].text, ", ".join(formats)])
-        except OSError:
-            return 2
-        # File export was successful.
-        return 0
-    # End of method export_csv.
+    def _csv_row(self, record):
+        return [record.title, ", ".join(record.formats)]
+    # End of method _csv_row.
 
     # Storage management methods.
     """
@@ -243,116 +214,9 @@ class VideoManager(Manager):
 
     # Element manipulation methods.
     """
-    Method: search_elements
-
-    Search for elements containing a given value.
-
-    :param str element: The element tag containing the value. Should be in _sortingtags list.
-    :param str value: The value inside element tag to search for.
-    :param bool ascending[=True]: The order to sort the results.
-    :return int_or_list_or_None: Union[int, list, None].
-    """
-    def search_elements(self, element, value, ascending = True):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        if element not in self._sortingtags:
-            return None
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Search for elements containing the value.
-        tnodes = None
-        if element == "format":
-            tnodes = tree.xpath("/library/{0}/{1}s/{1}[contains(translate(., '{3}', '{4}'), '{2}')]/ancestor::{0}".format(self._libtype, element, value.lower(), self._uppercase, self._lowercase))
-        else:
-            tnodes = tree.xpath("/library/{0}/{1}[contains(translate(., '{3}', '{4}'), '{2}')]/ancestor::{0}".format(self._libtype, element, value.lower(), self._uppercase, self._lowercase))
-
-        # Return elements if exist or none if list is empty.
-        if tnodes:
-            # Sort the list.
-            index = self._sortingtags.index(element)
-            if element == "format":
-                # Sort by the first listed format.
-                tnodes.sort(key = lambda element: element[index][0].text.title(), reverse = not ascending)
-            else:
-                tnodes.sort(key = lambda element: element[index].text.title(), reverse = not ascending)
-            return tnodes
-        else:
-            return None
-    # End of method search_elements.
-
-    """
-    Method: get_all_elements
-
-    Gets all elements in the specified order.
-
-    :param str element[=None]: The element tag on which get will be based. Should be in _sortingtags list.
-    :param bool ascending[=True]: The order to sort the results.
-    :return int_or_list_or_None: Union[int, list, None].
-    """
-    def get_all_elements(self, element = None, ascending = True):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Get a list of all elements.
-        tnodes = tree.xpath("/library/{}".format(self._libtype))
-
-        # Return elements if exist or none if list is empty.
-        if tnodes:
-            # If element is None, title is used.
-            if element is None:
-                element = "title"
-            # Sort the list.
-            index = self._sortingtags.index(element)
-            if element == "format":
-                # Sort by the first listed format.
-                tnodes.sort(key = lambda element: element[index][0].text.title(), reverse = not ascending)
-            else:
-                tnodes.sort(key = lambda element: element[index].text.title(), reverse = not ascending)
-            return tnodes
-        else:
-            return None
-    # End of method get_all_elements.
-
-    """
-    Method: get_element
+    Method: _create_element
 
-    Gets an element by unique value.
-
-    :param str element: The exact value in element title.
-    :return int_or_etree.Element_or_None: Union[int, etree.Element, None].
-    """
-    def get_element(self, element):
-        # Validate storage.
-        validate = self.validate()
-        if validate != 0:
-            return validate
-
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Find node.
-        # Scheme validation garanties unique key value, so a list containing
-        # only one element on an empty one will be returned.
-        tnodes = tree.xpath("/library/{0}/title[text()='{1}']/ancestor::{0}".format(self._libtype, element))
-
-        # Return element if exists or none if list is empty
-        if tnodes:
-            return tnodes[0]
-        else:
-            return None
-    # End of method get_element.
-
-    """
-    Method: add_element
-
-    Adds an element.
+    Creates a library element from its python dictionary form.
 
     Python dictionary form:
     {
@@ -360,63 +224,37 @@ class VideoManager(Manager):
         "releasedate": "YYYY-MM-DD", "label": "", "shop": ""
     }
 
-    :param dict elementdict: The python dictionary containing the values of the element to be added to library.
-    :return int: 0 on success, 1 on dictionary key error, 2 on write file error and 3 on validation error.
+    :param dict elementdict: The python dictionary containing the values of the element.
+    :return etree.Element: The new element.
+    :raise KeyError: If a mandatory value is missing.
     """
-    def add_element(self, elementdict):
+    def _create_element(self, elementdict):
         # Create new element from elementdict.
         element = etree.Element(self._libtype)
-        try:
-            subelement = etree.SubElement(element, "title")
-            subelement.text = elementdict["title"]
-            # Add format subelements.
-            subelement = etree.SubElement(element, "formats")
-            for bformat in elementdict["formats"]:
-                formatelement = etree.SubElement(subelement, "format")
-                formatelement.text = bformat
-            # Add optional subelements.
-            if "genres" in elementdict:
-                subelement = etree.SubElement(element, "genres")
-                for genre in elementdict["genres"]:
-                    genreelement = etree.SubElement(subelement, "genre")
-                    genreelement.text = genre
-            if "releasedate" in elementdict:
-                subelement = etree.SubElement(element, "releasedate")
-                subelement.text = elementdict["releasedate"]
-            if "label" in elementdict:
-                subelement = etree.SubElement(element, "label")
-                subelement.text = elementdict["label"]
-            if "shop" in elementdict:
-                subelement = etree.SubElement(element, "shop")
-                subelement.text = elementdict["shop"]
-            # Write to file.
-            return self._add_element_to_tree(element)
-        except KeyError:
-            return 1
-    # End of method add_element.
-
-    """
-    Method: remove_element
-
-    Removes an element.
-
-    :param str element: The exact value in element title.
-    :return int: 0 on success, 1 in case no node found, 2 on write file error and 3 on validation error.
-    """
-    def remove_element(self, element):
-        # Create xml tree.
-        tree = etree.parse(self._xmlfile)
-        # Get a list of all elements.
-        nodes = tree.xpath("/library/{}".format(self._libtype))
-        # Find the element to remove using exact match.
-        node = tree.xpath("/library/{0}/title[text()='{1}']/ancestor::{0}".format(self._libtype, element))
-        if not node:
-            return 1
-        # Remove element's node.
-        nodes.remove(node[0])
-        # Write to file.
-        return self._write_tree(nodes)
-    # End of method remove_element.
+        subelement = etree.SubElement(element, "title")
+        subelement.text = elementdict["title"]
+        # Add format subelements.
+        subelement = etree.SubElement(element, "formats")
+        for bformat in elementdict["formats"]:
+            formatelement = etree.SubElement(subelement, "format")
+            formatelement.text = bformat
+        # Add optional subelements.
+        if "genres" in elementdict:
+            subelement = etree.SubElement(element, "genres")
+            for genre in elementdict["genres"]:
+                genreelement = etree.SubElement(subelement, "genre")
+                genreelement.text = genre
+        if "releasedate" in elementdict:
+            subelement = etree.SubElement(element, "releasedate")
+            subelement.text = elementdict["releasedate"]
+        if "label" in elementdict:
+            subelement = etree.SubElement(element, "label")
+            subelement.text = elementdict["label"]
+        if "shop" in elementdict:
+            subelement = etree.SubElement(element, "shop")
+            subelement.text = elementdict["shop"]
+        return element
+    # End of method _create_element.
 
     """
     Method: show_table
@@ -431,26 +269,20 @@ class VideoManager(Manager):
         formatwidth = 6
         genrewidth = 5
         # Prepare for displaying.
-        for item in elements:
+        records = self._records(elements, ["title", "formats", "genres"])
+        for record in records:
             # Title width.
-            width = len(item[0].text.strip())
+            width = len(record.title)
             if titlewidth < width:
                 titlewidth = width
             # Format width.
-            formats = []
-            for bformat in item[1]:
-                formats.append(bformat.text.strip())
-            width = len(", ".join(formats))
+            width = len(", ".join(record.formats))
             if formatwidth < width:
                 formatwidth = width
             # Genre width.
-            if len(item) > 2 and item[2].tag == "genres":
-                genres = []
-                for genre in item[2]:
-                    genres.append(genre.text.strip())
-                width = len(", ".join(genres))
-                if genrewidth < width:
-                    genrewidth = width
+            width = len(", ".join(record.genres))
+            if genrewidth < width:
+                genrewidth = width
         # Display header.
         print("{:{}} | {:{}} | {:{}}".format(
                 self._sortingtags[0].title(), titlewidth,
@@ -459,21 +291,11 @@ class VideoManager(Manager):
         print("{}-|-{}-|-{}".format(
                 "-" * titlewidth, "-" * formatwidth, "-" * genrewidth))
         # Iterate though result as needed and display video item information.
-        for item in elements:
-            formats = []
-            genrestr = ""
-            for bformat in item[1]:
-                formats.append(bformat.text.strip())
-            formatstr = ", ".join(formats)
-            if len(item) > 2 and item[2].tag == "genres":
-                genres = []
-                for genre in item[2]:
-                    genres.append(genre.text.strip())
-                genrestr = ", ".join(genres)
+        for record in records:
             print("{:{}} | {:{}} | {:{}}".format(
-                item[0].text.strip(), titlewidth,
-                formatstr, formatwidth,
-                genrestr, genrewidth))
+                record.title, titlewidth,
+                ", ".join(record.formats), formatwidth,
+                ", ".join(record.genres), genrewidth))
     # End of method show_table.
 
     # Display methods.
@@ -534,39 +356,8 @@ class VideoManager(Manager):
     :return dict: The python dictionary version of the XML node.
     """
     def _xmlitem_to_dict(self, element):
-        # Create python dictionary parsing element's values.
-        videodict = {}
-        genres = None
-        for item in element.iterchildren():
-            # Making sure formats, genres and tracks tags have text,
-            # so that they will be iterated.
-            if item.tag == "formats":
-                item.text = " "
-            if item.tag == "genres":
-                item.text = " "
-
-            # Elements in video.
-            if item.text is not None:
-                videodict[item.tag] = item.text.strip()
-                if item.tag == "formats":
-                    formats = []
-                    # Elements in formats.
-                    for subitem in item.iterchildren():
-                        if subitem.text is not None:
-                            formats.append(subitem.text.strip())
-                if item.tag == "genres":
-                    genres = []
-                    # Elements in genres.
-                    for subitem in item.iterchildren():
-                        if subitem.text is not None:
-                            genres.append(subitem.text.strip())
-
-        # Add lists to video dictionary.
-        videodict["formats"] = formats
-        if genres:
-            videodict["genres"] = genres
-
-        return videodict
+        # Create python dictionary from the element's record.
+        return VideoRecord.from_node(element).to_dict()
     # End of method _xmlitem_to_dict.
 
     """
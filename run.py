@@ -2,18 +2,20 @@
 
 # Imports.
 import argparse
-import ast
-from application import Application
+import sys
+# The application is imported only when commands run in this process, since
+# commands sent to the library daemon do not need it.
+from daemon import Daemon
 
 # The following section contains code to execute when script is run from the command line.
 """
-Function: main
+Function: create_parser
 
-Entry point for the execution of the script.
-Command line arguments will be parsed and translated to their respecive target
-fuctionality.
+Creates the command line arguments parser.
+
+:return argparse.ArgumentParser: The parser.
 """
-def main():
+def create_parser():
     # Set command line arguments.
     parser = argparse.ArgumentParser(
                 prog = "Library Management",
@@ -28,26 +30,55 @@ def main():
     excluegroup1.add_argument("-c", "--configure", action = "store_true", help = "create or reset configuration.")
     excluegroup1.add_argument("-l", "--load", help = "load library of type 'LOAD'.")
     excluegroup1.add_argument("--validate-configuration", action = "store_true", help = "validate configuration.")
+    excluegroup1.add_argument("--search-all", action = "store_true", help = "search titles of all library types for 'VALUE' and show ranked results.")
+    excluegroup1.add_argument("--serve", action = "store_true", help = "run the library daemon, which keeps libraries loaded and runs the commands of other run.py calls.")
+    excluegroup1.add_argument("--http", action = "store_true", help = "run the HTTP JSON API of all library types on localhost port 'PORT'.")
+    excluegroup1.add_argument("--batch", help = "run the JSON lines commands of file 'BATCH', or of the standard input if '-', and print their results as JSON lines.")
 
     excluegroup2 = parser.add_mutually_exclusive_group()
     excluegroup2.add_argument("--add", help = "add item 'ADD' to the loaded library.")
     excluegroup2.add_argument("--remove", help = "remove item 'REMOVE' from the loaded library.")
     excluegroup2.add_argument("--search", help = "search in elements 'SEARCH' of the loaded library and show results in ascending order.")
     excluegroup2.add_argument("--show", help = "show specific item of the loaded library.")
+    excluegroup2.add_argument("--find", help = "search all fields of the loaded library for words 'FIND' and show best matches first.")
     excluegroup2.add_argument("--show-all", action = "store_true", help = "show all items of the loaded library sorted by the default element in ascending order.")
+    excluegroup2.add_argument("--show-by", help = "show items of the loaded library with element 'SHOW_BY' equal to 'VALUE', sorted by title.")
+    excluegroup2.add_argument("--count-by", help = "show the number of items of the loaded library by distinct value of element 'COUNT_BY'.")
+    excluegroup2.add_argument("--show-range", help = "show items of the loaded library with date or number element 'SHOW_RANGE' from 'LOW' to 'HIGH'.")
+    excluegroup2.add_argument("--stats", action = "store_true", help = "show statistics of the loaded library.")
     excluegroup2.add_argument("--show-all-by", help = "show all items of the loaded library sorted by 'SHOW_ALL_BY' element in ascending order.")
 
     excluegroup3 = parser.add_mutually_exclusive_group()
     excluegroup3.add_argument("--export-csv", help = "export loaded library to file 'EXPORT_CSV'.")
-    excluegroup3.add_argument("--import-csv", help = "import file 'IMPORT_CSV' to the loaded library.")
+    excluegroup3.add_argument("--import-csv", help = "import file 'IMPORT_CSV' to the loaded library, only if all its rows are valid.")
+    excluegroup3.add_argument("--export-jsonl", help = "export every value of the loaded library to JSON lines file 'EXPORT_JSONL'.")
+    excluegroup3.add_argument("--import-jsonl", help = "import JSON lines file 'IMPORT_JSONL' to the loaded library, only if all its lines are valid.")
 
+    parser.add_argument("--import-jobs", type = int, default = 1, help = "the number of processes converting the rows of an imported CSV file (default 1).")
+    parser.add_argument("--mode", choices = ["replace", "upsert", "merge"], default = "replace", help = "how to import a file: replace the library, add and replace items, or add items and update their values (default replace).")
+    parser.add_argument("--unsorted", action = "store_true", help = "export items in the order of the library file, streaming them without loading the library.")
     parser.add_argument("--reverse", action = "store_true", help = "sort items in reverse (descending) order.")
     parser.add_argument("--value", help = "the 'VALUE' to search for.")
+    parser.add_argument("--fuzzy", action = "store_true", help = "search for approximate matches of title, author or artist, closest first.")
+    parser.add_argument("--prefix", action = "store_true", help = "match values starting with 'VALUE' instead of equal to it.")
+    parser.add_argument("--low", help = "the lowest value of a range, unbounded if missing.")
+    parser.add_argument("--high", help = "the highest value of a range, unbounded if missing.")
+    parser.add_argument("--distance", type = int, default = 2, help = "the maximum edit distance of every word of approximate matches, at most 2 (default 2).")
+    parser.add_argument("--port", type = int, default = 8080, help = "the TCP port of the HTTP JSON API (default 8080).")
+    parser.add_argument("--no-daemon", action = "store_true", help = "run the command in this process, even if the library daemon is running.")
     parser.add_argument("--version", action = "version", version = "%(prog)s 0.8.0")
+    return parser
+# End of function create_parser.
 
-    args = parser.parse_args()
-    # Create Application object app.
-    app = Application()
+"""
+Function: execute
+
+Translates parsed command line arguments to their respective target functionality.
+
+:param Application app: The application.
+:param argparse.Namespace args: The parsed command line arguments.
+"""
+def execute(app, args):
     # React to arguments passed.
     if args.configure:
         print("Reconfiguring the application...")
@@ -58,23 +89,68 @@ def main():
         print("Validating configuration...")
         app.validate_configuration()
         return
+    if args.http:
+        from server import LibraryServer
+        managers = {}
+        for libtype in app.library_types():
+            managers[libtype] = app.get_manager(libtype)
+        LibraryServer(managers, args.port).run()
+        return
+    if args.batch:
+        from batch import BatchRunner
+        if args.batch == "-":
+            failures = BatchRunner(app).run(sys.stdin)
+        else:
+            try:
+                with open(args.batch, encoding = "utf-8") as batchfile:
+                    failures = BatchRunner(app).run(batchfile)
+            except OSError as error:
+                print("Failed to read batch file: {}".format(error))
+                sys.exit(1)
+        if failures:
+            sys.exit(1)
+        return
+    if args.search_all:
+        if args.value:
+            app.show_search_all(args.value)
+        else:
+            print("No value to search for. Please use argument --value.")
+        return
     if args.load:
         if args.export_csv:
-            app.get_manager(args.load.lower()).show_export_csv(args.export_csv)
+            app.get_manager(args.load.lower()).show_export_csv(args.export_csv, not args.unsorted)
         elif args.import_csv:
-            app.get_manager(args.load.lower()).show_import_csv(args.import_csv)
+            app.get_manager(args.load.lower()).show_import_csv(args.import_csv, args.import_jobs, args.mode)
+        elif args.export_jsonl:
+            app.get_manager(args.load.lower()).show_export_jsonl(args.export_jsonl, not args.unsorted)
+        elif args.import_jsonl:
+            app.get_manager(args.load.lower()).show_import_jsonl(args.import_jsonl, args.mode)
         elif args.show_all:
             app.get_manager(args.load.lower()).show_all_elements(ascending = not args.reverse)
         elif args.show_all_by:
             app.get_manager(args.load.lower()).show_all_elements(args.show_all_by, not args.reverse)
         elif args.show:
             app.get_manager(args.load.lower()).show_element(args.show)
+        elif args.find:
+            app.get_manager(args.load.lower()).show_find_elements(args.find)
+        elif args.show_by:
+            if args.value:
+                app.get_manager(args.load.lower()).show_elements_by(args.show_by, args.value, args.prefix, not args.reverse)
+            else:
+                print("No value to search for. Please use argument --value.")
+        elif args.show_range:
+            app.get_manager(args.load.lower()).show_elements_in_range(args.show_range, args.low, args.high, not args.reverse)
+        elif args.stats:
+            app.get_manager(args.load.lower()).show_statistics()
+        elif args.count_by:
+            app.get_manager(args.load.lower()).show_count_elements_by(args.count_by)
         elif args.search:
             if args.value:
-                app.get_manager(args.load.lower()).show_search_elements(args.search, args.value, not args.reverse)
+                app.get_manager(args.load.lower()).show_search_elements(args.search, args.value, not args.reverse, args.fuzzy, args.distance)
             else:
                 print("No value to search for. Please use argument --value.")
         elif args.add:
+            import ast
             app.get_manager(args.load.lower()).show_add_element(ast.literal_eval(args.add))
         elif args.remove:
             app.get_manager(args.load.lower()).show_remove_element(args.remove)
@@ -89,6 +165,12 @@ def main():
     if args.import_csv:
         print("Argument --import-csv, should be used with argument --load.")
         return
+    if args.export_jsonl:
+        print("Argument --export-jsonl, should be used with argument --load.")
+        return
+    if args.import_jsonl:
+        print("Argument --import-jsonl, should be used with argument --load.")
+        return
     if args.add:
         # There is no library loaded.
         print("Argument --add, should be used with argument --load.")
@@ -113,14 +195,111 @@ def main():
         # There is no library loaded.
         print("Argument --search, should be used with argument --load.")
         return
+    if args.find:
+        # There is no library loaded.
+        print("Argument --find, should be used with argument --load.")
+        return
+    if args.show_by:
+        # There is no library loaded.
+        print("Argument --show-by, should be used with argument --load.")
+        return
+    if args.count_by:
+        # There is no library loaded.
+        print("Argument --count-by, should be used with argument --load.")
+        return
+    if args.show_range:
+        # There is no library loaded.
+        print("Argument --show-range, should be used with argument --load.")
+        return
+    if args.stats:
+        # There is no library loaded.
+        print("Argument --stats, should be used with argument --load.")
+        return
     if args.value:
-        print("Argument --value, should be used with argument --search.")
+        print("Argument --value, should be used with argument --search, --show-by or --search-all.")
+        return
+    if args.fuzzy:
+        print("Argument --fuzzy, should be used with argument --search.")
+        return
+    if args.low or args.high:
+        print("Arguments --low and --high, should be used with argument --show-range.")
+        return
+    if args.prefix:
+        print("Argument --prefix, should be used with argument --show-by.")
+        return
+    if args.unsorted:
+        print("Argument --unsorted, should be used with arguments --export-csv and --export-jsonl.")
         return
     if args.reverse:
         print("Argument --reverse, should be used with arguments --search, --show-all and --show-all-by.")
         return
     # Display menu
     app.show_menu()
+# End of function execute.
+
+"""
+Function: serve
+
+Runs the library daemon until interrupted. Library managers are kept between
+commands.
+
+:return int: 0 on normal termination, 1 if the daemon cannot start.
+"""
+def serve():
+    from application import Application
+    app = Application()
+    parser = create_parser()
+    def handler(argv):
+        execute(app, parser.parse_args(argv))
+    return Daemon(handler).serve()
+# End of function serve.
+
+"""
+Function: daemon_command
+
+Checks if a command may be run by the library daemon. Interactive commands,
+such as menus and configuration, always run in this process.
+
+:param argparse.Namespace args: The parsed command line arguments.
+:return bool: True if the command is not interactive.
+"""
+def daemon_command(args):
+    if args.search_all:
+        return True
+    if not args.load:
+        return False
+    actions = [args.add, args.remove, args.search, args.show, args.find, args.show_all, args.show_by, args.count_by,
+               args.show_range, args.stats, args.show_all_by, args.export_csv, args.import_csv,
+               args.export_jsonl, args.import_jsonl]
+    return any(actions)
+# End of function daemon_command.
+
+"""
+Function: main
+
+Entry point for the execution of the script.
+Command line arguments will be parsed and translated to their respecive target
+fuctionality. Non interactive commands are sent to the library daemon, if it
+is running.
+
+:param list argv[=None]: The command line arguments, sys.argv if None.
+"""
+def main(argv = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    args = create_parser().parse_args(argv)
+    if args.serve:
+        sys.exit(serve())
+    if not args.no_daemon and daemon_command(args):
+        response = Daemon.request(argv)
+        if response is not None:
+            print(response["output"], end = "")
+            if response["code"]:
+                sys.exit(response["code"])
+            return
+    from application import Application
+    # Writes of concurrent HTTP clients arriving within 5 milliseconds are committed together.
+    execute(Application(batchwindow = 0.005 if args.http else None), args)
 # End of function main.
 
 # Test running or loading.
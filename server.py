@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+# Imports
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, unquote
+
+"""
+Class: LibraryLock
+
+Readers-writer lock of a library. Reads never run together with writes, so
+that readers never see a library in the middle of a write. Writes may run
+together, since the library manager commits them one batch at a time and
+coalesces writes arriving together. Waiting writers go before new readers.
+"""
+class LibraryLock:
+    """
+    Initializer
+
+    Should be created in the running event loop.
+    """
+    def __init__(self):
+        super().__init__()
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writers = 0
+        self._waitingwriters = 0
+    # End of initializer.
+
+    """
+    Method: read
+
+    Runs a read operation in an executor.
+
+    :param Executor executor: The executor.
+    :param callable operation: The operation.
+    :return object: The result of the operation.
+    """
+    async def read(self, executor, operation):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._writers == 0 and self._waitingwriters == 0)
+            self._readers += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, operation)
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+    # End of method read.
+
+    """
+    Method: write
+
+    Runs a write operation in an executor, after every read operation on the
+    library has finished.
+
+    :param Executor executor: The executor.
+    :param callable operation: The operation.
+    :return object: The result of the operation.
+    """
+    async def write(self, executor, operation):
+        async with self._condition:
+            self._waitingwriters += 1
+            try:
+                await self._condition.wait_for(lambda: self._readers == 0)
+            finally:
+                self._waitingwriters -= 1
+            self._writers += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, operation)
+        finally:
+            async with self._condition:
+                self._writers -= 1
+                self._condition.notify_all()
+    # End of method write.
+# End of class LibraryLock.
+
+"""
+Class: LibraryServer
+
+HTTP server of a JSON API over library managers, listening on localhost only.
+Requests are parsed by the event loop and library operations, which parse,
+validate and write XML, run in a thread pool, so that slow operations do not
+block other clients.
+
+Endpoints, where LIBTYPE is a configured library type and KEY the unique value
+of an item, such as the title or isbn:
+    GET    /LIBTYPE/items[?element=TAG&ascending=false]: all items.
+    GET    /LIBTYPE/search?element=TAG&value=VALUE[&ascending=false]: items with TAG containing VALUE.
+    GET    /LIBTYPE/items/KEY: a single item.
+    POST   /LIBTYPE/items: add the item of the JSON request body.
+    PUT    /LIBTYPE/items/KEY: replace an item with the item of the JSON request body.
+    DELETE /LIBTYPE/items/KEY: remove an item.
+Items are JSON objects in the python dictionary form used to add items.
+Read responses are {"items": [...]} or {"item": {...}}, write responses are
+{"result": code}, where code is the result code of the manager method, and
+errors are {"error": message}.
+"""
+class LibraryServer:
+    # HTTP status of write result codes: success, invalid item or missing item, write error, validation error.
+    _writestatus = {0: 200, 1: 400, 2: 500, 3: 422}
+    _reasons = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+    # Maximum size of request bodies.
+    _maxbody = 1 << 20
+
+    """
+    Initializer
+
+    :param dict managers: Library managers by library type.
+    :param int port[=8080]: The TCP port, 0 for any free port.
+    :param int workers[=None]: The number of worker threads, ThreadPoolExecutor default if None.
+    """
+    def __init__(self, managers, port = 8080, workers = None):
+        super().__init__()
+        self._managers = managers
+        self.port = port
+        self._executor = ThreadPoolExecutor(max_workers = workers)
+        self._locks = {}
+        self._server = None
+    # End of initializer.
+
+    """
+    Method: start
+
+    Starts listening on localhost. The actual port is set to port.
+    """
+    async def start(self):
+        self._locks = {libtype: LibraryLock() for libtype in self._managers}
+        self._server = await asyncio.start_server(self._serve_connection, "127.0.0.1", self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+    # End of method start.
+
+    """
+    Method: close
+
+    Stops listening and waits for running operations to finish.
+    """
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait = True)
+    # End of method close.
+
+    """
+    Method: run
+
+    Serves requests until interrupted.
+    """
+    def run(self):
+        async def serve():
+            await self.start()
+            print("Library server listening on http://127.0.0.1:{}/. Press Ctrl+C to stop.".format(self.port))
+            try:
+                await self._server.serve_forever()
+            finally:
+                await self.close()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            print()
+    # End of method run.
+
+    """
+    Method: _serve_connection
+
+    Serves the requests of a connection, until the client closes it.
+
+    :param asyncio.StreamReader reader: The connection reader.
+    :param asyncio.StreamWriter writer: The connection writer.
+    """
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                requestline = await reader.readline()
+                if not requestline.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, separator, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                parts = requestline.decode("latin-1").split()
+                try:
+                    length = int(headers.get("content-length", "0") or "0")
+                except ValueError:
+                    # Answered as malformed below.
+                    length = -1
+                # The rest of a rejected request is not read, so its connection is closed.
+                close = True
+                if len(parts) != 3 or length < 0:
+                    status, body = 400, {"error": "Malformed request."}
+                elif length > LibraryServer._maxbody:
+                    status, body = 413, {"error": "Request body is too large."}
+                else:
+                    data = await reader.readexactly(length)
+                    status, body = await self._respond(parts[0].upper(), parts[1], data)
+                    close = headers.get("connection", "").lower() == "close" or parts[2] == "HTTP/1.0"
+                payload = json.dumps(body).encode("utf-8")
+                writer.write("HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: {}\r\n\r\n".format(
+                    status, LibraryServer._reasons[status], len(payload), "close" if close else "keep-alive").encode("latin-1") + payload)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+    # End of method _serve_connection.
+
+    """
+    Method: _respond
+
+    Runs the library operation of a request.
+
+    :param str method: The HTTP method.
+    :param str target: The request target, path and query.
+    :param bytes data: The request body.
+    :return tuple: The HTTP status and the JSON response body.
+    """
+    async def _respond(self, method, target, data):
+        url = urlsplit(target)
+        path = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if path[0] not in self._managers:
+            return (404, {"error": "Unsupported library type '{}'.".format(path[0])})
+        manager = self._managers[path[0]]
+        lock = self._locks[path[0]]
+        ascending = query.get("ascending", "true").lower() not in ("false", "0")
+        route = path[1:]
+        if route == ["items"] and method == "GET":
+            elements = await lock.read(self._executor, lambda: self._items(manager, manager.get_all_elements(query.get("element"), ascending)))
+            return self._read_response(elements, "items")
+        if route == ["search"] and method == "GET":
+            if "element" not in query or "value" not in query:
+                return (400, {"error": "Parameters element and value are required."})
+            elements = await lock.read(self._executor, lambda: self._items(manager, manager.search_elements(query["element"], query["value"], ascending)))
+            return self._read_response(elements, "items")
+        if len(route) == 2 and route[0] == "items" and method == "GET":
+            element = await lock.read(self._executor, lambda: self._item(manager, manager.get_element(route[1])))
+            if element is None:
+                return (404, {"error": "No item '{}' found.".format(route[1])})
+            return self._read_response(element, "item")
+        if route == ["items"] and method == "POST":
+            item = self._item_body(data)
+            if item is None:
+                return (400, {"error": "The request body should be a JSON object."})
+            result = await lock.write(self._executor, lambda: self._write(manager.add_element, item))
+            return (201 if result == 0 else LibraryServer._writestatus[result], {"result": result})
+        if len(route) == 2 and route[0] == "items" and method == "PUT":
+            item = self._item_body(data)
+            if item is None:
+                return (400, {"error": "The request body should be a JSON object."})
+            result = await lock.write(self._executor, lambda: self._write(manager.edit_element, route[1], item))
+            return (LibraryServer._writestatus[result], {"result": result})
+        if len(route) == 2 and route[0] == "items" and method == "DELETE":
+            result = await lock.write(self._executor, lambda: manager.remove_element(route[1]))
+            return (404 if result == 1 else LibraryServer._writestatus[result], {"result": result})
+        if route in (["items"], ["search"]) or (len(route) == 2 and route[0] == "items"):
+            return (405, {"error": "Method {} is not allowed.".format(method)})
+        return (404, {"error": "Unknown endpoint '{}'.".format(url.path)})
+    # End of method _respond.
+
+    """
+    Method: _read_response
+
+    Creates the response of a read operation.
+
+    :param object result: The python dictionary or list of python dictionaries read, an int on storage error.
+    :param str name: The name of the result in the response.
+    :return tuple: The HTTP status and the JSON response body.
+    """
+    def _read_response(self, result, name):
+        if isinstance(result, int):
+            return (500, {"error": "Invalid storage file."})
+        return (200, {name: result})
+    # End of method _read_response.
+
+    """
+    Method: _items
+
+    Converts library elements to python dictionaries.
+
+    :param Manager manager: The library manager.
+    :param list_or_int_or_None elements: Union[list, int, None], the result of a manager get method.
+    :return list_or_int: Union[list, int], list of dict, int on storage error.
+    """
+    def _items(self, manager, elements):
+        if isinstance(elements, int):
+            return elements
+        return [manager.element_to_dict(element) for element in elements or []]
+    # End of method _items.
+
+    """
+    Method: _item
+
+    Converts a library element to a python dictionary.
+
+    :param Manager manager: The library manager.
+    :param etree.Element_or_int_or_None element: Union[etree.Element, int, None], the result of get_element.
+    :return dict_or_int_or_None: Union[dict, int, None].
+    """
+    def _item(self, manager, element):
+        if element is None or isinstance(element, int):
+            return element
+        return manager.element_to_dict(element)
+    # End of method _item.
+
+    """
+    Method: _write
+
+    Runs a write operation of a manager with an item of a request, which may
+    hold values of the wrong type.
+
+    :param callable operation: The manager method.
+    :param list arguments: The arguments of the method.
+    :return int: The result code of the method, 1 if the item is not valid.
+    """
+    def _write(self, operation, *arguments):
+        try:
+            return operation(*arguments)
+        except (TypeError, ValueError, AttributeError):
+            return 1
+    # End of method _write.
+
+    """
+    Method: _item_body
+
+    Decodes the item of a request body.
+
+    :param bytes data: The request body.
+    :return dict_or_None: Union[dict, None], None if the body is not a JSON object.
+    """
+    def _item_body(self, data):
+        try:
+            item = json.loads(data.decode("utf-8"))
+        except ValueError:
+            return None
+        return item if isinstance(item, dict) else None
+    # End of method _item_body.
+# End of class LibraryServer.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+"""
+def main():
+    print(__file__)
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
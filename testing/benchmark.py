@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+# Imports
+import subprocess
+import statistics
+import time
+import sys
+import os
+# Application directory, holding run.py.
+appdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+"""
+Function: import_times
+
+Measures the startup of a run.py command, which starts cold on every call.
+The command runs once before measuring, so that compiled modules are cached.
+
+:param list argv: The command line arguments of run.py.
+:param int runs[=5]: The number of measured runs.
+:return tuple: The median wall time in seconds and a dictionary of the cumulative import times of modules in microseconds, of the last run.
+"""
+def import_times(argv, runs = 5):
+    command = [sys.executable, "-X", "importtime", os.path.join(appdir, "run.py")] + list(argv)
+    environment = dict(os.environ)
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+    walltimes = []
+    for run in range(runs + 1):
+        start = time.perf_counter()
+        completed = subprocess.run(command, cwd = appdir, env = environment, stdout = subprocess.DEVNULL,
+                                   stderr = subprocess.PIPE, universal_newlines = True)
+        if run > 0:
+            walltimes.append(time.perf_counter() - start)
+    modules = {}
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if line.startswith("import time:") and "|" in line:
+            selftime, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+    return (statistics.median(walltimes), modules)
+# End of function import_times.
+
+# The following section contains code to execute when script is run from the command line.
+"""
+Function: main
+
+Entry point for the execution of the script.
+Measures the startup of the run.py command given as arguments, by default
+run.py --load book --show X, and shows its slowest imports.
+"""
+def main():
+    argv = sys.argv[1:] or ["--load", "book", "--show", "X"]
+    walltime, modules = import_times(argv)
+    print("run.py {}".format(" ".join(argv)))
+    print("Wall time (median): {:.1f} ms".format(walltime * 1000))
+    print("Imported modules: {}".format(len(modules)))
+    for name in sorted(modules, key = modules.get, reverse = True)[:15]:
+        print("{:>10.1f} ms  {}".format(modules[name] / 1000, name))
+# End of function main.
+
+# Test running or loading.
+if __name__ == "__main__":
+    main()
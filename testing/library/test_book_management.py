@@ -6,6 +6,7 @@ from unittest.mock import patch
 from io import StringIO
 from lxml.etree import _Element
 import shutil
+import threading
 import sys
 import os
 # Set path for importing application modules.
@@ -14,6 +15,8 @@ sys.path.insert(0, appdir)
 # Import application modules.
 import library.book_management
 from library.book_management import BookManager
+from library.management import Manager
+from library.support.snapshot import Snapshot
 
 """
 Class: TestBookManager
@@ -34,7 +37,7 @@ class TestBookManager(unittest.TestCase):
         self.testlibrary = os.path.join(os.path.split(os.path.abspath(__file__))[0], "test_book_library.xml")
 
         # Initialize BookManager.
-        self.manager = BookManager(self.storagepath, "library.xml", "library.xsd")
+        self.manager = BookManager(self.storagepath, "library.xml", "library.xsd", snapshots = False)
 
         # Take test backup of library xml and schema.
         shutil.copy2(self.manager._xmlfile, self.xmlbackup)
@@ -52,6 +55,14 @@ class TestBookManager(unittest.TestCase):
         os.remove(self.xmlbackup)
         shutil.copy2(self.xsdbackup, self.manager._xsdfile)
         os.remove(self.xsdbackup)
+        # Remove snapshot of the test library.
+        if os.path.isfile(self.manager._snapshotfile):
+            os.remove(self.manager._snapshotfile)
+        # Remove journal of the test library.
+        if os.path.isfile(self.manager._xmlfile + ".journal"):
+            os.remove(self.manager._xmlfile + ".journal")
+        if os.path.isfile(self.manager._xmlfile + ".journal.lock"):
+            os.remove(self.manager._xmlfile + ".journal.lock")
     # End of method tearDown.
 
     """
@@ -86,6 +97,54 @@ class TestBookManager(unittest.TestCase):
         self.assertIsInstance(self.manager.search_elements("finished", "e"), list)
     # End of method test_search_elements.
 
+    """
+    Test function search_elements with non ASCII letters.
+    """
+    #@unittest.skip("Skipped.")
+    def test_search_elements_unicode(self):
+        book = {"title": "Ελληνικά Ærøskøbing", "authors": ["A"], "category": "A", "formats": ["eBook"],
+                "isbn": "1234567890987", "finished": "No"}
+        self.assertEqual(self.manager.add_element(book), 0)
+        self.assertEqual(len(self.manager.search_elements("title", "ΕΛΛΗΝΙΚΆ")), 1)
+        self.assertEqual(len(self.manager.search_elements("title", "ærøskøbing")), 1)
+        self.assertIsNone(self.manager.search_elements("title", "ελληνικα"))
+    # End of method test_search_elements_unicode.
+
+    """
+    Test function search_elements with accent folding.
+    """
+    #@unittest.skip("Skipped.")
+    def test_search_elements_accentfold(self):
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", accentfold = True, snapshots = False)
+        book = {"title": "Ελληνικά", "authors": ["Ærøskøbing"], "category": "A", "formats": ["eBook"],
+                "isbn": "1234567890987", "finished": "No"}
+        self.assertEqual(manager.add_element(book), 0)
+        self.assertEqual(len(manager.search_elements("title", "ελληνικα")), 1)
+        self.assertEqual(len(manager.search_elements("author", "ÆRØSKØBING")), 1)
+    # End of method test_search_elements_accentfold.
+
+    """
+    Test function fuzzy_search_elements with mistyped, missing and extra words.
+    """
+    #@unittest.skip("Skipped.")
+    def test_fuzzy_search_elements(self):
+        for isbn, title, author in [("1234567890987", "The Lord of the Rings", "J. R. R. Tolkien"),
+                                    ("1234567890988", "The Rings of Power", "Someone"),
+                                    ("1234567890989", "Of Mice and Men", "Steinbeck")]:
+            book = {"title": title, "authors": [author], "category": "A", "formats": ["eBook"], "isbn": isbn, "finished": "No"}
+            self.assertEqual(self.manager.add_element(book), 0)
+        elements = self.manager.fuzzy_search_elements("title", "Lord of teh Rings")
+        self.assertEqual([element[0].text for element in elements], ["The Lord of the Rings", "The Rings of Power"])
+        elements = self.manager.fuzzy_search_elements("title", "Lord of teh Rings", ascending = False)
+        self.assertEqual([element[0].text for element in elements], ["The Rings of Power", "The Lord of the Rings"])
+        elements = self.manager.fuzzy_search_elements("author", "Tolkein")
+        self.assertEqual([element.findtext("isbn") for element in elements], ["1234567890987"])
+        self.assertEqual(len(self.manager.fuzzy_search_elements("author", "tolkein jrr")), 1)
+        self.assertIsNone(self.manager.fuzzy_search_elements("author", "Tolkein", 0))
+        self.assertIsNone(self.manager.fuzzy_search_elements("title", "Mi"))
+        self.assertIsNone(self.manager.fuzzy_search_elements("category", "A"))
+    # End of method test_fuzzy_search_elements.
+
     """
     Test function show_search_elements using default order.
     """
@@ -105,6 +164,35 @@ Test  | Other            | Programming | Hardback, eBook | 1234567890124 | Yes
         self.assertEqual("".join(out.getvalue().split(os.linesep)), test)
     # End of method show_search_elements.
 
+    """
+    Test function show_incremental_search narrowing and widening results.
+    """
+    #@unittest.skip("Skipped.")
+    @patch.object(library.book_management.Utility, "clear")
+    @patch.object(library.book_management.Utility, "get_key")
+    @patch.object(library.management, "input", create = True)
+    def test_show_incremental_search(self, input, get_key, clear):
+        get_key.side_effect = ["s", "x", "\x7f", "\x7f", "o", "\r"]
+
+        originalout = sys.stdout
+        out = StringIO()
+        sys.stdout = out
+
+        self.manager.show_incremental_search("author")
+        sys.stdout = originalout
+
+        screens = out.getvalue().split("Search for author as you type [press 'Enter' to finish]:")
+        self.assertEqual(len(screens), 7)
+        self.assertNotIn("Title", screens[1])
+        self.assertIn("Someone, Elseone", screens[2])
+        self.assertNotIn("Other", screens[2])
+        self.assertIn("No item found.", screens[3])
+        self.assertIn("Someone, Elseone", screens[4])
+        self.assertNotIn("Title", screens[5])
+        self.assertIn("Other", screens[6])
+        self.assertNotIn("Someone", screens[6])
+    # End of method test_show_incremental_search.
+
     """
     Test function get_all_elements using default order.
     """
@@ -113,6 +201,196 @@ Test  | Other            | Programming | Hardback, eBook | 1234567890124 | Yes
         self.assertIsInstance(self.manager.get_all_elements(), list)
     # End of method test_get_all_elements_default_order.
 
+    """
+    Test function get_all_elements using natural ordering and article stripping.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_all_elements_collation(self):
+        for isbn, title in [("1234567890001", "Part 10"), ("1234567890002", "Part 2"), ("1234567890003", "The Part 3")]:
+            book = {"title": title, "authors": ["A"], "category": "A", "formats": ["eBook"],
+                    "isbn": isbn, "finished": "No"}
+            self.assertEqual(self.manager.add_element(book), 0)
+        titles = [item[0].text for item in self.manager.get_all_elements()]
+        self.assertEqual(titles, ["Part 2", "The Part 3", "Part 10", "Test", "Test"])
+    # End of method test_get_all_elements_collation.
+
+    """
+    Test functions get_elements_by and count_elements_by, using secondary indexes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_elements_by(self):
+        isbns = [item.findtext("isbn") for item in self.manager.get_elements_by("author", "someone")]
+        self.assertEqual(isbns, ["1234567890123"])
+        isbns = [item.findtext("isbn") for item in self.manager.get_elements_by("author", "o", True)]
+        self.assertEqual(isbns, ["1234567890124"])
+        self.assertIsNone(self.manager.get_elements_by("author", "Some"))
+        self.assertIsNone(self.manager.get_elements_by("edition", "1"))
+        self.assertEqual(self.manager.count_elements_by("author"), [("Elseone", 1), ("Other", 1), ("Someone", 1)])
+        self.assertEqual(self.manager.count_elements_by("format"), [("eBook", 2), ("Hardback", 2)])
+        # Secondary indexes follow library writes.
+        book = {"title": "New", "authors": ["someone"], "category": "A", "formats": ["eBook"],
+                "isbn": "1234567890001", "finished": "No"}
+        self.assertEqual(self.manager.add_element(book), 0)
+        self.assertEqual(len(self.manager.get_elements_by("author", "Someone")), 2)
+        self.assertEqual(self.manager.remove_element("1234567890123"), 0)
+        isbns = [item.findtext("isbn") for item in self.manager.get_elements_by("author", "Someone")]
+        self.assertEqual(isbns, ["1234567890001"])
+        self.assertEqual(self.manager.count_elements_by("author"), [("Other", 1), ("someone", 1)])
+    # End of method test_get_elements_by.
+
+    """
+    Test function get_statistics, following library writes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_statistics(self):
+        statistics = self.manager.get_statistics()
+        self.assertEqual(statistics["total"], 2)
+        self.assertEqual(statistics["facets"], [("category", [("Programming", 2)]),
+                                                ("format", [("eBook", 2), ("Hardback", 2)]),
+                                                ("finished", [("Yes", 2)]),
+                                                ("shop", [("Shop", 1)])])
+        progress = statistics["progress"]
+        self.assertEqual((progress.items, progress.units, progress.reached, progress.started, progress.completed), (1, 100, 10, 1, 0))
+        book = {"title": "New", "authors": ["A"], "category": "A", "formats": ["eBook"],
+                "isbn": "1234567890001", "pagenumber": "50", "lastpageread": "50", "finished": "No"}
+        self.assertEqual(self.manager.add_element(book), 0)
+        self.assertEqual(self.manager.remove_element("1234567890123"), 0)
+        statistics = self.manager.get_statistics()
+        self.assertEqual(statistics["total"], 2)
+        self.assertEqual(statistics["facets"][0], ("category", [("A", 1), ("Programming", 1)]))
+        self.assertEqual(statistics["facets"][2], ("finished", [("No", 1), ("Yes", 1)]))
+        progress = statistics["progress"]
+        self.assertEqual((progress.items, progress.units, progress.reached, progress.started, progress.completed), (1, 50, 50, 1, 1))
+    # End of method test_get_statistics.
+
+    """
+    Test function get_statistics of a columnar manager and get_elements_in_range.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_statistics_columnar(self):
+        book = {"title": "New", "authors": ["A"], "category": "A", "formats": ["eBook"], "isbn": "1234567890001",
+                "publicationdate": "2001-02-03", "pagenumber": "50", "lastpageread": "60", "finished": "No"}
+        self.assertEqual(self.manager.add_element(book), 0)
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", columnar = True, snapshots = False)
+        statistics = manager.get_statistics()
+        expected = self.manager.get_statistics()
+        self.assertEqual(statistics["facets"], expected["facets"])
+        progress = [(counter.items, counter.units, counter.reached, counter.started, counter.completed)
+                    for counter in (statistics["progress"], expected["progress"])]
+        self.assertEqual(progress, [(2, 150, 60, 2, 1), (2, 150, 60, 2, 1)])
+        isbns = [item.findtext("isbn") for item in manager.get_elements_in_range("pagenumber", "60")]
+        self.assertEqual(isbns, ["1234567890123"])
+        isbns = [item.findtext("isbn") for item in manager.get_elements_in_range("pagenumber", high = "100", ascending = False)]
+        self.assertEqual(isbns, ["1234567890123", "1234567890001"])
+        isbns = [item.findtext("isbn") for item in manager.get_elements_in_range("publicationdate", "2001-01-01", "2001-12-31")]
+        self.assertEqual(isbns, ["1234567890001"])
+        self.assertIsNone(manager.get_elements_in_range("publicationdate", "2002-01-01"))
+        self.assertIsNone(manager.get_elements_in_range("title", "A"))
+    # End of method test_get_statistics_columnar.
+
+    """
+    Test sharing of repetitive values through the value dictionary.
+    """
+    #@unittest.skip("Skipped.")
+    def test_value_dictionary(self):
+        records = self.manager.get_all_records()
+        self.assertIs(records[0].category, records[1].category)
+        self.assertIs(records[0].formats[1], records[1].formats[1])
+        self.assertIsNot(records[0].isbn, records[1].isbn)
+        values = self.manager.get_statistics()["values"]
+        # Raw authors, category, formats, finished and shop and casefolded statistics tags.
+        self.assertEqual(values["values"], 13)
+        self.assertEqual(values["references"], 21)
+        self.assertGreater(values["saved"], 0)
+    # End of method test_value_dictionary.
+
+    """
+    Test releasing values of removed and edited elements from the value dictionary.
+    """
+    #@unittest.skip("Skipped.")
+    def test_value_dictionary_release(self):
+        self.manager.get_all_records()
+        expected = self.manager.get_statistics()["values"]
+        book = {"title": "A", "authors": ["Unique author"], "category": "Unique category", "formats": ["eBook"],
+                "isbn": "1234567890987", "shop": "Unique shop", "finished": "No"}
+        self.assertEqual(self.manager.add_element(book), 0)
+        self.assertGreater(self.manager.get_statistics()["values"]["values"], expected["values"])
+        self.assertEqual(self.manager.edit_element("1234567890987", dict(book, shop = "Other shop")), 0)
+        self.manager.get_all_records()
+        self.assertEqual(self.manager.remove_element("1234567890987"), 0)
+        self.manager.get_all_records()
+        self.assertEqual(self.manager.get_statistics()["values"], expected)
+    # End of method test_value_dictionary_release.
+
+    """
+    Test lazy decoding of record fields.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_all_records_projection(self):
+        records = self.manager.get_all_records(fields = ["title"])
+        self.assertFalse(records[0]._decoded("authors"))
+        self.assertFalse(records[0]._decoded("pagenumber"))
+        self.assertEqual(records[0].pagenumber, "100")
+        self.assertEqual(records[1].pagenumber, None)
+        self.assertFalse(records[0]._decoded("authors"))
+        self.assertEqual(records[0].authors, ("Someone", "Elseone"))
+        records[0].load()
+        self.assertIsNone(records[0]._node)
+        self.assertEqual(records[0].to_dict()["authors"], ["Someone", "Elseone"])
+    # End of method test_get_all_records_projection.
+
+    """
+    Test loading the library from its binary snapshot.
+    """
+    #@unittest.skip("Skipped.")
+    def test_snapshot(self):
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd")
+        self.assertEqual(len(manager.get_all_elements()), 2)
+        self.assertTrue(os.path.isfile(self.manager._snapshotfile))
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd")
+        self.assertEqual(len(manager.search_elements("title", "test")), 2)
+        self.assertIsNotNone(manager._index._snapshot)
+        self.assertEqual(manager.get_all_records()[0].authors, ("Someone", "Elseone"))
+        self.assertIsInstance(manager.get_element("1234567890124"), _Element)
+        self.assertEqual(manager.get_statistics()["values"]["values"], 13)
+        # Snapshot records decode fields on first use, also after a write has closed the snapshot.
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd")
+        records = [entry.record for entry in manager._load_index()._entries]
+        self.assertFalse(records[1]._decoded("title"))
+        self.assertEqual(manager.edit_element("1234567890123", records[0].to_dict()), 0)
+        self.assertIsNone(manager._index._snapshot)
+        self.assertEqual(records[1].title, "Test")
+        self.assertEqual(records[1].authors, ("Other",))
+        # Changing the library file invalidates the snapshot.
+        with open(self.manager._xmlfile, "a") as xmlfile:
+            xmlfile.write("\n")
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd")
+        self.assertEqual(len(manager.get_all_elements()), 2)
+        self.assertIsNone(manager._index._snapshot)
+        # Writes leave the snapshot stale, until the library is loaded again.
+        with open(self.manager._snapshotfile, "rb") as snapshotfile:
+            snapshot = snapshotfile.read()
+        self.assertEqual(manager.remove_element("1234567890124"), 0)
+        with open(self.manager._snapshotfile, "rb") as snapshotfile:
+            self.assertEqual(snapshotfile.read(), snapshot)
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd")
+        self.assertEqual(len(manager.get_all_elements()), 1)
+        self.assertIsNone(manager._index._snapshot)
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd")
+        self.assertEqual(len(manager.get_all_elements()), 1)
+        self.assertIsNotNone(manager._index._snapshot)
+        # Corrupted snapshots are ignored.
+        hashes = manager._file_hashes()
+        with open(self.manager._snapshotfile, "r+b") as snapshotfile:
+            snapshotfile.truncate(Snapshot._header.size + 8)
+        self.assertIsNone(Snapshot.load(self.manager._snapshotfile, hashes[0], hashes[1]))
+        # Disabled snapshots are neither read nor written.
+        os.remove(self.manager._snapshotfile)
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", snapshots = False)
+        self.assertEqual(len(manager.get_all_elements()), 1)
+        self.assertFalse(os.path.isfile(self.manager._snapshotfile))
+    # End of method test_snapshot.
+
     """
     Test function show_all_elements.
     """
@@ -181,6 +459,23 @@ Test  | Other            | Programming | Hardback, eBook | 1234567890124 | Yes
         self.assertEqual(self.manager.add_element(book), 3)
     # End of method test_add_element_existing_item.
 
+    """
+    Test that a failed add does not keep index entries of its nodes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_add_element_invalid_rollback(self):
+        book = {"title": "A", "authors": ["A"], "category": "A", "formats": ["eBook"], "isbn": "invalid",
+                "publicationdate": "2017-03-31", "publisher": "A", "edition": "6",
+                "pagenumber": "850", "lastpageread": "10", "shop": "A", "finished": "No"}
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+        self.assertEqual(manager.add_element(book), 3)
+        index = manager._load_index()
+        self.assertEqual(len(index._bynode), index.count())
+        self.assertEqual(manager.add_elements([book, dict(book, isbn = "1234567890987")]), [3, 0])
+        self.assertEqual(len(index._bynode), index.count())
+        self.assertEqual(len(manager.get_all_elements()), 3)
+    # End of method test_add_element_invalid_rollback.
+
     """
     Test function add_element without optional elements.
     """
@@ -210,6 +505,152 @@ Test  | Other            | Programming | Hardback, eBook | 1234567890124 | Yes
         self.assertEqual(self.manager.remove_element("1234567890124"), 0)
     # End of method test_remove_element.
 
+    """
+    Test functions add_elements and remove_elements.
+    """
+    #@unittest.skip("Skipped.")
+    def test_add_remove_elements(self):
+        book = {"title": "A", "authors": ["A"], "category": "A", "formats": ["eBook"], "finished": "No"}
+        books = [dict(book, isbn = "9{:012}".format(number)) for number in range(250)]
+        # Missing key, duplicate isbn.
+        books.append({"title": "B"})
+        books.append(dict(book, isbn = "1234567890123"))
+        with patch.object(self.manager, "_write_tree", wraps = self.manager._write_tree) as write:
+            codes = self.manager.add_elements(books)
+            # One commit failing validation, split in halves until the duplicate is found.
+            self.assertLessEqual(write.call_count, 2 * 9)
+        self.assertEqual(codes, [0] * 250 + [1, 3])
+        self.assertEqual(len(self.manager.get_all_elements()), 252)
+        self.assertEqual(self.manager.remove_elements(["9000000000000", "9000000000000", "0"]), [0, 1, 1])
+        self.assertEqual(len(self.manager.get_all_elements()), 251)
+    # End of method test_add_remove_elements.
+
+    """
+    Test coalescing of concurrent writes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_write_coalescing(self):
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", batchwindow = 0.05, batchsize = 1000, snapshots = False)
+        book = {"title": "A", "authors": ["A"], "category": "A", "formats": ["eBook"], "finished": "No"}
+        codes = []
+        def add(number):
+            codes.append(manager.add_element(dict(book, isbn = "9{:012}".format(number))))
+        threads = [threading.Thread(target = add, args = (number,)) for number in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(codes, [0] * 20)
+        self.assertLess(manager._scheduler.commits, 20)
+        self.assertEqual(manager.remove_element("9000000000000"), 0)
+        self.assertEqual(manager.remove_element("9000000000000"), 1)
+        self.assertEqual(manager.edit_element("9000000000001", dict(book, isbn = "1234567890123")), 3)
+        self.assertEqual(manager.edit_element("9000000000001", dict(book, title = "B", isbn = "9000000000001")), 0)
+        self.assertEqual(manager.get_element("9000000000001").findtext("title"), "B")
+        self.assertEqual(len(manager.get_all_elements()), 21)
+    # End of method test_write_coalescing.
+
+    """
+    Test journaled writes and journal compaction.
+    """
+    #@unittest.skip("Skipped.")
+    def test_journal(self):
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+        journalfile = self.manager._xmlfile + ".journal"
+        with open(self.manager._xmlfile, "rb") as xmlfile:
+            original = xmlfile.read()
+        book = {"title": "A", "authors": ["A"], "category": "A", "formats": ["eBook"], "isbn": "1234567890987", "finished": "No"}
+        self.assertEqual(manager.add_element(book), 0)
+        self.assertEqual(manager.edit_element("1234567890987", dict(book, title = "B")), 0)
+        self.assertEqual(manager.remove_element("1234567890124"), 0)
+        # Duplicate and invalid values are not journaled.
+        self.assertEqual(manager.add_element(dict(book, isbn = "1234567890123")), 3)
+        self.assertEqual(manager.add_element(dict(book, isbn = "invalid")), 3)
+        self.assertEqual(manager.remove_element("1234567890124"), 1)
+        with open(self.manager._xmlfile, "rb") as xmlfile:
+            self.assertEqual(xmlfile.read(), original)
+        self.assertTrue(os.path.isfile(journalfile))
+        # Readers apply the journal, ignoring a corrupted last entry.
+        with open(journalfile, "ab") as journal:
+            journal.write(b"00000000 {\"op\":\"remove\",\"key\":\"1234567890123\"}\n")
+        reader = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+        self.assertEqual([element.findtext("title") for element in reader.get_all_elements()], ["B", "Test"])
+        self.assertEqual(reader.add_element(dict(book, isbn = "1234567890988")), 0)
+        self.assertEqual(len(BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False).get_all_elements()), 3)
+        # Compaction folds the journal into the library file.
+        self.assertEqual(reader.compact(), 0)
+        self.assertFalse(os.path.isfile(journalfile))
+        self.assertEqual(len(self.manager.get_all_elements()), 3)
+        self.assertEqual(self.manager.get_element("1234567890987").findtext("title"), "B")
+        # Compaction past the journal limit.
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, journallimit = 1, snapshots = False)
+        self.assertEqual(manager.remove_element("1234567890988"), 0)
+        self.assertFalse(os.path.isfile(journalfile))
+        self.assertEqual(len(self.manager.get_all_elements()), 2)
+    # End of method test_journal.
+
+    """
+    Test journaled writes of managers of the same library, as in separate processes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_journal_writers(self):
+        book = {"title": "A", "authors": ["A"], "category": "A", "formats": ["eBook"], "isbn": "1234567890987", "finished": "No"}
+        first = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+        second = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+        self.assertEqual(len(first.get_all_elements()), 2)
+        self.assertEqual(len(second.get_all_elements()), 2)
+        self.assertEqual(first.add_element(book), 0)
+        # The index of the second manager is reloaded before its entries are appended.
+        self.assertEqual(second.add_element(dict(book, isbn = "1234567890988")), 0)
+        self.assertEqual(second.add_element(dict(book, title = "B")), 3)
+        # Entries appended since the journal has been read are kept, a corrupted tail is discarded.
+        journal = first._journal
+        with open(journal.path, "ab") as journalfile:
+            journalfile.write(b"00000000 {\"op\":\"remove\",\"key\":\"1234567890123\"}\n")
+        self.assertEqual(journal.append(first._journalbase, [{"op": "remove", "key": "1234567890124"}]), os.path.getsize(journal.path))
+        self.assertEqual(journal.recovered, 1)
+        reader = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+        self.assertEqual(sorted(element.findtext("isbn") for element in reader.get_all_elements()), ["1234567890123", "1234567890987", "1234567890988"])
+    # End of method test_journal_writers.
+
+    """
+    Test applying a journal, whose library file has been changed by hand.
+    """
+    #@unittest.skip("Skipped.")
+    def test_journal_stale(self):
+        book = {"title": "A", "authors": ["A"], "category": "A", "formats": ["eBook"], "isbn": "1234567890987", "finished": "No"}
+        manager = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+        for isbn in ["1234567890987", "1234567890988", "1234567890989"]:
+            self.assertEqual(manager.add_element(dict(book, isbn = isbn)), 0)
+        self.assertEqual(manager.remove_element("1234567890987"), 0)
+        self.assertEqual(manager.edit_element("1234567890988", dict(book, isbn = "1234567890124", title = "B")), 3)
+        self.assertEqual(manager.edit_element("1234567890989", dict(book, isbn = "1234567890989", title = "C")), 0)
+        # Edit the library file by hand, adding an item the journal adds as well.
+        with open(self.manager._xmlfile) as xmlfile:
+            xml = xmlfile.read()
+        with open(self.manager._xmlfile, "w") as xmlfile:
+            xmlfile.write(xml.replace("<title>Test</title>", "<title>Hand edit</title>", 1).replace("<book>", """<book>
+    <title>Hand</title><authors><author>A</author></authors><category>A</category><formats><format>eBook</format></formats>
+    <isbn>1234567890988</isbn><finished>No</finished>
+  </book>
+  <book>""", 1))
+        out = StringIO()
+        with patch("sys.stdout", out):
+            manager = BookManager(self.storagepath, "library.xml", "library.xsd", journal = True, snapshots = False)
+            items = [(element.findtext("isbn"), element.findtext("title")) for element in manager.get_all_elements("isbn")]
+        self.assertIn("changed after its journal", out.getvalue())
+        self.assertEqual(items, [("1234567890123", "Hand edit"), ("1234567890124", "Test"), ("1234567890988", "A"), ("1234567890989", "C")])
+        # The stale journal is never replaced, but folded into the library file by the next write.
+        with self.assertRaises(OSError):
+            manager._journal.append(Snapshot.digest(manager._xmlfile).hex(), [])
+        with patch("sys.stdout", out):
+            self.assertEqual(manager.add_element(dict(book, isbn = "1234567890990")), 0)
+        self.assertFalse(os.path.isfile(manager._journal.path))
+        items = [(element.findtext("isbn"), element.findtext("title")) for element in self.manager.get_all_elements("isbn")]
+        self.assertEqual(items, [("1234567890123", "Hand edit"), ("1234567890124", "Test"), ("1234567890988", "A"),
+                                 ("1234567890989", "C"), ("1234567890990", "A")])
+    # End of method test_journal_stale.
+
     """
     Test function show_element with existing item.
     """
@@ -269,6 +710,91 @@ Book:\
         self.assertEqual(self.manager.import_csv("books.csv"), 0)
     # End of method test_import_csv.
 
+    """
+    Test function import_csv with rows which are not valid.
+    """
+    #@unittest.skip("Skipped.")
+    def test_import_csv_report(self):
+        csvfile = os.path.join(self.storagepath, "book", "import.test.csv")
+        with open(csvfile, "w", newline = "") as rows:
+            rows.write("Title,Author,Category,Format,ISBN,Finished\n")
+            rows.write("First,Someone,Fiction,eBook,1234567890001,No\n")
+            rows.write("Wrong isbn,Someone,Fiction,eBook,isbn,No\n")
+            rows.write("Duplicate,Someone,Fiction,eBook,1234567890001,No\n")
+            rows.write("Short,Someone\n")
+            rows.write("\\Quoted, title\\,\\Someone, Elseone\\,Fiction,\\eBook, Paperback\\,1234567890002,Yes\n")
+        report = []
+        try:
+            with open(self.manager._xmlfile, "rb") as xmlfile:
+                original = xmlfile.read()
+            self.assertEqual(self.manager.import_csv(csvfile, report), 3)
+            self.assertEqual([line for line, message in report], [3, 4, 5])
+            self.assertIn("Duplicate isbn", report[1][1])
+            # The library is kept, if any row is not valid.
+            with open(self.manager._xmlfile, "rb") as xmlfile:
+                self.assertEqual(xmlfile.read(), original)
+            self.assertFalse(os.path.exists(self.manager._xmlfile + ".new"))
+            # Chunks converted by processes give the same report.
+            parallelreport = []
+            with patch.object(Manager, "_csvchunksize", 1):
+                self.assertEqual(self.manager.import_csv(csvfile, parallelreport, jobs = 2), 3)
+            self.assertEqual(parallelreport, report)
+            with open(csvfile, newline = "") as rows:
+                lines = rows.read().splitlines(True)
+            with open(csvfile, "w", newline = "") as rows:
+                rows.writelines([lines[0], lines[1], lines[5]])
+            self.assertEqual(self.manager.import_csv(csvfile), 0)
+            self.assertEqual(self.manager.validate(), 0)
+            books = self.manager.get_all_elements("isbn")
+            self.assertEqual([book.findtext("title") for book in books], ["First", "Quoted, title"])
+            self.assertEqual(self.manager.element_to_dict(books[1])["formats"], ["eBook", "Paperback"])
+            # Chunks converted by processes give the same library.
+            with open(self.manager._xmlfile, "rb") as xmlfile:
+                library = xmlfile.read()
+            with patch.object(Manager, "_csvchunksize", 1):
+                self.assertEqual(self.manager.import_csv(csvfile, jobs = 2), 0)
+            with open(self.manager._xmlfile, "rb") as xmlfile:
+                self.assertEqual(xmlfile.read(), library)
+            # A missing column is not imported at all.
+            with open(csvfile, "w", newline = "") as rows:
+                rows.write("Title,Author\nTitle,Someone\n")
+            self.assertEqual(self.manager.import_csv(csvfile), 1)
+            self.assertEqual(len(self.manager.get_all_elements()), 2)
+            self.assertFalse(os.path.exists(self.manager._xmlfile + ".new"))
+        finally:
+            os.remove(csvfile)
+    # End of method test_import_csv_report.
+
+    """
+    Test function import_csv in upsert and merge modes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_import_csv_modes(self):
+        csvfile = os.path.join(self.storagepath, "book", "import.test.csv")
+        self.assertEqual(self.manager.export_csv(csvfile), 0)
+        with open(csvfile, newline = "") as rows:
+            lines = rows.read().replace("Test,", "Edited,", 1)
+        with open(csvfile, "w", newline = "") as rows:
+            rows.write(lines + "New,Someone,Fiction,eBook,1234567890125,No\r\n")
+        try:
+            counts = {}
+            self.assertEqual(self.manager.import_csv(csvfile, mode = "merge", counts = counts), 0)
+            self.assertEqual(counts, {"inserted": 1, "updated": 1, "unchanged": 1})
+            # Values missing from the file are kept.
+            book = self.manager.element_to_dict(self.manager.get_element("1234567890123"))
+            self.assertEqual((book["title"], book["pagenumber"], book["shop"]), ("Edited", "100", "Shop"))
+            self.assertEqual(self.manager.import_csv(csvfile, mode = "merge", counts = counts), 0)
+            self.assertEqual(counts, {"inserted": 0, "updated": 0, "unchanged": 3})
+            # Items are replaced by the items of the file.
+            self.assertEqual(self.manager.import_csv(csvfile, mode = "upsert", counts = counts), 0)
+            self.assertEqual(counts, {"inserted": 0, "updated": 1, "unchanged": 2})
+            self.assertNotIn("pagenumber", self.manager.element_to_dict(self.manager.get_element("1234567890123")))
+            self.assertEqual(len(self.manager.get_all_elements()), 3)
+            self.assertEqual(self.manager.validate(), 0)
+        finally:
+            os.remove(csvfile)
+    # End of method test_import_csv_modes.
+
     """
     Test function export_csv.
     """
@@ -276,6 +802,74 @@ Book:\
     def test_export_csv(self):
         self.assertEqual(self.manager.export_csv("books.csv"), 0)
     # End of method test_export_csv.
+
+    """
+    Test function export_csv without sorting.
+    """
+    #@unittest.skip("Skipped.")
+    def test_export_csv_unsorted(self):
+        csvfile = os.path.join(self.storagepath, "book", "export.test.csv")
+        try:
+            self.assertEqual(self.manager.export_csv(csvfile), 0)
+            with open(csvfile, newline = "") as rows:
+                lines = rows.read().splitlines()
+            # The library file is streamed and validated while read.
+            manager = BookManager(self.storagepath, "library.xml", "library.xsd", snapshots = False)
+            self.assertEqual(manager.export_csv(csvfile, sort = False), 0)
+            self.assertIsNone(manager._index)
+            self.assertIsNotNone(manager._validstamp)
+            with open(csvfile, newline = "") as rows:
+                unsorted = rows.read().splitlines()
+            self.assertEqual(unsorted[0], lines[0])
+            self.assertEqual(sorted(unsorted[1:]), sorted(lines[1:]))
+            # Files which are not valid are not exported.
+            with open(self.manager._xmlfile, encoding = "utf-8") as xmlfile:
+                library = xmlfile.read()
+            with open(self.manager._xmlfile, "w", encoding = "utf-8") as xmlfile:
+                xmlfile.write(library.replace("<isbn>", "<code>").replace("</isbn>", "</code>"))
+            self.assertEqual(manager.export_csv(csvfile, sort = False), 1)
+            self.assertFalse(os.path.exists(csvfile + ".new"))
+            with open(csvfile, newline = "") as rows:
+                self.assertEqual(rows.read().splitlines(), unsorted)
+        finally:
+            os.remove(csvfile)
+    # End of method test_export_csv_unsorted.
+
+    """
+    Test function import_jsonl with lines which are not valid.
+    """
+    #@unittest.skip("Skipped.")
+    def test_import_jsonl_report(self):
+        jsonlfile = os.path.join(self.storagepath, "book", "import.test.jsonl")
+        self.assertEqual(self.manager.export_jsonl(jsonlfile, sort = False), 0)
+        with open(jsonlfile, "a", encoding = "utf-8") as lines:
+            lines.write('{"title": "New", "authors": ["Someone"], "category": "Fiction", "formats": ["eBook"], "isbn": "1234567890125", "publisher": "Press", "finished": "No"}\n')
+            lines.write("\n")
+            lines.write('{"title": "Missing"}\n')
+            lines.write("not json\n")
+            lines.write('["New"]\n')
+            lines.write('{"title": "Bad", "authors": ["Someone"], "category": "Fiction", "formats": ["eBook"], "isbn": "1234567890126", "finished": "Maybe"}\n')
+        try:
+            report = []
+            counts = {}
+            self.assertEqual(self.manager.import_jsonl(jsonlfile, report, "upsert", counts), 3)
+            self.assertEqual([line for line, message in report], [5, 6, 7, 8])
+            self.assertEqual(report[0][1], "Missing value 'authors'.")
+            # Nothing is imported, if any line is not valid.
+            self.assertEqual(counts, {"inserted": 0, "updated": 0, "unchanged": 0})
+            self.assertIsNone(self.manager.get_element("1234567890125"))
+            with open(jsonlfile, encoding = "utf-8") as lines:
+                valid = lines.readlines()[:3]
+            with open(jsonlfile, "w", encoding = "utf-8") as lines:
+                lines.writelines(valid)
+            self.assertEqual(self.manager.import_jsonl(jsonlfile, mode = "upsert", counts = counts), 0)
+            self.assertEqual(counts, {"inserted": 1, "updated": 0, "unchanged": 2})
+            # Values missing from CSV files are imported.
+            self.assertEqual(self.manager.element_to_dict(self.manager.get_element("1234567890125"))["publisher"], "Press")
+            self.assertEqual(self.manager.validate(), 0)
+        finally:
+            os.remove(jsonlfile)
+    # End of method test_import_jsonl_report.
 # End of class TestBookManager.
 
 # Test running or loading.
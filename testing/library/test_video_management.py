@@ -14,6 +14,7 @@ sys.path.insert(0, appdir)
 # Import application modules.
 import library.video_management
 from library.video_management import VideoManager
+from library.support.records import VideoRecord
 
 """
 Class: TestVideoManager
@@ -34,7 +35,7 @@ class TestVideoManager(unittest.TestCase):
         self.testlibrary = os.path.join(os.path.split(os.path.abspath(__file__))[0], "test_video_library.xml")
 
         # Initialize VideoManager.
-        self.manager = VideoManager(self.storagepath, "library.xml", "library.xsd")
+        self.manager = VideoManager(self.storagepath, "library.xml", "library.xsd", snapshots = False)
 
         # Take test backup of library xml and schema.
         shutil.copy2(self.manager._xmlfile, self.xmlbackup)
@@ -52,6 +53,9 @@ class TestVideoManager(unittest.TestCase):
         os.remove(self.xmlbackup)
         shutil.copy2(self.xsdbackup, self.manager._xsdfile)
         os.remove(self.xsdbackup)
+        # Remove snapshot of the test library.
+        if os.path.isfile(self.manager._snapshotfile):
+            os.remove(self.manager._snapshotfile)
     # End of method tearDown.
 
     """
@@ -149,6 +153,89 @@ Test    | DVD, Other | Action, Movie"
         self.assertIsInstance(self.manager.get_element("Test"), _Element)
     # End of method test_get_element_existent.
 
+    """
+    Test function get_all_records and the dictionary form of records.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_all_records(self):
+        records = self.manager.get_all_records()
+        self.assertIsInstance(records[0], VideoRecord)
+        self.assertEqual([record.title for record in records], ["Another", "Test"])
+        self.assertEqual(records[1].values("genre"), ["Action", "Movie"])
+        self.assertEqual(records[0].genres, ())
+        self.assertIs(records[0].label, records[1].label)
+        self.assertEqual(records[1].to_dict(), self.manager._xmlitem_to_dict(self.manager.get_element("Test")))
+    # End of method test_get_all_records.
+
+    """
+    Test functions _csv_element and _csv_row.
+    """
+    #@unittest.skip("Skipped.")
+    def test_csv_element_row(self):
+        row = {"Title": "Csv", "Format": "DVD, MP4"}
+        element = self.manager._csv_element(row)
+        self.assertEqual([node.text for node in element.find("formats")], ["DVD", "MP4"])
+        self.assertEqual(self.manager._csv_row(VideoRecord.from_node(element)), ["Csv", "DVD, MP4"])
+        with self.assertRaises(KeyError):
+            self.manager._csv_element({"Title": "Csv"})
+    # End of method test_csv_element_row.
+
+    """
+    Test functions get_elements_by and count_elements_by, using secondary indexes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_elements_by(self):
+        titles = [item.findtext("title") for item in self.manager.get_elements_by("label", "world")]
+        self.assertEqual(titles, ["Another", "Test"])
+        titles = [item.findtext("title") for item in self.manager.get_elements_by("format", "m", True)]
+        self.assertEqual(titles, ["Another"])
+        self.assertIsNone(self.manager.get_elements_by("genre", "Act"))
+        self.assertEqual(self.manager.count_elements_by("format"), [("DVD", 1), ("MP4", 1), ("Other", 1)])
+    # End of method test_get_elements_by.
+
+    """
+    Test function get_statistics, following library writes.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_statistics(self):
+        statistics = self.manager.get_statistics()
+        self.assertEqual(statistics["total"], 2)
+        self.assertEqual(statistics["facets"], [("format", [("DVD", 1), ("MP4", 1), ("Other", 1)]),
+                                                ("genre", [("Action", 1), ("Movie", 1)])])
+        video = {"title": "A", "formats": ["DVD"], "genres": ["Drama"]}
+        self.assertEqual(self.manager.add_element(video), 0)
+        self.assertEqual(self.manager.remove_element("Test"), 0)
+        statistics = self.manager.get_statistics()
+        self.assertEqual(statistics["total"], 2)
+        self.assertEqual(statistics["facets"], [("format", [("DVD", 1), ("MP4", 1)]), ("genre", [("Drama", 1)])])
+    # End of method test_get_statistics.
+
+    """
+    Test function get_elements_in_range on release dates.
+    """
+    #@unittest.skip("Skipped.")
+    def test_get_elements_in_range(self):
+        video = {"title": "A", "formats": ["DVD"], "releasedate": "2014-08-08"}
+        self.assertEqual(self.manager.add_element(video), 0)
+        titles = [item.findtext("title") for item in self.manager.get_elements_in_range("releasedate", "2007-01-01")]
+        self.assertEqual(titles, ["Test", "A"])
+        titles = [item.findtext("title") for item in self.manager.get_elements_in_range("releasedate", "2008-01-01", ascending = False)]
+        self.assertEqual(titles, ["A"])
+        self.assertIsNone(self.manager.get_elements_in_range("releasedate", high = "2000-01-01"))
+        self.assertIsNone(self.manager.get_elements_in_range("title", "A"))
+    # End of method test_get_elements_in_range.
+
+    """
+    Test function fuzzy_search_elements with a mistyped value.
+    """
+    #@unittest.skip("Skipped.")
+    def test_fuzzy_search_elements(self):
+        elements = self.manager.fuzzy_search_elements("title", "Anotehr")
+        self.assertEqual([element[0].text for element in elements], ["Another"])
+        self.assertIsNone(self.manager.fuzzy_search_elements("label", "World"))
+        self.assertIsNone(self.manager.fuzzy_search_elements("title", "Anotehr", 0))
+    # End of method test_fuzzy_search_elements.
+
     """
     Test function add_element using invalid dictionary key.
     """
@@ -3,7 +3,10 @@
 # Imports
 import unittest
 # Import testing modules.
+from test_application import TestApplication
 from test_run import TestRunModule
+from test_batch import TestBatchRunner
+from test_server import TestLibraryServer
 from testing.library.test_book_management import TestBookManager
 from testing.library.test_game_management import TestGameManager
 from testing.library.test_music_management import TestMusicManager
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# Imports
+import unittest
+from unittest.mock import patch
+import locale
+import sys
+import os
+# Set path for importing application modules.
+appdir = os.path.abspath(__file__).split("/testing/")[0]
+sys.path.insert(0, appdir)
+
+# Import application modules.
+import application
+from application import Application
+from library.support.collation import Collator
+
+"""
+Class: TestApplication
+
+Testcases for the application configuration and library managers.
+"""
+class TestApplication(unittest.TestCase):
+    """
+    Test validating and parsing configuration once while it is unchanged.
+    """
+    #@unittest.skip("Skipped.")
+    def test_configuration_cache(self):
+        app = Application()
+        confxml = os.path.join(appdir, "config", "config.xml")
+        with patch.object(application.Utility, "validate", wraps = application.Utility.validate) as validate:
+            types = app.library_types()
+            manager = app.get_manager(types[0])
+            self.assertIs(app.get_manager(types[0]), manager)
+            self.assertEqual(app.library_types(), types)
+            self.assertEqual(validate.call_count, 1)
+            # A written configuration is loaded again, with new managers.
+            stat = os.stat(confxml)
+            try:
+                os.utime(confxml, ns = (stat.st_atime_ns, stat.st_mtime_ns + 1000))
+                self.assertIsNot(app.get_manager(types[0]), manager)
+                self.assertEqual(validate.call_count, 2)
+            finally:
+                os.utime(confxml, ns = (stat.st_atime_ns, stat.st_mtime_ns))
+    # End of method test_configuration_cache.
+
+    """
+    Test that collators do not change the locale of the process.
+    """
+    #@unittest.skip("Skipped.")
+    def test_collation_locale(self):
+        current = locale.setlocale(locale.LC_COLLATE)
+        Collator(uselocale = True).key("The Part 2")
+        self.assertEqual(locale.setlocale(locale.LC_COLLATE), current)
+        # An unavailable locale is not set.
+        self.assertFalse(Collator.set_locale("unavailable_LOCALE.none"))
+        self.assertEqual(locale.setlocale(locale.LC_COLLATE), current)
+        self.assertTrue(Collator.set_locale(current))
+    # End of method test_collation_locale.
+# End of class TestApplication.
+
+# Test running or loading.
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+# Imports
+import unittest
+from unittest.mock import patch
+import json
+import shutil
+import sys
+import os
+from io import StringIO
+# Set path for importing application modules.
+appdir = os.path.abspath(__file__).split("/testing/")[0]
+sys.path.insert(0, appdir)
+
+# Import application modules.
+from library.book_management import BookManager
+from batch import BatchRunner
+
+"""
+Class: TestBatchRunner
+
+Testcases for running batches of library commands.
+"""
+class TestBatchRunner(unittest.TestCase):
+    """
+    Set up.
+    """
+    def setUp(self):
+        # Set up path values.
+        self.storagepath = os.path.join(appdir, "storage")
+        self.xmlbackup = os.path.join(self.storagepath, "book", "xmlbackup.test.back")
+        self.testlibrary = os.path.join(appdir, "testing", "library", "test_book_library.xml")
+
+        # Initialize BookManager.
+        self.manager = BookManager(self.storagepath, "library.xml", "library.xsd", snapshots = False)
+
+        # Take test backup of library xml and copy test library file.
+        shutil.copy2(self.manager._xmlfile, self.xmlbackup)
+        shutil.copy2(self.testlibrary, self.manager._xmlfile)
+
+        # Application of the book library only.
+        manager = self.manager
+        class App:
+            def library_types(self):
+                return ["book"]
+            def get_manager(self, libtype):
+                return manager
+        self.app = App()
+    # End of method setUp.
+
+    """
+    Tear down.
+    """
+    def tearDown(self):
+        # Restore library xml from test backup.
+        shutil.copy2(self.xmlbackup, self.manager._xmlfile)
+        os.remove(self.xmlbackup)
+    # End of method tearDown.
+
+    """
+    Runs a batch of commands.
+
+    :param list commands: The command objects or lines.
+    :return tuple: The number of failures and the list of result objects.
+    """
+    def run_batch(self, commands):
+        out = StringIO()
+        lines = [command if isinstance(command, str) else json.dumps(command) for command in commands]
+        failures = BatchRunner(self.app, out).run(lines)
+        return (failures, [json.loads(line) for line in out.getvalue().splitlines()])
+    # End of method run_batch.
+
+    """
+    Test running commands in order.
+    """
+    #@unittest.skip("Skipped.")
+    def test_run(self):
+        item = self.manager.element_to_dict(self.manager.get_element("1234567890123"))
+        newitem = dict(item, isbn = "1234567890125")
+        failures, results = self.run_batch([
+            {"id": "a", "type": "book", "op": "add", "item": newitem},
+            {"type": "book", "op": "edit", "key": "1234567890125", "item": dict(newitem, title = "Edited")},
+            {"type": "book", "op": "get", "key": "1234567890125"},
+            {"type": "book", "op": "remove", "key": "1234567890124"},
+            {"type": "book", "op": "add", "item": {"title": "Missing values"}},
+            {"type": "book", "op": "get_all", "element": "isbn"},
+            "",
+            "not json",
+            {"type": "comic", "op": "get_all"},
+            {"type": "book", "op": "rename"},
+            {"type": "book", "op": "remove"}])
+        self.assertEqual(failures, 5)
+        self.assertEqual([result["line"] for result in results], [1, 2, 3, 4, 5, 6, 8, 9, 10, 11])
+        self.assertEqual(results[0], {"line": 1, "id": "a", "result": 0})
+        self.assertEqual(results[1]["result"], 0)
+        self.assertEqual(results[2]["item"]["title"], "Edited")
+        self.assertEqual(results[3]["result"], 0)
+        self.assertEqual(results[4]["result"], 1)
+        self.assertEqual([result["isbn"] for result in results[5]["items"]], ["1234567890123", "1234567890125"])
+        for result in results[6:]:
+            self.assertIn("error", result)
+    # End of method test_run.
+
+    """
+    Test reporting changes without an item object, without aborting the batch.
+    """
+    #@unittest.skip("Skipped.")
+    def test_invalid_items(self):
+        item = self.manager.element_to_dict(self.manager.get_element("1234567890123"))
+        failures, results = self.run_batch([
+            {"type": "book", "op": "add", "item": "x"},
+            {"type": "book", "op": "add"},
+            {"type": "book", "op": "edit", "key": "1234567890123", "item": ["x"]},
+            {"type": "book", "op": "add", "item": dict(item, isbn = "1234567890125")}])
+        self.assertEqual(failures, 3)
+        self.assertEqual(results[0], {"line": 1, "error": "Command add requires an item object."})
+        self.assertEqual(results[1]["error"], "Command add requires an item object.")
+        self.assertEqual(results[2]["error"], "Command edit requires an item object.")
+        self.assertEqual(results[3], {"line": 4, "result": 0})
+        self.assertEqual(len(self.manager.get_all_elements()), 3)
+    # End of method test_invalid_items.
+
+    """
+    Test reporting parameters of the wrong type and errors of commands, without aborting the batch.
+    """
+    #@unittest.skip("Skipped.")
+    def test_invalid_parameters(self):
+        item = self.manager.element_to_dict(self.manager.get_element("1234567890123"))
+        failures, results = self.run_batch([
+            {"type": "book", "op": "add", "item": dict(item, isbn = "1234567890125")},
+            {"type": "book", "op": "search", "value": 5},
+            {"type": "book", "op": "get_all", "element": ["x"]},
+            {"type": "book", "op": "import_csv", "file": "books.csv", "jobs": "x"},
+            {"type": "book", "op": "import_csv", "file": "books.csv", "jobs": True},
+            {"type": "book", "op": "import_jsonl", "file": 1},
+            {"type": "book", "op": "get", "key": "1234567890125", "ascending": "no"},
+            {"type": ["book"], "op": "get_all"},
+            {"type": "book", "op": "get_all", "element": None, "ascending": None}])
+        self.assertEqual(failures, 7)
+        self.assertEqual(results[0], {"line": 1, "result": 0})
+        self.assertEqual(results[1]["error"], "Parameter value of command search should be a string.")
+        self.assertEqual(results[2]["error"], "Parameter element of command get_all should be a string.")
+        self.assertEqual(results[3]["error"], "Parameter jobs of command import_csv should be an integer.")
+        self.assertEqual(results[4]["error"], "Parameter jobs of command import_csv should be an integer.")
+        self.assertEqual(results[5]["error"], "Parameter file of command import_jsonl should be a string.")
+        self.assertEqual(results[6]["error"], "Parameter ascending of command get should be a boolean.")
+        self.assertEqual(results[7]["error"], "Unsupported library type ['book'].")
+        self.assertEqual(len(results[8]["items"]), 3)
+    # End of method test_invalid_parameters.
+
+    """
+    Test reporting errors raised by commands, keeping the changes queued before them.
+    """
+    #@unittest.skip("Skipped.")
+    def test_command_errors(self):
+        item = self.manager.element_to_dict(self.manager.get_element("1234567890123"))
+        def fail(*args):
+            raise TypeError("failed")
+        with patch.object(self.manager, "search_elements", fail):
+            failures, results = self.run_batch([
+                {"type": "book", "op": "add", "item": dict(item, isbn = "1234567890125")},
+                {"type": "book", "op": "search", "value": "Test"},
+                {"type": "book", "op": "add", "item": dict(item, isbn = "1234567890126")}])
+        self.assertEqual(failures, 1)
+        self.assertEqual(results, [{"line": 1, "result": 0}, {"line": 2, "error": "An error occurred: failed"},
+                                   {"line": 3, "result": 0}])
+        self.assertEqual(len(self.manager.get_all_elements()), 4)
+        # Every change of a failed commit is reported.
+        with patch.object(self.manager, "change_elements", fail):
+            failures, results = self.run_batch([
+                {"type": "book", "op": "remove", "key": "1234567890125"},
+                {"type": "book", "op": "remove", "key": "1234567890126"},
+                {"type": "book", "op": "get", "key": "1234567890125"}])
+        self.assertEqual(failures, 2)
+        self.assertEqual([result.get("error") for result in results], ["An error occurred: failed"] * 2 + [None])
+        self.assertEqual(results[2]["item"]["isbn"], "1234567890125")
+    # End of method test_command_errors.
+
+    """
+    Test grouping changes into single commits.
+    """
+    #@unittest.skip("Skipped.")
+    def test_group_commits(self):
+        item = self.manager.element_to_dict(self.manager.get_element("1234567890123"))
+        commands = [{"type": "book", "op": "add", "item": dict(item, isbn = "99999999{:05}".format(number))} for number in range(50)]
+        commands.append({"type": "book", "op": "get_all"})
+        commands.extend({"type": "book", "op": "remove", "key": "99999999{:05}".format(number)} for number in range(50))
+        commit = self.manager._commit
+        calls = []
+        def counted(mutations):
+            calls.append(len(mutations))
+            return commit(mutations)
+        self.manager._commit = counted
+        failures, results = self.run_batch(commands)
+        self.assertEqual(failures, 0)
+        self.assertEqual(calls, [50, 50])
+        self.assertEqual(len(results[50]["items"]), 52)
+        self.assertEqual(len(self.manager.get_all_elements()), 2)
+    # End of method test_group_commits.
+# End of class TestBatchRunner.
+
+# Test running or loading.
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,8 @@ sys.path.insert(0, appdir)
 # Import application modules.
 import run
 import application
+from daemon import Daemon
+from testing.benchmark import import_times
 
 """
 Class: TestRunModule
@@ -37,6 +39,79 @@ class TestRunModule(unittest.TestCase):
 
         self.assertIsNone(test)
     # End of method test_main.
+
+    """
+    Test selection of commands run by the library daemon.
+    """
+    def test_daemon_command(self):
+        parser = run.create_parser()
+        self.assertTrue(run.daemon_command(parser.parse_args(["--load", "book", "--stats"])))
+        self.assertTrue(run.daemon_command(parser.parse_args(["--search-all", "--value", "test"])))
+        self.assertFalse(run.daemon_command(parser.parse_args(["--load", "book"])))
+        self.assertFalse(run.daemon_command(parser.parse_args(["--validate-configuration"])))
+        self.assertFalse(run.daemon_command(parser.parse_args([])))
+    # End of method test_daemon_command.
+
+    """
+    Test serving the libraries over HTTP with a single application, which batches writes.
+    """
+    def test_http(self):
+        import server
+        with patch.object(application, "Application") as app, patch.object(server, "LibraryServer") as libraryserver:
+            app.return_value.library_types.return_value = ["book"]
+            run.main(["--http", "--port", "0"])
+        app.assert_called_once_with(batchwindow = 0.005)
+        libraryserver.assert_called_once_with({"book": app.return_value.get_manager.return_value}, 0)
+        libraryserver.return_value.run.assert_called_once_with()
+    # End of method test_http.
+
+    """
+    Test running commands of the library daemon.
+    """
+    def test_daemon_run(self):
+        def handler(argv):
+            print(" ".join(argv))
+            if argv[0] == "exit":
+                sys.exit(3)
+        daemon = Daemon(handler, os.path.join(appdir, "test.sock"))
+        self.assertEqual(daemon._run(["show", "all"], appdir), {"output": "show all\n", "code": 0})
+        self.assertEqual(daemon._run(["exit"], appdir), {"output": "exit\n", "code": 3})
+        # Errors of commands are reported.
+        self.assertEqual(daemon._run([], appdir), {"output": "\nAn error occurred: list index out of range\n", "code": 1})
+        # There is no daemon running.
+        self.assertIsNone(Daemon.request(["--load", "book", "--stats"], os.path.join(appdir, "test.sock")))
+    # End of method test_daemon_run.
+
+    """
+    Test responses of the library daemon to requests.
+    """
+    def test_daemon_connection(self):
+        import socket
+        import json
+        def handler(argv):
+            raise RuntimeError("failed")
+        daemon = Daemon(handler, os.path.join(appdir, "test.sock"))
+        for request, response in [({"argv": ["x"], "cwd": appdir}, {"output": "An error occurred: failed\n", "code": 1}),
+                                  ({"argv": "x"}, {"rejected": True})]:
+            server, client = socket.socketpair()
+            with server, client:
+                client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                daemon._serve_connection(server)
+                self.assertEqual(json.loads(Daemon._receive(client)), response)
+    # End of method test_daemon_connection.
+
+    """
+    Test that one-shot commands import only the modules they use.
+    """
+    def test_startup_imports(self):
+        walltime, modules = import_times(["--load", "book", "--show", "X", "--no-daemon"], 1)
+        self.assertIn("library.book_management", modules)
+        for name in ["library.game_management", "library.music_management", "library.video_management", "concurrent.futures"]:
+            self.assertNotIn(name, modules)
+        walltime, modules = import_times(["--version"], 1)
+        self.assertNotIn("application", modules)
+        self.assertNotIn("lxml.etree", modules)
+    # End of method test_startup_imports.
 # End of class TestRunModule.
 
 # Test running or loading.